@@ -1,20 +1,29 @@
-from tools import *
 import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QFileDialog, QMessageBox,
-    QComboBox, QDateTimeEdit, QDoubleSpinBox, QStackedWidget
+    QComboBox, QDateTimeEdit, QDoubleSpinBox, QStackedWidget, QListWidget, QListWidgetItem, QCheckBox
 )
-from PyQt5.QtCore import Qt, QDateTime
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QDateTime, QPointF, QRectF
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 from PyQt5.QtWidgets import QProgressBar
-from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtGui import QIcon, QPixmap, QColor, QPainter, QPen, QPolygonF
+
+import choices
 
 # Constantes 
-CALC_METHODS = ["linear", "linear_double", "sin", "cos", "square", "sqrt", "log"]
+# Recursos ficam ao lado deste arquivo, qualquer que seja o diretório atual
+ICON_PATH = str(Path(__file__).resolve().parent / "icons" / "xml-icon.png")
+# Métodos e sinais vêm de choices, compartilhado com a linha de comando
+CALC_METHODS = list(choices.CALCS)
+SIGNALS = list(choices.SIGNALS)
+# Arquivos .trendbin (formato binário compacto) são aceitos onde o XML é
+TREND_FILTER = "XML Files (*.xml);;Trend binário (*.trendbin)"
 STEPS = ["segundo", "minuto", "hora", "dia"]
 STEP_MAP = {
     "segundo": "second", 
@@ -22,6 +31,8 @@ STEP_MAP = {
     "hora": "hour", 
     "dia": "day"
 }
+AGGREGATIONS = {"média": "mean", "mínimo": "min", "máximo": "max", "primeiro": "first", "último": "last"}
+FILLS = {"não preencher": None, "manter último valor": "hold", "interpolação linear": "linear"}
 
 # ----------------------------
 # Helpers
@@ -31,10 +42,10 @@ def back_button(stack):
     btn.clicked.connect(lambda: stack.setCurrentIndex(0))
     return btn
 
-def default_output_path(prefix: str):
-    Path("./output/results").mkdir(parents=True, exist_ok=True)
+def default_output_path(prefix: str, folder: str = "results", suffix: str = ".xml"):
+    Path(f"./output/{folder}").mkdir(parents=True, exist_ok=True)
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return str(Path(f"./output/results/{prefix}_{ts}.xml").absolute())
+    return str(Path(f"./output/{folder}/{prefix}_{ts}{suffix}").absolute())
 
 def iso(dt_edit: QDateTimeEdit):
     return dt_edit.dateTime().toString(Qt.ISODate)
@@ -51,6 +62,453 @@ def create_file_selection(label_text, line_edit, button_text, callback):
     layout.addLayout(h_layout)
     return layout
 
+def spin_box(value, minimum=-999999, maximum=999999):
+    box = QDoubleSpinBox()
+    box.setRange(minimum, maximum)
+    box.setDecimals(5)
+    box.setValue(value)
+    return box
+
+def step_combo(default="minuto"):
+    """Passos fixos, ou qualquer intervalo digitado (ex.: 15s, 5min, 2h)."""
+    combo = QComboBox()
+    combo.setEditable(True)
+    combo.addItems(STEPS)
+    combo.setCurrentText(default)
+    combo.setToolTip("Escolha um passo ou digite um intervalo, ex.: 15s, 5min, 2h, 1d")
+    return combo
+
+def step_value(combo: QComboBox):
+    text = combo.currentText().strip()
+    return STEP_MAP.get(text, text)
+
+def labeled_row(*fields):
+    """Vários pares (rótulo, widget) lado a lado em uma linha."""
+    layout = QHBoxLayout()
+    for label_text, widget in fields:
+        layout.addWidget(QLabel(label_text))
+        layout.addWidget(widget)
+    return layout
+
+def parallel_parsing():
+    """Libera o pool de processos para ler exportações grandes (flatxml.WORKERS).
+
+    Só é seguro sob o `if __name__ == "__main__"` do aplicativo; fica para
+    depois da janela aparecer, pois carrega o numpy.
+    """
+    import os
+    import flatxml
+
+    flatxml.WORKERS = os.cpu_count() or 1
+
+def thousands(number):
+    return f"{number:,.0f}".replace(",", ".")
+
+# ----------------------------
+# Operações em segundo plano
+# ----------------------------
+class TaskSignals(QObject):
+    progress = pyqtSignal(object)   # progress.Progress a cada bloco processado
+    finished = pyqtSignal(object)   # Valor retornado pela função
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+class Task(QRunnable):
+    """Executa fn(*args, progress=..., **kwargs) no pool de threads compartilhado.
+
+    O callback de progresso repassa cada relatório para a interface e, se o
+    cancelamento foi pedido, interrompe a operação levantando Cancelled.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        # A instância Python é mantida pelo TaskPanel; o Qt não deve apagá-la
+        self.setAutoDelete(False)
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.signals = TaskSignals()
+        self._cancel = threading.Event()
+        # Com um caminho, a execução é perfilada (cProfile/tracemalloc) e o relatório salvo nele
+        self.profile_path = None
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _progress(self, progress):
+        from progress import Cancelled
+
+        if self._cancel.is_set():
+            raise Cancelled()
+        self.signals.progress.emit(progress)
+
+    def run(self):
+        from progress import Cancelled
+
+        try:
+            if self._cancel.is_set():
+                raise Cancelled()
+            if self.profile_path:
+                import instrument
+
+                with instrument.profile(self.profile_path):
+                    result = self.fn(*self.args, progress=self._progress, **self.kwargs)
+            else:
+                result = self.fn(*self.args, progress=self._progress, **self.kwargs)
+        except Cancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+class TaskPanel(QWidget):
+    """Barra de progresso, vazão e botão Cancelar de uma operação em segundo plano."""
+
+    busy = pyqtSignal(bool)
+    STAGES = {"read": "Lendo", "write": "Escrevendo"}
+    # Ligado pela caixa "relatório de desempenho" do menu; vale para todas as operações
+    profiling = False
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar { border: 2px solid #ddd; border-radius: 5px; text-align: center; }
+            QProgressBar::chunk { background-color: #3498db; }
+        """)
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.clicked.connect(self.cancel)
+
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.cancel_button)
+        self.task = None
+        self.setVisible(False)
+
+    def start(self, on_finished, fn, *args, **kwargs):
+        """Coloca fn no pool compartilhado; on_finished recebe o resultado na thread da interface."""
+        self.task = Task(fn, *args, **kwargs)
+        if TaskPanel.profiling:
+            self.task.profile_path = default_output_path(fn.__name__, "profiles", ".txt")
+        report = self.task.profile_path
+        self.task.signals.progress.connect(self.on_progress)
+        self.task.signals.finished.connect(lambda result: (
+            self.stop(f"Relatório de desempenho: {report}" if report else ""), on_finished(result)
+        ))
+        self.task.signals.error.connect(self.on_error)
+        self.task.signals.cancelled.connect(lambda: self.stop("Operação cancelada."))
+
+        self._stage = None
+        self._started = self._last = time.perf_counter()
+        self.progress_bar.setRange(0, 0)
+        self.status_label.setText("Iniciando...")
+        self.cancel_button.setEnabled(True)
+        self.setVisible(True)
+        self.busy.emit(True)
+        QThreadPool.globalInstance().start(self.task)
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelando...")
+
+    def on_progress(self, progress):
+        now = time.perf_counter()
+        if progress.stage != self._stage:
+            # A vazão é medida separadamente em cada etapa, a partir do fim da anterior
+            self._stage, self._started = progress.stage, self._last
+        self._last = now
+        if progress.fraction is None:
+            self.progress_bar.setRange(0, 0)
+        else:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(progress.fraction * 1000))
+
+        elapsed = max(now - self._started, 1e-6)
+        text = f"{self.STAGES.get(progress.stage, progress.stage)}: {thousands(progress.records)} registros"
+        text += f" · {thousands(progress.records / elapsed)} reg/s"
+        if progress.bytes_read:
+            text += f" · {progress.bytes_read / elapsed / 1e6:.1f} MB/s"
+        self.status_label.setText(text)
+
+    def on_error(self, message):
+        self.stop("")
+        QMessageBox.critical(self, "Erro", f"Ocorreu um erro:\n{message}")
+
+    def stop(self, message):
+        self.task = None
+        self.setVisible(bool(message))
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(0)
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(message)
+        self.busy.emit(False)
+
+class IntervalList(QWidget):
+    """Lista de intervalos aplicados juntos, em uma única leitura e escrita do arquivo.
+
+    `current` devolve (intervalo, descrição) a partir dos campos da página;
+    com a lista vazia, vale apenas esse intervalo atual.
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, current):
+        super().__init__()
+        self.current = current
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.list = QListWidget()
+        self.list.setMaximumHeight(110)
+        model = self.list.model()
+        for signal in (model.rowsInserted, model.rowsRemoved, model.modelReset):
+            signal.connect(self.changed)
+        add = QPushButton("Adicionar Intervalo à Lista")
+        add.clicked.connect(self.add)
+        remove = QPushButton("Remover Selecionado")
+        remove.clicked.connect(lambda: self.list.takeItem(self.list.currentRow()))
+        clear = QPushButton("Limpar")
+        clear.clicked.connect(self.list.clear)
+
+        buttons = QHBoxLayout()
+        for button in (add, remove, clear):
+            buttons.addWidget(button)
+        layout.addWidget(QLabel("Intervalos (vazio = apenas o intervalo acima):"))
+        layout.addWidget(self.list)
+        layout.addLayout(buttons)
+
+    def add(self):
+        interval, text = self.current()
+        item = QListWidgetItem(text)
+        item.setData(Qt.UserRole, interval)
+        self.list.addItem(item)
+
+    def intervals(self):
+        items = [self.list.item(row).data(Qt.UserRole) for row in range(self.list.count())]
+        return items or [self.current()[0]]
+
+def interval_text(start: QDateTimeEdit, end: QDateTimeEdit):
+    return f"{start.dateTime().toString('dd/MM/yyyy HH:mm:ss')} → {end.dateTime().toString('dd/MM/yyyy HH:mm:ss')}"
+
+# ----------------------------
+# Pré-visualização
+# ----------------------------
+def preview_data(trend, after=None, transform=None, intervals=(), zoom=False, buckets=800, progress=None):
+    """Executado no pool: aplica `transform` à trend, se dado, e calcula o que o gráfico desenha.
+
+    O gráfico recebe o envelope mínimo/máximo (decimate.minmax_envelope) da
+    janela de tempo visível, alguns pontos por pixel, em vez dos milhões de
+    registros da trend.
+    """
+    import numpy as np
+    from decimate import minmax_envelope
+
+    if transform is not None:
+        after = transform(trend)
+    spans = [(int(np.datetime64(start, "s").astype(np.int64)), int(np.datetime64(end, "s").astype(np.int64)))
+             for start, end in intervals]
+    if zoom and spans:
+        # Os intervalos e uma margem de metade da sua extensão de cada lado
+        first, last = min(start for start, _ in spans), max(end for _, end in spans)
+        margin = max((last - first) // 2, 60)
+        first, last = first - margin, last + margin
+    else:
+        shown = [t for t in (trend, after) if t is not None and len(t)]
+        first = min((int(t.times[0].astype(np.int64)) for t in shown), default=0)
+        last = max((int(t.times[-1].astype(np.int64)) for t in shown), default=0)
+    return {
+        "after": after,
+        "window": (first, last),
+        "spans": spans,
+        "before": minmax_envelope(trend, buckets, first, last),
+        "after_envelope": minmax_envelope(after, buckets, first, last) if after is not None else None,
+    }
+
+class TrendPlot(QWidget):
+    """Desenha o envelope de uma trend e, se houver, o resultado da operação por cima, com os intervalos destacados."""
+
+    MARGIN = 6
+    LABEL_HEIGHT = 14
+
+    def __init__(self, highlight_color):
+        super().__init__()
+        self.setMinimumHeight(170)
+        self.highlight_color = QColor(highlight_color)
+        self.highlight_color.setAlpha(60)
+        self.data = None
+        self.message = "Selecione um arquivo para visualizar a trend."
+
+    def show_data(self, data):
+        self.data = data
+        self.update()
+
+    def show_message(self, message):
+        self.data = None
+        self.message = message
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("white"))
+        painter.setPen(QColor("#dee2e6"))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        data = self.data or {}
+        envelopes = [e for e in (data.get("before"), data.get("after_envelope")) if e is not None]
+        if not any(len(e.times) for e in envelopes):
+            painter.setPen(QColor("#7f8c8d"))
+            painter.drawText(self.rect(), Qt.AlignCenter, self.message if self.data is None else "Nenhum registro neste trecho.")
+            return
+
+        import numpy as np
+
+        area = QRectF(self.rect()).adjusted(self.MARGIN, self.MARGIN + self.LABEL_HEIGHT, -self.MARGIN, -self.MARGIN - self.LABEL_HEIGHT)
+        first, last = self.data["window"]
+        span = max(last - first + 1, 1)
+        lows = np.concatenate([e.low for e in envelopes])
+        highs = np.concatenate([e.high for e in envelopes])
+        bottom, top = (float(np.nanmin(lows)), float(np.nanmax(highs))) if not np.isnan(lows).all() else (0.0, 1.0)
+        if top == bottom:
+            bottom, top = bottom - 1, top + 1
+
+        def x(seconds):
+            return area.left() + (seconds - first) / span * area.width()
+
+        def y(value):
+            return area.bottom() - (value - bottom) / (top - bottom) * area.height()
+
+        after = self.data["after_envelope"]
+        colors = [QColor("#bdc3c7") if after is not None else QColor("#3498db"), QColor("#27ae60")]
+        for envelope, color in zip((self.data["before"], after), colors):
+            if envelope is None:
+                continue
+            painter.setPen(QPen(color, 1))
+            # Cada balde vira um traço vertical do mínimo ao máximo, ligado ao
+            # seguinte; baldes só com NaN interrompem a linha
+            points = QPolygonF()
+            for seconds, low, high in zip(envelope.times.tolist(), envelope.low.tolist(), envelope.high.tolist()):
+                if low != low:
+                    painter.drawPolyline(points)
+                    points = QPolygonF()
+                    continue
+                points.append(QPointF(x(seconds), y(high)))
+                points.append(QPointF(x(seconds), y(low)))
+            painter.drawPolyline(points)
+
+        # Os intervalos por cima das linhas, translúcidos, para não sumirem sob trends densas
+        for start, end in self.data["spans"]:
+            left, right = max(x(start), area.left()), min(x(end + 1), area.right())
+            if right >= left:
+                painter.fillRect(QRectF(left, area.top(), max(right - left, 1.0), area.height()), self.highlight_color)
+
+        painter.setPen(QColor("#2c3e50"))
+        label = QRectF(self.MARGIN, self.MARGIN, self.width() - 2 * self.MARGIN, self.LABEL_HEIGHT)
+        painter.drawText(label, Qt.AlignLeft | Qt.AlignVCenter, f"máx {top:g}")
+        if after is not None:
+            painter.drawText(label, Qt.AlignRight | Qt.AlignVCenter, "cinza: antes · verde: depois")
+        label.moveTop(self.height() - self.MARGIN - self.LABEL_HEIGHT)
+        start_text, end_text = (str(np.datetime64(t, "s")).replace("T", " ") for t in (first, last))
+        painter.drawText(label, Qt.AlignLeft | Qt.AlignVCenter, f"{start_text}  (mín {bottom:g})")
+        painter.drawText(label, Qt.AlignRight | Qt.AlignVCenter, end_text)
+
+class PreviewPanel(QWidget):
+    """Gráfico da trend de entrada, com os intervalos da página destacados e o resultado antes de salvar.
+
+    O arquivo é lido em segundo plano por load_trend, que o guarda no cache:
+    ao salvar, a operação não o lê de novo. O envelope desenhado e o
+    resultado da pré-visualização também são calculados no pool de threads,
+    e resultados que chegam depois de uma mudança mais recente são descartados.
+    `transform` devolve, a partir dos campos da página, a função que aplica a operação a uma trend.
+    """
+
+    def __init__(self, highlight_color, transform):
+        super().__init__()
+        self.transform = transform
+        self.trend = self.after = None
+        self.path = None
+        self.intervals = []
+        self._generation = 0
+        self._tasks = set()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.plot = TrendPlot(highlight_color)
+        self.zoom = QCheckBox("Ampliar nos intervalos")
+        self.zoom.toggled.connect(lambda _: self.refresh())
+        self.compare = QPushButton("Pré-visualizar Resultado")
+        self.compare.setEnabled(False)
+        self.compare.clicked.connect(lambda: self.refresh(self.transform()))
+        self.status = QLabel("")
+        self.loader = TaskPanel()
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.zoom)
+        controls.addWidget(self.compare)
+        layout.addWidget(self.plot)
+        layout.addLayout(controls)
+        layout.addWidget(self.status)
+        layout.addWidget(self.loader)
+
+    def load(self, path):
+        if not path or path == self.path:
+            return
+        from tools import load_trend
+
+        self.path, self.trend, self.after = path, None, None
+        self.compare.setEnabled(False)
+        self.status.setText("")
+        self.plot.show_message("Lendo o arquivo...")
+        self.loader.start(lambda trend, path=path: self.on_loaded(path, trend), load_trend, path)
+
+    def on_loaded(self, path, trend):
+        # Um arquivo escolhido depois deste já o substituiu
+        if path != self.path:
+            return
+        self.trend = trend
+        self.compare.setEnabled(True)
+        self.refresh()
+
+    def set_intervals(self, intervals):
+        """Intervalos (início, fim) em ISO a destacar; o resultado anterior deixa de valer."""
+        self.intervals = list(intervals)
+        self.after = None
+        self.refresh()
+
+    def refresh(self, transform=None):
+        if self.trend is None:
+            return
+        self._generation += 1
+        generation = self._generation
+        task = Task(preview_data, self.trend, self.after, transform, self.intervals, self.zoom.isChecked(),
+                    max(self.plot.width(), 200))
+        self._tasks.add(task)
+        task.signals.finished.connect(lambda data: (self._tasks.discard(task), self.on_data(generation, data, transform)))
+        task.signals.error.connect(lambda message: (self._tasks.discard(task), self.on_error(generation, message)))
+        if transform is not None:
+            self.status.setText("Calculando o resultado...")
+        QThreadPool.globalInstance().start(task)
+
+    def on_data(self, generation, data, transform):
+        if generation != self._generation:
+            return
+        if transform is not None:
+            self.after = data["after"]
+        self.plot.show_data(data)
+        text = f"{thousands(len(self.trend))} registros · {thousands(data['before'].records)} no gráfico"
+        if self.after is not None:
+            text += f" · depois da operação: {thousands(len(self.after))} registros"
+        self.status.setText(text)
+
+    def on_error(self, generation, message):
+        if generation == self._generation:
+            self.status.setText(f"Erro na pré-visualização: {message}")
+
 class LandingPage(QWidget):
     def __init__(self, stack):
         super().__init__()
@@ -65,7 +523,7 @@ class LandingPage(QWidget):
 
         # 2. Ícone Central
         self.logo = QLabel()
-        pixmap = QPixmap("./icons/xml-icon.png")
+        pixmap = QPixmap(ICON_PATH)
         
         # Redimensiona a imagem para ser um destaque (ex: 150x150)
         if not pixmap.isNull():
@@ -85,6 +543,8 @@ class LandingPage(QWidget):
             ("Converter Excel → XML", 2),
             ("Modificar Trend Existente", 3),
             ("Deletar Intervalo de Dados", 4),
+            ("Reamostrar Trend", 5),
+            ("Sessão de Edição (desfazer/refazer)", 6),
         ]
 
         for text, idx in actions:
@@ -94,6 +554,12 @@ class LandingPage(QWidget):
             btn.clicked.connect(lambda _, i=idx: stack.setCurrentIndex(i))
             layout.addWidget(btn)
 
+        # 5. Diagnóstico: cada operação grava um relatório cProfile/tracemalloc em output/profiles
+        profiling = QCheckBox("Gerar relatório de desempenho das operações")
+        profiling.setChecked(TaskPanel.profiling)
+        profiling.toggled.connect(lambda checked: setattr(TaskPanel, "profiling", checked))
+        layout.addWidget(profiling)
+
         self.setLayout(layout)
 
 class GenerateXMLPage(QWidget):
@@ -110,10 +576,18 @@ class GenerateXMLPage(QWidget):
         self.start_dt.setDisplayFormat("dd/MM/yyyy HH:mm:ss")
         self.end_dt.setDisplayFormat("dd/MM/yyyy HH:mm:ss")
 
-        self.step = QComboBox(); self.step.addItems(STEPS)
-        self.calc = QComboBox(); self.calc.addItems(CALC_METHODS)
+        self.step = step_combo()
+        self.calc = QComboBox(); self.calc.addItems(SIGNALS)
         self.output_path = QLineEdit(default_output_path("gerado"))
 
+        # Parâmetros do sinal; os valores padrão reproduzem o cálculo puro
+        self.amplitude = spin_box(1)
+        self.offset = spin_box(0)
+        self.period = spin_box(0, minimum=0)
+        self.noise = spin_box(0, minimum=0)
+        self.ramp_start = spin_box(0)
+        self.ramp_end = spin_box(1)
+
         layout.addWidget(QLabel("Início:"))
         layout.addWidget(self.start_dt)
         layout.addWidget(QLabel("Fim:"))
@@ -122,6 +596,9 @@ class GenerateXMLPage(QWidget):
         layout.addWidget(self.step)
         layout.addWidget(QLabel("Cálculo:"))
         layout.addWidget(self.calc)
+        layout.addLayout(labeled_row(("Amplitude:", self.amplitude), ("Offset:", self.offset)))
+        layout.addLayout(labeled_row(("Período (amostras, 0 = nenhum):", self.period), ("Ruído (desvio padrão):", self.noise)))
+        layout.addLayout(labeled_row(("Rampa de:", self.ramp_start), ("até:", self.ramp_end)))
         
         layout.addLayout(create_file_selection("Salvar Resultado Em:", self.output_path, "Alterar Destino", self.browse))
 
@@ -129,39 +606,34 @@ class GenerateXMLPage(QWidget):
         run.setStyleSheet("background-color: #2ecc71; color: white; font-weight: bold;")
         run.clicked.connect(self.run)
         layout.addWidget(run)
+        self.task_panel = TaskPanel()
+        self.task_panel.busy.connect(run.setDisabled)
+        layout.addWidget(self.task_panel)
         self.setLayout(layout)
 
     def browse(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Salvar XML", self.output_path.text(), "XML Files (*.xml)")
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar XML", self.output_path.text(), TREND_FILTER)
         if path: self.output_path.setText(path)
 
     def run(self):
-        generate_xml(
+        # tools (e numpy) só são carregados quando uma operação é executada
+        from tools import generate_xml
+
+        self.task_panel.start(
+            lambda _: QMessageBox.information(self, "Sucesso", "XML gerado com sucesso!"),
+            generate_xml,
             start_date=iso(self.start_dt),
             end_date=iso(self.end_dt),
-            step=STEP_MAP[self.step.currentText()],
+            step=step_value(self.step),
             calc=self.calc.currentText(),
             file_path=self.output_path.text(),
+            amplitude=self.amplitude.value(),
+            offset=self.offset.value(),
+            period=self.period.value() or None,
+            noise=self.noise.value(),
+            ramp_start=self.ramp_start.value(),
+            ramp_end=self.ramp_end.value(),
         )
-        QMessageBox.information(self, "Sucesso", "XML gerado com sucesso!")
-
-class ConversionWorker(QThread):
-    finished = pyqtSignal(str)  # Sinal para quando terminar
-    error = pyqtSignal(str)     # Sinal para caso de erro
-
-    def __init__(self, input_path, output_path):
-        super().__init__()
-
-        self.input_path = input_path
-        self.output_path = output_path
-
-    def run(self):
-        try:
-            # Chama sua função do backend
-            convert_to_xml(self.input_path, self.output_path)
-            self.finished.emit(self.output_path)
-        except Exception as e:
-            self.error.emit(str(e))
 
 class ConvertExcelPage(QWidget):
     def __init__(self, stack):
@@ -189,64 +661,37 @@ class ConvertExcelPage(QWidget):
         self.input_path.setPlaceholderText("Selecione o arquivo .xlsx...")
         layout.addLayout(create_file_selection("Origem:", self.input_path, "Procurar", self.browse_in))
 
-        # Barra de Progresso (Invisível por padrão)
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 0) # Estilo "Indeterminado/Loading"
-        self.progress_bar.setVisible(False)
-        self.progress_bar.setStyleSheet("""
-            QProgressBar { border: 2px solid #ddd; border-radius: 5px; text-align: center; }
-            QProgressBar::chunk { background-color: #3498db; }
-        """)
-        layout.addWidget(self.progress_bar)
-
-        self.status_label = QLabel("")
-        self.status_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(self.status_label)
+        # Progresso, vazão e cancelamento (invisível por padrão)
+        self.task_panel = TaskPanel()
+        layout.addWidget(self.task_panel)
 
         # Botão de Ação
         self.btn_run = QPushButton("Iniciar Conversão")
         self.btn_run.setMinimumHeight(45)
         self.btn_run.setStyleSheet("background-color: #3498db; color: white; font-weight: bold;")
         self.btn_run.clicked.connect(self.start_conversion)
+        self.task_panel.busy.connect(self.btn_run.setDisabled)
         
         layout.addWidget(self.btn_run)
         layout.addStretch()
         self.setLayout(layout)
 
     def browse_in(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Abrir Excel", "", "Excel Files (*.xlsx *.xls)")
+        path, _ = QFileDialog.getOpenFileName(self, "Abrir Planilha", "", "Planilhas (*.xlsx *.xls *.csv *.parquet)")
         if path: self.input_path.setText(path)
 
     def start_conversion(self):
         if not self.input_path.text():
             return QMessageBox.warning(self, "Erro", "Selecione um arquivo!")
 
-        # 1. Preparar Interface
-        self.btn_run.setEnabled(False)
-        self.progress_bar.setVisible(True)
-        self.status_label.setText("Processando planilha pesada... aguarde.")
-        dest = default_output_path("excel_import")
+        from tools import convert_to_xml
 
-        # 2. Configurar Thread
-        self.worker = ConversionWorker(self.input_path.text(), dest)
-        self.worker.finished.connect(self.on_finished)
-        self.worker.error.connect(self.on_error)
-        
-        # 3. Iniciar
-        self.worker.start()
+        dest = default_output_path("excel_import")
+        self.task_panel.start(self.on_finished, convert_to_xml, self.input_path.text(), dest)
 
     def on_finished(self, dest):
-        self.btn_run.setEnabled(True)
-        self.progress_bar.setVisible(False)
-        self.status_label.setText("")
         QMessageBox.information(self, "Sucesso", f"Conversão concluída!\nSalvo em: {dest}")
 
-    def on_error(self, message):
-        self.btn_run.setEnabled(True)
-        self.progress_bar.setVisible(False)
-        self.status_label.setText("")
-        QMessageBox.critical(self, "Erro na Conversão", f"Ocorreu um erro:\n{message}")
-
 class ModifyTrendPage(QWidget):
     def __init__(self, stack):
         super().__init__()
@@ -263,9 +708,12 @@ class ModifyTrendPage(QWidget):
 
         self.mode = QComboBox(); self.mode.addItems(["valor_constante"] + CALC_METHODS)
         self.constant = QDoubleSpinBox(); self.constant.setRange(-999999, 999999)
+        self.step = step_combo()
         self.output_path = QLineEdit(default_output_path("modificado"))
 
         layout.addLayout(create_file_selection("Arquivo XML Original:", self.input_path, "Procurar XML", self.browse_in))
+        self.preview = PreviewPanel("#f39c12", self.preview_transform)
+        layout.addWidget(self.preview)
         layout.addWidget(QLabel("Início do Intervalo:"))
         layout.addWidget(self.range_start)
         layout.addWidget(QLabel("Fim do Intervalo:"))
@@ -274,34 +722,69 @@ class ModifyTrendPage(QWidget):
         layout.addWidget(self.mode)
         layout.addWidget(QLabel("Valor Constante (se aplicável):"))
         layout.addWidget(self.constant)
+        layout.addWidget(QLabel("Frequência dos Novos Registros (Passo):"))
+        layout.addWidget(self.step)
+        self.interval_list = IntervalList(self.current_interval)
+        layout.addWidget(self.interval_list)
         layout.addLayout(create_file_selection("Salvar Novo Arquivo Como:", self.output_path, "Alterar Destino", self.browse_out))
 
+        # O gráfico acompanha o arquivo, os intervalos e a modificação escolhida
+        self.input_path.editingFinished.connect(lambda: self.preview.load(self.input_path.text()))
+        for signal in (self.range_start.dateTimeChanged, self.range_end.dateTimeChanged, self.mode.currentTextChanged,
+                       self.constant.valueChanged, self.step.currentTextChanged, self.interval_list.changed):
+            signal.connect(self.update_preview)
+        self.update_preview()
+
         run = QPushButton("Aplicar e Salvar")
         run.clicked.connect(self.run)
         layout.addWidget(run)
+        self.task_panel = TaskPanel()
+        self.task_panel.busy.connect(run.setDisabled)
+        layout.addWidget(self.task_panel)
         self.setLayout(layout)
 
     def browse_in(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Selecionar XML de Origem", "", "XML Files (*.xml)")
-        if path: self.input_path.setText(path)
+        path, _ = QFileDialog.getOpenFileName(self, "Selecionar XML de Origem", "", TREND_FILTER)
+        if path:
+            self.input_path.setText(path)
+            self.preview.load(path)
 
     def browse_out(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Destino do XML Modificado", self.output_path.text(), "XML Files (*.xml)")
+        path, _ = QFileDialog.getSaveFileName(self, "Destino do XML Modificado", self.output_path.text(), TREND_FILTER)
         if path: self.output_path.setText(path)
 
+    def update_preview(self, *_):
+        self.preview.set_intervals([(i["range_start"], i["range_end"]) for i in self.interval_list.intervals()])
+
+    def preview_transform(self):
+        from tools import modify_intervals
+
+        intervals, step = self.interval_list.intervals(), step_value(self.step)
+        return lambda trend: modify_intervals(trend, intervals, step)
+
+    def current_interval(self):
+        # Cada intervalo guarda seu próprio tipo de modificação e passo
+        interval = {"range_start": iso(self.range_start), "range_end": iso(self.range_end), "step": step_value(self.step)}
+        if self.mode.currentText() == "valor_constante":
+            interval["constant_value"] = self.constant.value()
+            text = f"constante {self.constant.value():g}"
+        else:
+            interval["calc"] = self.mode.currentText()
+            text = self.mode.currentText()
+        return interval, f"{interval_text(self.range_start, self.range_end)}: {text}, a cada {self.step.currentText()}"
+
     def run(self):
         if not self.input_path.text(): return QMessageBox.warning(self, "Erro", "Selecione o arquivo de entrada!")
-        
-        modify_existing_trend(
+        from tools import modify_existing_trend
+
+        self.task_panel.start(
+            lambda _: QMessageBox.information(self, "Sucesso", "Arquivo modificado com sucesso!"),
+            modify_existing_trend,
             input_file=self.input_path.text(),
-            range_start=iso(self.range_start),
-            range_end=iso(self.range_end),
-            step="minute",
-            constant_value=self.constant.value() if self.mode.currentText() == "valor_constante" else None,
-            calc=None if self.mode.currentText() == "valor_constante" else self.mode.currentText(),
+            intervals=self.interval_list.intervals(),
+            step=step_value(self.step),
             output_file=self.output_path.text(),
         )
-        QMessageBox.information(self, "Sucesso", "Arquivo modificado com sucesso!")
 
 class DeleteTrendPage(QWidget):
     def __init__(self, stack):
@@ -320,34 +803,380 @@ class DeleteTrendPage(QWidget):
         self.output_path = QLineEdit(default_output_path("deletado"))
 
         layout.addLayout(create_file_selection("Arquivo XML Original:", self.input_path, "Procurar XML", self.browse_in))
+        self.preview = PreviewPanel("#e74c3c", self.preview_transform)
+        layout.addWidget(self.preview)
         layout.addWidget(QLabel("Início da Deleção:"))
         layout.addWidget(self.range_start)
         layout.addWidget(QLabel("Fim da Deleção:"))
         layout.addWidget(self.range_end)
+        self.interval_list = IntervalList(self.current_interval)
+        layout.addWidget(self.interval_list)
         layout.addLayout(create_file_selection("Salvar Resultado Em:", self.output_path, "Alterar Destino", self.browse_out))
 
+        self.input_path.editingFinished.connect(lambda: self.preview.load(self.input_path.text()))
+        for signal in (self.range_start.dateTimeChanged, self.range_end.dateTimeChanged, self.interval_list.changed):
+            signal.connect(self.update_preview)
+        self.update_preview()
+
         run = QPushButton("Remover Dados")
         run.setStyleSheet("background-color: #e74c3c; color: white;")
         run.clicked.connect(self.run)
         layout.addWidget(run)
+        self.task_panel = TaskPanel()
+        self.task_panel.busy.connect(run.setDisabled)
+        layout.addWidget(self.task_panel)
+        self.setLayout(layout)
+
+    def browse_in(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Selecionar XML de Origem", "", TREND_FILTER)
+        if path:
+            self.input_path.setText(path)
+            self.preview.load(path)
+
+    def browse_out(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Destino do XML", self.output_path.text(), TREND_FILTER)
+        if path: self.output_path.setText(path)
+
+    def update_preview(self, *_):
+        self.preview.set_intervals([(i["range_start"], i["range_end"]) for i in self.interval_list.intervals()])
+
+    def preview_transform(self):
+        from tools import delete_intervals
+
+        intervals = self.interval_list.intervals()
+        return lambda trend: delete_intervals(trend, intervals)
+
+    def current_interval(self):
+        interval = {"range_start": iso(self.range_start), "range_end": iso(self.range_end)}
+        return interval, interval_text(self.range_start, self.range_end)
+
+    def run(self):
+        if not self.input_path.text(): return QMessageBox.warning(self, "Erro", "Selecione o arquivo de entrada!")
+        from tools import delete_existing_trend
+
+        self.task_panel.start(
+            lambda _: QMessageBox.information(self, "Sucesso", "Intervalo removido com sucesso!"),
+            delete_existing_trend,
+            input_file=self.input_path.text(),
+            intervals=self.interval_list.intervals(),
+            output_file=self.output_path.text(),
+        )
+
+class ResampleTrendPage(QWidget):
+    def __init__(self, stack):
+        super().__init__()
+        layout = QVBoxLayout()
+        layout.addWidget(back_button(stack))
+        layout.addWidget(QLabel("<h3>Reamostrar Trend</h3>"))
+
+        self.input_path = QLineEdit()
+        self.interval = step_combo()
+        self.how = QComboBox(); self.how.addItems(AGGREGATIONS)
+        self.fill = QComboBox(); self.fill.addItems(FILLS)
+        self.output_path = QLineEdit(default_output_path("reamostrado"))
+
+        layout.addLayout(create_file_selection("Arquivo XML Original:", self.input_path, "Procurar XML", self.browse_in))
+        layout.addWidget(QLabel("Novo Intervalo entre Registros:"))
+        layout.addWidget(self.interval)
+        layout.addWidget(QLabel("Valor de Cada Intervalo:"))
+        layout.addWidget(self.how)
+        layout.addWidget(QLabel("Intervalos sem Registros:"))
+        layout.addWidget(self.fill)
+        layout.addLayout(create_file_selection("Salvar Resultado Em:", self.output_path, "Alterar Destino", self.browse_out))
+
+        run = QPushButton("Reamostrar e Salvar")
+        run.clicked.connect(self.run)
+        layout.addWidget(run)
+        self.task_panel = TaskPanel()
+        self.task_panel.busy.connect(run.setDisabled)
+        layout.addWidget(self.task_panel)
+        layout.addStretch()
         self.setLayout(layout)
 
     def browse_in(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Selecionar XML de Origem", "", "XML Files (*.xml)")
+        path, _ = QFileDialog.getOpenFileName(self, "Selecionar XML de Origem", "", TREND_FILTER)
         if path: self.input_path.setText(path)
 
     def browse_out(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Destino do XML", self.output_path.text(), "XML Files (*.xml)")
+        path, _ = QFileDialog.getSaveFileName(self, "Destino do XML", self.output_path.text(), TREND_FILTER)
         if path: self.output_path.setText(path)
 
     def run(self):
-        delete_existing_trend(
+        if not self.input_path.text(): return QMessageBox.warning(self, "Erro", "Selecione o arquivo de entrada!")
+        from tools import resample_existing_trend
+
+        self.task_panel.start(
+            lambda _: QMessageBox.information(self, "Sucesso", "Trend reamostrada com sucesso!"),
+            resample_existing_trend,
             input_file=self.input_path.text(),
-            range_start=iso(self.range_start),
-            range_end=iso(self.range_end),
+            interval=step_value(self.interval),
+            how=AGGREGATIONS[self.how.currentText()],
+            fill=FILLS[self.fill.currentText()],
             output_file=self.output_path.text(),
         )
-        QMessageBox.information(self, "Sucesso", "Intervalo removido com sucesso!")
+
+# ----------------------------
+# Sessão de edição
+# ----------------------------
+def session_view(session, intervals=(), zoom=False, buckets=800, progress=None):
+    """Executado no pool: o que o gráfico da sessão desenha, como preview_data.
+
+    O envelope vem de EditSession.envelope, que só recalcula os trechos
+    alterados desde o último desenho.
+    """
+    import numpy as np
+
+    spans = [(int(np.datetime64(start, "s").astype(np.int64)), int(np.datetime64(end, "s").astype(np.int64)))
+             for start, end in intervals]
+    pieces = session.pieces
+    if zoom and spans:
+        first, last = min(start for start, _ in spans), max(end for _, end in spans)
+        margin = max((last - first) // 2, 60)
+        first, last = first - margin, last + margin
+    elif pieces:
+        first, last = int(pieces[0].times[0].astype(np.int64)), int(pieces[-1].times[-1].astype(np.int64))
+    else:
+        first = last = 0
+    return {
+        "window": (first, last),
+        "spans": spans,
+        "before": session.envelope(buckets, np.datetime64(first, "s"), np.datetime64(last, "s")),
+        "after_envelope": None,
+    }
+
+def apply_edit(session, operation, progress=None):
+    """Executado no pool: aplica uma operação à sessão (só o trecho afetado é refeito)."""
+    return session.apply(operation)
+
+def open_session(path, journal=None, progress=None):
+    """Executado no pool: carrega o arquivo em uma sessão e, se dado, reaplica um diário salvo."""
+    from session import EditSession, load_journal
+
+    session = EditSession.open(path, progress)
+    if journal:
+        session.replay(load_journal(journal)["operations"], progress)
+    return session
+
+def operation_text(operation):
+    intervals = operation.get("intervals") or [(operation["range_start"], operation["range_end"])]
+    spans = "; ".join(
+        " → ".join(str(bound).replace("T", " ") for bound in
+                   ((i["range_start"], i["range_end"]) if isinstance(i, dict) else i))
+        for i in intervals
+    )
+    if operation["op"] == "delete":
+        return f"deletar {spans}"
+    if operation.get("constant_value") is not None:
+        return f"modificar {spans}: constante {operation['constant_value']:g}, a cada {operation.get('step', 'minute')}"
+    return f"modificar {spans}: {operation.get('calc')}, a cada {operation.get('step', 'minute')}"
+
+class EditSessionPage(QWidget):
+    """Várias deleções e modificações sobre uma trend lida uma única vez, com desfazer/refazer.
+
+    Cada operação refaz só o trecho que altera (session.EditSession); o
+    arquivo de saída é gravado uma vez, ao exportar. O diário de operações
+    pode ser salvo e reaplicado a uma nova exportação da mesma trend.
+    """
+
+    def __init__(self, stack):
+        super().__init__()
+        layout = QVBoxLayout()
+        layout.addWidget(back_button(stack))
+        layout.addWidget(QLabel("<h3>Sessão de Edição</h3>"))
+
+        self.session = None
+        self._generation = 0
+        self._tasks = set()
+        self.input_path = QLineEdit()
+        self.range_start = QDateTimeEdit(QDateTime.currentDateTime())
+        self.range_end = QDateTimeEdit(QDateTime.currentDateTime())
+        self.range_start.setDisplayFormat("dd/MM/yyyy HH:mm:ss")
+        self.range_end.setDisplayFormat("dd/MM/yyyy HH:mm:ss")
+        self.mode = QComboBox(); self.mode.addItems(["deletar", "valor_constante"] + CALC_METHODS)
+        self.constant = QDoubleSpinBox(); self.constant.setRange(-999999, 999999)
+        self.step = step_combo()
+        self.output_path = QLineEdit(default_output_path("sessao"))
+
+        layout.addLayout(create_file_selection("Arquivo XML Original:", self.input_path, "Procurar XML", self.browse_in))
+        self.plot = TrendPlot("#8e44ad")
+        self.zoom = QCheckBox("Ampliar no intervalo")
+        self.zoom.toggled.connect(lambda _: self.refresh())
+        self.status = QLabel("")
+        layout.addWidget(self.plot)
+        layout.addWidget(self.zoom)
+        layout.addWidget(self.status)
+        layout.addLayout(labeled_row(("Início:", self.range_start), ("Fim:", self.range_end)))
+        layout.addLayout(labeled_row(("Operação:", self.mode), ("Constante:", self.constant)))
+        layout.addLayout(labeled_row(("Passo dos novos registros:", self.step)))
+        self.apply_button = QPushButton("Aplicar à Sessão")
+        self.apply_button.clicked.connect(self.apply)
+        layout.addWidget(self.apply_button)
+
+        layout.addWidget(QLabel("Diário de operações:"))
+        self.journal = QListWidget()
+        self.journal.setMaximumHeight(110)
+        layout.addWidget(self.journal)
+        self.undo_button = QPushButton("Desfazer")
+        self.undo_button.clicked.connect(self.undo)
+        self.redo_button = QPushButton("Refazer")
+        self.redo_button.clicked.connect(self.redo)
+        save = QPushButton("Salvar Diário")
+        save.clicked.connect(self.save_journal)
+        replay = QPushButton("Reaplicar Diário")
+        replay.setToolTip("Carrega o arquivo acima e aplica a ele as operações de um diário salvo")
+        replay.clicked.connect(self.replay_journal)
+        buttons = QHBoxLayout()
+        for button in (self.undo_button, self.redo_button, save, replay):
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+
+        layout.addLayout(create_file_selection("Exportar Para:", self.output_path, "Alterar Destino", self.browse_out))
+        self.export_button = QPushButton("Exportar")
+        self.export_button.setStyleSheet("background-color: #8e44ad; color: white; font-weight: bold;")
+        self.export_button.clicked.connect(self.export)
+        layout.addWidget(self.export_button)
+        self.task_panel = TaskPanel()
+        self.task_panel.busy.connect(self.on_busy)
+        layout.addWidget(self.task_panel)
+        self.setLayout(layout)
+
+        self.input_path.editingFinished.connect(lambda: self.load(self.input_path.text()))
+        for signal in (self.range_start.dateTimeChanged, self.range_end.dateTimeChanged):
+            signal.connect(lambda _: self.refresh())
+        self.update_controls()
+
+    def browse_in(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Selecionar XML de Origem", "", TREND_FILTER)
+        if path:
+            self.input_path.setText(path)
+            self.load(path)
+
+    def browse_out(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Destino do XML", self.output_path.text(), TREND_FILTER)
+        if path: self.output_path.setText(path)
+
+    def load(self, path, journal=None):
+        if not path or (journal is None and self.session is not None and self.session.source == str(Path(path).resolve())):
+            return
+        self.session = None
+        self.update_controls()
+        self.plot.show_message("Lendo o arquivo...")
+        self.task_panel.start(self.on_session, open_session, path, journal)
+
+    def on_session(self, session):
+        self.session = session
+        self.update_controls()
+
+    def current_operation(self):
+        operation = {"range_start": iso(self.range_start), "range_end": iso(self.range_end)}
+        if self.mode.currentText() == "deletar":
+            return {"op": "delete", **operation}
+        operation = {"op": "modify", **operation, "step": step_value(self.step)}
+        if self.mode.currentText() == "valor_constante":
+            operation["constant_value"] = self.constant.value()
+        else:
+            operation["calc"] = self.mode.currentText()
+        return operation
+
+    def apply(self):
+        if self.session is None: return QMessageBox.warning(self, "Erro", "Selecione o arquivo de entrada!")
+        self.task_panel.start(lambda _: self.update_controls(), apply_edit, self.session, self.current_operation())
+
+    def undo(self):
+        if self.session is not None and self.session.undo() is not None:
+            self.update_controls()
+
+    def redo(self):
+        if self.session is not None and self.session.redo() is not None:
+            self.update_controls()
+
+    def save_journal(self):
+        if self.session is None: return QMessageBox.warning(self, "Erro", "Selecione o arquivo de entrada!")
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar Diário", default_output_path("diario", "journals", ".json"),
+                                              "Diário (*.json)")
+        if path:
+            self.session.save_journal(path)
+            self.status.setText(f"Diário salvo em: {path}")
+
+    def replay_journal(self):
+        if not self.input_path.text(): return QMessageBox.warning(self, "Erro", "Selecione o arquivo de entrada!")
+        path, _ = QFileDialog.getOpenFileName(self, "Reaplicar Diário", "", "Diário (*.json)")
+        if path:
+            self.load(self.input_path.text(), path)
+
+    def export(self):
+        if self.session is None: return QMessageBox.warning(self, "Erro", "Selecione o arquivo de entrada!")
+        self.task_panel.start(
+            lambda _: QMessageBox.information(self, "Sucesso", "Trend exportada com sucesso!"),
+            self.session.export,
+            self.output_path.text(),
+        )
+
+    def on_busy(self, busy):
+        # A sessão não muda enquanto uma operação está em andamento
+        session = None if busy else self.session
+        for button in (self.apply_button, self.export_button):
+            button.setDisabled(busy)
+        self.undo_button.setEnabled(session is not None and session.can_undo)
+        self.redo_button.setEnabled(session is not None and session.can_redo)
+
+    def update_controls(self):
+        """Diário, botões e gráfico de acordo com o estado atual da sessão."""
+        session = self.session
+        self.on_busy(self.task_panel.task is not None)
+        self.journal.clear()
+        if session is None:
+            return
+        for operation in session.journal:
+            self.journal.addItem(operation_text(operation))
+        self.journal.scrollToBottom()
+        self.refresh()
+
+    def refresh(self):
+        if self.session is None:
+            return
+        self._generation += 1
+        generation = self._generation
+        intervals = [(iso(self.range_start), iso(self.range_end))]
+        task = Task(session_view, self.session, intervals, self.zoom.isChecked(), max(self.plot.width(), 200))
+        self._tasks.add(task)
+        task.signals.finished.connect(lambda data: (self._tasks.discard(task), self.on_data(generation, data)))
+        task.signals.error.connect(lambda message: (self._tasks.discard(task), self.on_error(generation, message)))
+        QThreadPool.globalInstance().start(task)
+
+    def on_data(self, generation, data):
+        if generation != self._generation or self.session is None:
+            return
+        self.plot.show_data(data)
+        self.status.setText(
+            f"{thousands(len(self.session))} registros · {thousands(data['before'].records)} no gráfico · "
+            f"{len(self.session.journal)} operação(ões) no diário"
+        )
+
+    def on_error(self, generation, message):
+        if generation == self._generation:
+            self.status.setText(f"Erro no gráfico: {message}")
+
+class LazyStackedWidget(QStackedWidget):
+    """QStackedWidget que só constrói cada página na primeira navegação até ela."""
+
+    def __init__(self):
+        super().__init__()
+        self._factories = {}
+
+    def addLazyWidget(self, factory):
+        index = self.addWidget(QWidget())
+        self._factories[index] = factory
+        return index
+
+    def setCurrentIndex(self, index):
+        factory = self._factories.pop(index, None)
+        if factory is not None:
+            placeholder = self.widget(index)
+            self.insertWidget(index, factory(self))
+            self.removeWidget(placeholder)
+            placeholder.deleteLater()
+        super().setCurrentIndex(index)
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -355,16 +1184,19 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Ferramenta de Trends XML - v2.0")
         
         # Define o ícone da barra de título
-        self.setWindowIcon(QIcon("./icons/xml-icon.png"))
+        self.setWindowIcon(QIcon(ICON_PATH))
         
         self.resize(520, 600)
 
-        stack = QStackedWidget()
+        # Só o menu é construído na abertura; as demais páginas, ao serem acessadas
+        stack = LazyStackedWidget()
         stack.addWidget(LandingPage(stack))
-        stack.addWidget(GenerateXMLPage(stack))
-        stack.addWidget(ConvertExcelPage(stack))
-        stack.addWidget(ModifyTrendPage(stack))
-        stack.addWidget(DeleteTrendPage(stack))
+        stack.addLazyWidget(GenerateXMLPage)
+        stack.addLazyWidget(ConvertExcelPage)
+        stack.addLazyWidget(ModifyTrendPage)
+        stack.addLazyWidget(DeleteTrendPage)
+        stack.addLazyWidget(ResampleTrendPage)
+        stack.addLazyWidget(EditSessionPage)
 
         self.setCentralWidget(stack)
 
@@ -372,4 +1204,5 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    QTimer.singleShot(0, parallel_parsing)
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""Apply a list of edits to many trend files in parallel.
+
+A job manifest is a JSON file such as:
+
+    {
+      "jobs": [
+        {
+          "input": "input/ahu1.xml",
+          "output": "output/results/ahu1.xml",
+          "locale": "source",
+          "operations": [
+            {"op": "delete", "range_start": "2026-02-12T23:10:00", "range_end": "2026-02-12T23:13:00"},
+            {"op": "modify", "range_start": "2026-02-13T08:00:00", "range_end": "2026-02-13T09:00:00",
+             "step": "minute", "constant_value": 21.5},
+            {"op": "delete", "intervals": [["2026-02-13T10:00:00", "2026-02-13T10:05:00"],
+                                           ["2026-02-13T12:00:00", "2026-02-13T12:30:00"]]},
+            {"op": "resample", "interval": "15min", "how": "mean", "fill": "hold"}
+          ]
+        },
+        {
+          "output": "output/results/test.xml",
+          "operations": [
+            {"op": "generate", "start_date": "2026-02-12T00:00:00", "end_date": "2026-02-13T00:00:00",
+             "step": "minute", "calc": "sin", "amplitude": 5, "offset": 20, "period": 1440}
+          ]
+        }
+      ]
+    }
+
+Relative paths are resolved against the manifest's directory. Inputs and
+outputs may be binary trend files (*.trendbin) as well as XML; an optional
+"locale" picks the timestamp layout of XML outputs (see writer.output_locale). Each input is
+parsed once, all of its operations are applied in memory in order, and the
+result is written once. Jobs run in a process pool; a failing job is reported
+without stopping the others.
+"""
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import tools
+
+# Optional parameters shaping a calc signal (see signals.signal_values)
+SIGNAL_ARGUMENTS = ("amplitude", "offset", "period", "noise", "seed", "ramp_start", "ramp_end")
+
+# Keyword arguments each operation accepts, besides the trend itself
+OPERATIONS = {
+    "delete": ("range_start", "range_end", "intervals"),
+    "modify": ("range_start", "range_end", "intervals", "step", "calc", "constant_value", *SIGNAL_ARGUMENTS),
+    "resample": ("interval", "how", "fill"),
+    "generate": ("start_date", "end_date", "step", "calc", *SIGNAL_ARGUMENTS),
+}
+
+# Arguments an operation cannot do without; "intervals" stands in for the range of delete and modify
+REQUIRED = {
+    "delete": ("range_start", "range_end"),
+    "modify": ("range_start", "range_end"),
+    "resample": ("interval",),
+    "generate": ("start_date", "end_date", "step", "calc"),
+}
+
+
+def load_manifest(manifest_path: str) -> list[dict]:
+    """Read a manifest and return its jobs with paths made absolute."""
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    base = manifest_path.resolve().parent
+    jobs = []
+    for job in manifest.get("jobs", []):
+        job = dict(job)
+        for key in ("input", "output"):
+            if job.get(key):
+                job[key] = str(base / job[key])
+        jobs.append(job)
+    return jobs
+
+
+def _validate(job: dict):
+    if not job.get("output"):
+        raise ValueError("Job has no output file")
+    operations = job.get("operations") or []
+    if not operations:
+        raise ValueError("Job has no operations")
+    for position, operation in enumerate(operations):
+        name = operation.get("op")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; choose one of: {list(OPERATIONS)}")
+        unknown = set(operation) - {"op"} - set(OPERATIONS[name])
+        if unknown:
+            raise ValueError(f"Unknown arguments for {name}: {sorted(unknown)}")
+        missing = [key for key in REQUIRED[name] if key not in operation and "intervals" not in operation]
+        if missing:
+            raise ValueError(f"Missing arguments for {name}: {missing}")
+        if name == "generate" and (position or job.get("input")):
+            raise ValueError("generate must be the only source of a job: first operation and no input")
+    if operations[0]["op"] != "generate" and not job.get("input"):
+        raise ValueError("Job has no input file")
+
+
+def _apply(trend, operation: dict):
+    arguments = {key: value for key, value in operation.items() if key != "op"}
+    # "intervals" holds [start, end] pairs or dicts, as tools.delete_intervals/modify_intervals take them
+    if operation["op"] == "delete":
+        return tools.delete_intervals(trend, **arguments) if "intervals" in arguments else tools.delete_trend(trend, **arguments)
+    if operation["op"] == "modify":
+        return tools.modify_intervals(trend, **arguments) if "intervals" in arguments else tools.modify_trend(trend, **arguments)
+    if operation["op"] == "resample":
+        return tools.resample_trend(trend, **arguments)
+    return tools.generate_trend(**arguments)
+
+
+def run_job(job: dict) -> dict:
+    """Run one job: one parse, every operation in memory, one write.
+
+    Never raises; failures are reported in the returned result.
+    """
+    result = {
+        "input": job.get("input"),
+        "output": job.get("output"),
+        "operations": len(job.get("operations") or []),
+        "status": "ok",
+        "error": None,
+        "records_in": 0,
+        "records_out": 0,
+        "timings": {}
+    }
+    started = time.perf_counter()
+    try:
+        _validate(job)
+
+        trend = None
+        if job.get("input"):
+            mark = time.perf_counter()
+            trend = tools.load_trend(job["input"])
+            result["records_in"] = len(trend)
+            result["timings"]["load"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        for operation in job["operations"]:
+            trend = _apply(trend, operation)
+        result["timings"]["operations"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        Path(job["output"]).parent.mkdir(parents=True, exist_ok=True)
+        tools.write_trend(trend, job["output"], locale=job.get("locale"))
+        result["records_out"] = len(trend)
+        result["timings"]["write"] = time.perf_counter() - mark
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["timings"]["total"] = time.perf_counter() - started
+    return result
+
+
+def run_batch(jobs: list[dict], workers: int | None = None) -> list[dict]:
+    """Fan the jobs out over a process pool; results come back in job order."""
+    if workers == 1 or len(jobs) <= 1:
+        return [run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_job, jobs))
+
+
+def format_report(results: list[dict]) -> str:
+    lines = []
+    for index, result in enumerate(results, start=1):
+        name = Path(result["output"] or result["input"] or "?").name
+        if result["status"] == "ok":
+            timings = "  ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result["timings"].items())
+            lines.append(
+                f"[{index}] ok     {name}: {result['records_in']} -> {result['records_out']} records, "
+                f"{result['operations']} operation(s)  {timings}"
+            )
+        else:
+            lines.append(f"[{index}] error  {name}: {result['error']}")
+    failed = sum(result["status"] != "ok" for result in results)
+    lines.append(f"{len(results) - failed}/{len(results)} jobs succeeded")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python batch.py MANIFEST.json")
+    import os
+
+    import flatxml
+
+    # A job run in this process may scan a large export over a process pool
+    flatxml.WORKERS = os.cpu_count() or 1
+    results = run_batch(load_manifest(sys.argv[1]))
+    print(format_report(results))
+    sys.exit(1 if any(result["status"] != "ok" for result in results) else 0)
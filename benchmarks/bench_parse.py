@@ -0,0 +1,51 @@
+"""Records/second of loading an export: streaming XML parser vs the flat scanner.
+
+Usage: python benchmarks/bench_parse.py [records]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import flatxml
+import tools
+from writer import write_trend_xml
+
+
+def _rate(records: int, fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return records / (time.perf_counter() - started)
+
+
+def _iterparse(path):
+    _, chunks = tools._iter_existing_trend(path)
+    for _ in chunks:
+        pass
+
+
+def main(records: int = 1_000_000):
+    trend = tools.generate_trend("2026-01-01T00:00:00", "2030-01-01T00:00:00", "second", "sin")[:records]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.xml")
+        write_trend_xml(trend, path)
+        size = os.path.getsize(path) / 1e6
+        workers = os.cpu_count() or 1
+
+        # Always take the pool for the parallel figure, whatever the file size
+        flatxml.PARALLEL_MIN_BYTES = 0
+        runs = {
+            "iterparse": lambda: _iterparse(path),
+            "flat, 1 process": lambda: flatxml.scan_flat(path, workers=1),
+            f"flat, pool of {workers}": lambda: flatxml.scan_flat(path, workers=workers),
+        }
+        print(f"{len(trend):,} records, {size:.0f} MB")
+        for label, fn in runs.items():
+            print(f"{label:<20} {_rate(len(trend), fn):>12,.0f} rec/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,67 @@
+"""Cold-start time of the GUI and of a headless run, each in a fresh interpreter.
+
+Usage: python benchmarks/bench_startup.py [runs]
+
+The GUI case imports app and shows the MainWindow on Qt's offscreen platform;
+the headless case runs a CLI delete on a small generated trend. Both also say
+whether pandas was imported, which is what lazy imports are meant to avoid.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+GUI = """
+import sys
+from PyQt5.QtWidgets import QApplication
+import app
+qt = QApplication(sys.argv)
+window = app.MainWindow()
+window.show()
+qt.processEvents()
+print("pandas" in sys.modules)
+"""
+
+HEADLESS = """
+import sys
+import cli
+cli.main(["delete", sys.argv[1], "--start", "2026-02-12T00:10:00", "--end", "2026-02-12T00:20:00", "-o", sys.argv[2]])
+print("pandas" in sys.modules)
+"""
+
+
+def _cold(code: str, *args: str, runs: int) -> tuple[float, str]:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1")
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        done = subprocess.run([sys.executable, "-c", code, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+        timings.append(time.perf_counter() - started)
+    lines = done.stdout.strip().splitlines()
+    return statistics.median(timings), lines[-1] if lines else ""
+
+
+def main(runs: int = 5):
+    sys.path.insert(0, str(ROOT))
+    import tools
+    from writer import write_trend_xml
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = str(Path(tmp) / "trend.xml")
+        write_trend_xml(tools.generate_trend("2026-02-12T00:00:00", "2026-02-12T01:00:00", "minute", "sin"), source)
+
+        baseline, _ = _cold("pass", runs=runs)
+        print(f"interpreter alone     {baseline * 1000:7.0f} ms")
+        elapsed, pandas = _cold(HEADLESS, source, str(Path(tmp) / "out.xml"), runs=runs)
+        print(f"headless cli delete   {elapsed * 1000:7.0f} ms   pandas imported: {pandas}")
+        elapsed, pandas = _cold(GUI, runs=runs)
+        print(f"gui main window       {elapsed * 1000:7.0f} ms   pandas imported: {pandas}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,204 @@
+"""Load, delete, modify, convert and write timings from 10k to 10M records, saved as JSON.
+
+Usage: python benchmarks/bench_suite.py [--sizes 10000 100000 ...] [--forms value event]
+                                        [-o results.json] [--baseline previous.json]
+
+For each size and record element (TrendLogValueRecord or TrendLogEventRecord)
+an export is synthesized the way generate_xml does, plus a CSV of the same
+records for convert. Every stage then runs in a fresh interpreter, so its
+peak RSS is its own and no cache carries over from the previous stage:
+
+    load     tools.load_trend of the XML export
+    delete   tools.delete_intervals of 10 intervals (the load is not timed)
+    modify   tools.modify_intervals of the same intervals with a sine
+    convert  tools.convert_to_xml of the CSV
+    write    tools.write_trend of the loaded trend as XML
+
+Each result has the seconds, records/second and peak RSS (MB, None where
+the platform does not tell) of its stage. The JSON also records the commit
+and machine, so runs can be compared over time; with --baseline each rate
+is printed next to the one in an earlier results file.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+FORMS = {
+    "value": {"tag": "TrendLogValueRecord", "Events": "", "Comment": "", "User": ""},
+    "event": {"tag": "TrendLogEventRecord", "Events": "", "Comment": "", "User": ""},
+}
+STAGES = ["load", "delete", "modify", "convert", "write"]
+START = "2026-01-01T00:00:00"
+# Edited intervals, each 0.1% of the trend, spread evenly over it
+INTERVALS = 10
+
+
+def _peak_rss_mb() -> float | None:
+    # The same measure as the peak_memory of --events (see instrument)
+    from instrument import peak_rss
+
+    peak = peak_rss()
+    return peak / (1 << 20) if peak is not None else None
+
+
+def _intervals(trend) -> list:
+    import numpy as np
+
+    step = len(trend) // INTERVALS
+    width = max(len(trend) // 1000, 1)
+    starts = trend.times[np.arange(INTERVALS) * step + step // 2]
+    return [(str(start), str(start + np.timedelta64(width - 1, "s"))) for start in starts]
+
+
+def synthesize(directory: str, records: int, form: str) -> dict:
+    """The XML export and the CSV one stage set runs on."""
+    import numpy as np
+
+    import tools
+
+    end = np.datetime64(START) + np.timedelta64(records - 1, "s")
+    trend = tools.generate_trend(START, str(end), "second", "sin", period=3600)
+    trend.metadata.update(name="benchmark", description="", unit="", record=FORMS[form])
+    xml = os.path.join(directory, f"{records}-{form}.xml")
+    tools.write_trend(trend, xml)
+
+    csv = os.path.join(directory, f"{records}.csv")
+    if not os.path.exists(csv):
+        with open(csv, "w", encoding="utf-8") as f:
+            f.write("timestamp,value\n")
+            for offset in range(0, len(trend), 1 << 20):
+                chunk = trend[offset:offset + (1 << 20)]
+                f.write("".join(f"{t},{v!r}\n" for t, v in zip(chunk.times.astype(str).tolist(), chunk.values.tolist())))
+    return {"xml": xml, "csv": csv}
+
+
+def run_stage(stage: str, xml: str, csv: str, output: str) -> dict:
+    """Time one stage in this process; everything it needs first is done untimed."""
+    import tools
+
+    trend = None
+    if stage in ("delete", "modify", "write"):
+        trend = tools.load_trend(xml, cache=None)
+    if stage == "convert":
+        with open(csv, "rb") as f:
+            records = sum(1 for _ in f) - 1
+    else:
+        records = len(trend) if trend is not None else 0
+
+    started = time.perf_counter()
+    if stage == "load":
+        records = len(tools.load_trend(xml, cache=None))
+    elif stage == "delete":
+        tools.delete_intervals(trend, _intervals(trend))
+    elif stage == "modify":
+        tools.modify_intervals(trend, _intervals(trend), "second", "sin")
+    elif stage == "convert":
+        tools.convert_to_xml(csv, output)
+    else:
+        tools.write_trend(trend, output)
+    seconds = time.perf_counter() - started
+    return {"seconds": seconds, "records": records, "peak_rss_mb": _peak_rss_mb()}
+
+
+def _child(stage: str, files: dict, directory: str) -> dict:
+    output = os.path.join(directory, f"out-{stage}.xml")
+    done = subprocess.run(
+        [sys.executable, __file__, "--stage", stage, files["xml"], files["csv"], output],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    if os.path.exists(output):
+        os.remove(output)
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def _commit() -> str | None:
+    try:
+        done = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return done.stdout.strip() or None
+
+
+def _key(result: dict) -> tuple:
+    return result["records"], result["form"], result["stage"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--forms", choices=list(FORMS), nargs="+", default=list(FORMS))
+    parser.add_argument("--stages", choices=STAGES, nargs="+", default=STAGES)
+    parser.add_argument("-o", "--output", help="results file (default: benchmarks/results/suite-<time>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare the rates with")
+    parser.add_argument("--stage", nargs=4, metavar=("STAGE", "XML", "CSV", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.stage:
+        import flatxml
+
+        # As under the CLI: large exports are scanned over a process pool
+        flatxml.WORKERS = os.cpu_count() or 1
+        stage, xml, csv, output = args.stage
+        print(json.dumps(run_stage(stage, xml, csv, output)))
+        return
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {_key(result): result for result in json.load(f)["results"]}
+
+    started = datetime.now()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for records in args.sizes:
+            for form in args.forms:
+                files = synthesize(directory, records, form)
+                for stage in args.stages:
+                    measured = _child(stage, files, directory)
+                    result = {
+                        "records": records,
+                        "form": form,
+                        "stage": stage,
+                        "seconds": round(measured["seconds"], 4),
+                        "records_per_second": round(measured["records"] / measured["seconds"]) if measured["seconds"] else None,
+                        "peak_rss_mb": round(measured["peak_rss_mb"], 1) if measured["peak_rss_mb"] else None,
+                        "file_mb": round(os.path.getsize(files["csv" if stage == "convert" else "xml"]) / 1e6, 1),
+                    }
+                    results.append(result)
+
+                    line = (f"{records:>11,} {form:<6} {stage:<8} {result['seconds']:>9.3f} s "
+                            f"{result['records_per_second'] or 0:>12,} rec/s  peak {result['peak_rss_mb'] or 0:>8.1f} MB")
+                    before = baseline.get(_key(result))
+                    if before and before.get("records_per_second") and result["records_per_second"]:
+                        line += f"  ({result['records_per_second'] / before['records_per_second']:.2f}x baseline)"
+                    print(line, flush=True)
+                os.remove(files["xml"])
+
+    report = {
+        "started": started.isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    output = args.output or str(ROOT / "benchmarks" / "results" / f"suite-{started:%Y%m%d-%H%M%S}.json")
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
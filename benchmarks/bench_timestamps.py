@@ -0,0 +1,47 @@
+"""Records/second of timestamp parsing (dateutil per record vs parse_timestamps)
+and formatting (strftime per record vs format_timestamps).
+
+Usage: python benchmarks/bench_timestamps.py [records]
+"""
+import sys
+import time
+
+import numpy as np
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dateutil import parser
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from timestamps import DATE_FORMAT, format_timestamps, parse_timestamps
+
+FORMATS = {
+    "EBO export": "%Y/%m/%d %H:%M:%S",
+    "DATE_FORMAT": DATE_FORMAT,
+}
+
+
+def _rate(records: int, fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return records / (time.perf_counter() - started)
+
+
+def main(records: int = 200_000):
+    start = datetime(2026, 2, 12, 19, 49, 21)
+    for label, fmt in FORMATS.items():
+        raw = [(start + timedelta(seconds=i)).strftime(fmt) for i in range(records)]
+        before = _rate(records, lambda: [parser.parse(text) for text in raw])
+        after = _rate(records, lambda: parse_timestamps(raw))
+        print(f"{label:<12} dateutil: {before:>12,.0f} rec/s   parse_timestamps: {after:>12,.0f} rec/s   ({after / before:.0f}x)")
+
+    times = np.datetime64(start, "s") + np.arange(records)
+    for label, fmt in FORMATS.items():
+        before = _rate(records, lambda: [ts.strftime(fmt) for ts in times.tolist()])
+        after = _rate(records, lambda: format_timestamps(times, fmt))
+        print(f"{label:<12} strftime: {before:>12,.0f} rec/s   format_timestamps: {after:>11,.0f} rec/s   ({after / before:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,135 @@
+"""Cache of parsed trends, so the same export is not parsed again and again.
+
+Entries are keyed on the file's resolved path, modification time and size,
+so an edited or replaced file is never served stale. The in-process cache is
+an LRU bounded by the bytes of the cached arrays. Optionally each parse is
+also saved to a sidecar file next to the export (`<file>.trendcache`), an
+uncompressed binary trend file (see trendfile) memory-mapped on load instead
+of read, so even another process reopens a large export at once.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from trend import Trend
+from trendfile import read_header, read_trendfile, write_trendfile
+
+SIDECAR_SUFFIX = ".trendcache"
+
+
+def file_key(path) -> tuple[str, int, int]:
+    stat = os.stat(path)
+    return os.path.realpath(path), stat.st_mtime_ns, stat.st_size
+
+
+def _frozen(trend: Trend) -> Trend:
+    # Cached arrays are shared by every caller; nothing may write through them
+    trend.times.setflags(write=False)
+    trend.values.setflags(write=False)
+    return trend
+
+
+def _nbytes(trend: Trend) -> int:
+    return trend.times.nbytes + trend.values.nbytes + trend.extras.rows.nbytes
+
+
+def sidecar_path(path) -> str:
+    return os.fspath(path) + SIDECAR_SUFFIX
+
+
+def write_sidecar(trend: Trend, path, key: tuple[str, int, int]):
+    """Save a parsed trend next to its source; the key ties it to that exact file."""
+    temporary = sidecar_path(path) + ".tmp"
+    write_trendfile(trend, temporary, extra={"key": list(key)})
+    # Readers never see a half-written sidecar
+    os.replace(temporary, sidecar_path(path))
+
+
+def read_sidecar(path, key: tuple[str, int, int]) -> Trend | None:
+    """The memory-mapped trend saved for `path`, or None if missing or stale."""
+    sidecar = sidecar_path(path)
+    try:
+        if read_header(sidecar)["extra"].get("key") != list(key):
+            return None
+        return read_trendfile(sidecar)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class TrendCache:
+    """LRU of parsed trends, keyed on (path, mtime, size) and capped at `max_bytes`.
+
+    A trend larger than the cap is returned but not kept. With `sidecar` a
+    parse is also written to disk and later reopened through mmap. Safe to
+    share between threads; the GUI worker pool does.
+    """
+
+    def __init__(self, max_bytes: int = 512 << 20, sidecar: bool = False):
+        self.max_bytes = max_bytes
+        self.sidecar = sidecar
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key) -> Trend | None:
+        with self._lock:
+            trend = self._entries.get(key)
+            if trend is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # A fresh Trend, so callers can change its metadata freely
+        return Trend(trend.times, trend.values, trend.metadata, trend.extras)
+
+    def put(self, key, trend: Trend):
+        nbytes = _nbytes(trend)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= _nbytes(old)
+            self._entries[key] = trend
+            self._size += nbytes
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= _nbytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def load(self, path, parse) -> Trend:
+        """The trend of `path` from memory, from its sidecar, or from `parse(path)`."""
+        key = file_key(path)
+        trend = self.get(key)
+        if trend is not None:
+            return trend
+
+        self.misses += 1
+        trend = read_sidecar(path, key) if self.sidecar else None
+        if trend is None:
+            trend = parse(path)
+            if self.sidecar:
+                try:
+                    write_sidecar(trend, path, key)
+                except OSError:
+                    # A read-only directory only costs the sidecar
+                    pass
+        trend = _frozen(trend)
+        self.put(key, trend)
+        return Trend(trend.times, trend.values, trend.metadata, trend.extras)
+
+
+# Shared by every tools call in this process
+TREND_CACHE = TrendCache()
@@ -0,0 +1,27 @@
+"""Names of the choices the operations take, in one place.
+
+The modules doing the work (signals, resample, merge, quality, timestamps)
+and the front ends offering them (cli.py, app.py) all take these lists from
+here, so a choice added to one cannot be missing from the others. Nothing
+is imported, so the command line and the GUI can build their menus without
+loading numpy.
+"""
+
+# Calc methods of signals.CALC_METHODS, in menu order, and the ramp signal
+CALCS = ("linear", "linear_double", "sin", "cos", "square", "sqrt", "log")
+RAMP = "ramp"
+SIGNALS = (*CALCS, RAMP)
+
+# Value kept for each bin by resample.resample, and how it fills empty bins
+AGGREGATIONS = ("mean", "min", "max", "first", "last")
+FILLS = ("hold", "linear")
+
+# Record kept by merge.deduplicate for a timestamp found more than once: the
+# one from the earliest input (in the order given), the latest, or the highest value
+DUPLICATE_POLICIES = ("first", "last", "max")
+
+# Kinds of finding of quality.QualityScanner, in the order they are reported
+FINDING_KINDS = ("gap", "duplicate", "out_of_order", "spike", "flatline")
+
+# Timestamp layouts timestamps.LOCALE_FORMATS can write
+LOCALES = ("en-US", "ja-JP")
@@ -0,0 +1,317 @@
+"""Headless command line for the tools operations.
+
+    python cli.py generate 2026-02-12T00:00:00 2026-02-13T00:00:00 --step minute --calc sin -o out.xml
+    python cli.py generate 2026-02-12T00:00:00 2026-02-13T00:00:00 --calc sin --amplitude 5 --offset 20 --period 1440 --noise 0.2 --seed 1 -o out.xml
+    python cli.py convert planilha.xlsx -o out.xml
+    python cli.py modify trend.xml --start 2026-02-12T23:10:00 --end 2026-02-12T23:13:00 --constant 1001 -o out.xml
+    python cli.py delete trend.xml --start 2026-02-12T23:10:00 --end 2026-02-12T23:13:00 -o out.xml
+    python cli.py delete trend.xml --interval 2026-02-12T23:10:00 2026-02-12T23:13:00 --interval 2026-02-13T01:00:00 2026-02-13T01:30:00 -o out.xml
+    python cli.py resample trend.xml --interval 15min --how mean --fill linear -o out.xml
+    python cli.py transcode trend.xml --compress -o trend.trendbin
+    python cli.py merge jan.xml feb.xml mar.trendbin --duplicates last -o q1.xml
+    python cli.py check trend.xml --window 21 --flatline 120 --json
+    python cli.py replay ahu1.journal.json --input ahu1_new_export.xml -o out.xml
+    python cli.py delete trend.xml --start 2026-02-12T23:10:00 --end 2026-02-12T23:13:00 --locale source -o out.xml
+    python cli.py batch jobs.json --workers 4
+    python cli.py --events stages.jsonl --profile profile.txt delete trend.xml --start ... --end ... -o out.xml
+
+Inputs and outputs default to "-", stdin and stdout, so exports can be piped
+through (e.g. `... delete - --start ... --end ... < in.xml > out.xml`). Nothing
+from Qt is imported, and tools itself is only imported once the arguments
+have been parsed. Any input or output path may also be a binary trend file
+(*.trendbin, see trendfile.py). --events appends the timing and counter
+event of every stage as JSON lines and --profile writes a cProfile and
+tracemalloc report of the run (see instrument.py).
+"""
+import argparse
+import io
+import json
+import sys
+from contextlib import ExitStack, contextmanager
+
+from choices import AGGREGATIONS, DUPLICATE_POLICIES, FILLS, FINDING_KINDS, LOCALES, SIGNALS
+
+STEP_HELP = "second, minute, hour, day or any count and unit such as 15s, 5min, 2h (default minute)"
+
+
+def _input(path: str):
+    return sys.stdin.buffer if path == "-" else path
+
+
+@contextmanager
+def _output(path: str):
+    """The output path itself, or a UTF-8 text stream over stdout for "-"."""
+    if path != "-":
+        yield path
+        return
+    stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+    try:
+        yield stdout
+    finally:
+        stdout.detach()
+
+
+def _write(trend, path: str, compression: str | None = None, locale: str | None = None):
+    # Paths ending in .trendbin get the binary format, everything else XML
+    import tools
+
+    with _output(path) as output:
+        tools.write_trend(trend, output, compression=compression, locale=locale)
+
+
+def _signal(args) -> dict:
+    # Only the parameters actually given, so the defaults stay in one place
+    names = ("amplitude", "offset", "period", "noise", "seed", "ramp_start", "ramp_end")
+    return {name: getattr(args, name) for name in names if getattr(args, name) is not None}
+
+
+def _add_signal_arguments(parser):
+    group = parser.add_argument_group("signal", "shape of the calc signal")
+    group.add_argument("--amplitude", type=float, help="scale of the signal (default 1)")
+    group.add_argument("--offset", type=float, help="added to the signal (default 0)")
+    group.add_argument("--period", type=float, help="samples per cycle; sin/cos complete a turn, others restart")
+    group.add_argument("--noise", type=float, help="standard deviation of added gaussian noise")
+    group.add_argument("--seed", type=int, help="random seed for reproducible noise")
+    group.add_argument("--ramp-start", type=float, help="first value of a ramp (default 0)")
+    group.add_argument("--ramp-end", type=float, help="last value of a ramp (default 1)")
+
+
+def _generate(args):
+    import tools
+
+    _write(tools.generate_trend(args.start_date, args.end_date, args.step, args.calc, **_signal(args)), args.output)
+
+
+def _convert(args):
+    import tools
+
+    # Workbooks need random access, so stdin is buffered first
+    source = io.BytesIO(sys.stdin.buffer.read()) if args.input == "-" else args.input
+    with _output(args.output) as output:
+        tools.convert_to_xml(source, output, name=args.name, description=args.description, unit=args.unit)
+
+
+def _load(args):
+    import tools
+
+    tools.TREND_CACHE.sidecar = args.sidecar
+    return tools.load_trend(_input(args.input))
+
+
+def _intervals(args) -> list:
+    if args.interval:
+        if args.start or args.end:
+            raise ValueError("use either --start/--end or --interval")
+        return args.interval
+    if not (args.start and args.end):
+        raise ValueError("--start and --end (or at least one --interval) are required")
+    return [(args.start, args.end)]
+
+
+def _modify(args):
+    import tools
+
+    intervals = _intervals(args)
+    trend = _load(args)
+    _write(tools.modify_intervals(trend, intervals, args.step, args.calc, args.constant, **_signal(args)), args.output, locale=args.locale)
+
+
+def _delete(args):
+    import tools
+
+    intervals = _intervals(args)
+    trend = _load(args)
+    _write(tools.delete_intervals(trend, intervals), args.output, locale=args.locale)
+
+
+def _resample(args):
+    import tools
+
+    _write(tools.resample_trend(_load(args), args.interval, args.how, args.fill), args.output, locale=args.locale)
+
+
+def _merge(args):
+    import tools
+
+    with _output(args.output) as output:
+        tools.merge_existing_trends(args.inputs, output, args.duplicates, locale=args.locale)
+
+
+def _check(args):
+    import tools
+
+    findings = tools.check_existing_trend(
+        _input(args.input), period=args.period, gap_factor=args.gap_factor, window=args.window,
+        threshold=args.threshold, flatline=args.flatline
+    )
+    if args.kinds:
+        findings = [finding for finding in findings if finding.kind in args.kinds]
+    if args.json:
+        rows = [
+            {"kind": finding.kind, "start": str(finding.start), "end": str(finding.end),
+             "records": finding.records, "detail": finding.detail}
+            for finding in findings
+        ]
+        print(json.dumps(rows, indent=2))
+    else:
+        for finding in findings:
+            print(f"{finding.kind:<12} {finding.start}  {finding.end}  {finding.records:>8}  {finding.detail}")
+        print(f"{len(findings)} finding(s)", file=sys.stderr)
+
+
+def _replay(args):
+    import session
+
+    journal = session.load_journal(args.journal)
+    source = args.input or journal.get("input")
+    if not source:
+        raise ValueError("the journal names no input file; give one with --input")
+    edits = session.EditSession.open(source).replay(journal["operations"])
+    with _output(args.output) as output:
+        edits.export(output, locale=args.locale)
+
+
+def _transcode(args):
+    _write(_load(args), args.output, "zlib" if args.compress else None, args.locale)
+
+
+def _batch(args):
+    import batch
+
+    results = batch.run_batch(batch.load_manifest(args.manifest), workers=args.workers)
+    print(batch.format_report(results), file=sys.stderr)
+    return 1 if any(result["status"] != "ok" for result in results) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="trend-manipulator", description="Manipulate EBO trend XML exports.")
+    parser.add_argument("--events", metavar="FILE", help="append per-stage timing events as JSON lines (- for stderr)")
+    parser.add_argument("--profile", metavar="FILE", help="write a cProfile/tracemalloc report of the run (- for stderr)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="generate a synthetic trend")
+    generate.add_argument("start_date")
+    generate.add_argument("end_date")
+    generate.add_argument("--step", default="minute", help=STEP_HELP)
+    generate.add_argument("--calc", choices=SIGNALS, default="linear")
+    _add_signal_arguments(generate)
+    generate.set_defaults(handler=_generate)
+
+    convert = commands.add_parser("convert", help="convert a (timestamp, value) sheet to XML: .xlsx, .xls, .csv or .parquet")
+    convert.add_argument("input", nargs="?", default="-")
+    convert.add_argument("--name", default="ExcelImportedTrend")
+    convert.add_argument("--description", default="Trend imported from Excel")
+    convert.add_argument("--unit", default="")
+    convert.set_defaults(handler=_convert)
+
+    modify = commands.add_parser("modify", help="replace the values inside an interval")
+    modify.add_argument("input", nargs="?", default="-")
+    modify.add_argument("--step", default="minute", help=STEP_HELP)
+    values = modify.add_mutually_exclusive_group(required=True)
+    values.add_argument("--calc", choices=SIGNALS)
+    values.add_argument("--constant", type=float)
+    _add_signal_arguments(modify)
+    modify.set_defaults(handler=_modify)
+
+    delete = commands.add_parser("delete", help="remove the records inside an interval")
+    delete.add_argument("input", nargs="?", default="-")
+    delete.set_defaults(handler=_delete)
+
+    for command in (modify, delete):
+        command.add_argument("--start")
+        command.add_argument("--end")
+        command.add_argument(
+            "--interval", nargs=2, action="append", metavar=("START", "END"),
+            help="an interval to edit; repeat it to edit several in one pass"
+        )
+
+    resample = commands.add_parser("resample", help="reduce or fill a trend to one record per interval")
+    resample.add_argument("input", nargs="?", default="-")
+    resample.add_argument("--interval", required=True, help="bin width: " + STEP_HELP.split(" (")[0])
+    resample.add_argument("--how", choices=AGGREGATIONS, default="mean", help="value kept for each bin (default mean)")
+    resample.add_argument("--fill", choices=FILLS, help="fill empty bins by holding the last value or linearly")
+    resample.set_defaults(handler=_resample)
+
+    merge = commands.add_parser("merge", help="merge time-ordered exports into one, streaming them through")
+    merge.add_argument("inputs", nargs="+", help="XML or .trendbin files, each in time order")
+    merge.add_argument(
+        "--duplicates", choices=DUPLICATE_POLICIES, default="first",
+        help="record kept for a timestamp found more than once: from the first input listed, the last, or the highest value"
+    )
+    merge.set_defaults(handler=_merge)
+
+    check = commands.add_parser("check", help="report gaps, duplicates, out-of-order records, spikes and flatlines")
+    check.add_argument("input", nargs="?", default="-")
+    check.add_argument("--period", type=float, help="expected seconds between records (default: the most common interval)")
+    check.add_argument("--gap-factor", type=float, default=1.5, help="a gap is longer than this many periods (default 1.5)")
+    check.add_argument("--window", type=int, default=11, help="records in the centred spike window, odd (default 11)")
+    check.add_argument("--threshold", type=float, default=6.0, help="spike threshold in scaled MADs (default 6)")
+    check.add_argument("--flatline", type=int, default=60, help="equal values in a row reported as a flatline (default 60)")
+    check.add_argument("--kinds", nargs="+", choices=FINDING_KINDS, help="only report these kinds of finding")
+    check.add_argument("--json", action="store_true", help="print the findings as a JSON list instead of a table")
+    check.set_defaults(handler=_check)
+
+    replay = commands.add_parser("replay", help="apply a saved edit-session journal to a trend, written once")
+    replay.add_argument("journal", help="JSON journal saved by an edit session")
+    replay.add_argument("--input", help="trend to edit, e.g. a fresh export (default: the journal's own input)")
+    replay.set_defaults(handler=_replay)
+
+    transcode = commands.add_parser("transcode", help="rewrite a trend as XML or as a binary .trendbin file")
+    transcode.add_argument("input", nargs="?", default="-")
+    transcode.add_argument("--compress", action="store_true", help="zlib-compress a .trendbin output")
+    transcode.set_defaults(handler=_transcode)
+
+    for command in (modify, delete, resample, transcode):
+        command.add_argument(
+            "--sidecar", action="store_true",
+            help="keep the parsed input in <input>.trendcache and memory-map it on later runs"
+        )
+
+    for command in (modify, delete, resample, merge, replay, transcode):
+        command.add_argument(
+            "--locale", choices=[*LOCALES, "source"],
+            help="timestamp layout of an XML output: en-US (default), another Locale, or that of the input"
+        )
+
+    for command in (generate, convert, modify, delete, resample, merge, replay, transcode):
+        command.add_argument("-o", "--output", default="-", help="output XML or .trendbin file (default: XML on stdout)")
+
+    run = commands.add_parser("batch", help="run a JSON job manifest over a process pool")
+    run.add_argument("manifest")
+    run.add_argument("--workers", type=int, default=None)
+    run.set_defaults(handler=_batch)
+
+    return parser
+
+
+def _run(args):
+    import instrument
+
+    with ExitStack() as stack:
+        if args.events:
+            events = instrument.JsonLinesSink(sys.stderr if args.events == "-" else args.events)
+            stack.callback(events.close)
+            stack.enter_context(instrument.sink(events))
+        if args.profile:
+            stack.enter_context(instrument.profile(None if args.profile == "-" else args.profile))
+        with instrument.operation(args.command):
+            return args.handler(args)
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return _run(args) or 0
+    except (ValueError, OSError) as e:
+        print(f"trend-manipulator: error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    import os
+
+    import flatxml
+
+    # Under this guard a process pool may re-import the module safely
+    flatxml.WORKERS = os.cpu_count() or 1
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Reduce a trend to a few points per pixel for plotting.
+
+A plot a thousand pixels wide cannot show more than a thousand columns, so
+instead of drawing millions of records the time range is cut into one
+bucket per column and each bucket is drawn as the line from its lowest to
+its highest value. Unlike picking representative points (LTTB and the
+like) this envelope is exact at the plot's resolution: a one-record spike
+or dropout always shows. It takes one bisection for the bucket edges and
+two reduceat passes over the records in range, so a view of tens of
+millions of records is ready in well under a second.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from trend import Trend
+
+
+class Envelope(NamedTuple):
+    """Lowest and highest value of each non-empty bucket; times are bucket starts in epoch seconds."""
+    times: np.ndarray
+    low: np.ndarray
+    high: np.ndarray
+    records: int
+
+
+def _seconds(time) -> int:
+    return int(np.datetime64(time, "s").astype(np.int64))
+
+
+def minmax_envelope(trend: Trend, buckets: int, start=None, end=None) -> Envelope:
+    """The envelope of the records with start <= time <= end (the whole trend by default) in `buckets` equal buckets.
+
+    Empty buckets are left out, so a plot can break the line across gaps.
+    NaN values are ignored; a bucket of nothing but NaN has NaN bounds. The
+    trend must be in time order, as everything loaded through tools is.
+    """
+    seconds = trend.times.view(np.int64)
+    if not len(seconds) or buckets < 1:
+        empty = np.array([], dtype=np.float64)
+        return Envelope(np.array([], dtype=np.int64), empty, empty, 0)
+    first = _seconds(start) if start is not None else int(seconds[0])
+    last = _seconds(end) if end is not None else int(seconds[-1])
+    # Whole-second edges; a range shorter than `buckets` seconds gets fewer buckets
+    edges = np.unique(np.linspace(first, last + 1, buckets + 1).astype(np.int64))
+    bounds = np.searchsorted(seconds, edges, side="left")
+    lo, hi = int(bounds[0]), int(bounds[-1])
+    if lo == hi:
+        empty = np.array([], dtype=np.float64)
+        return Envelope(np.array([], dtype=np.int64), empty, empty, 0)
+
+    occupied = np.flatnonzero(np.diff(bounds))
+    starts = bounds[occupied] - lo
+    values = trend.values[lo:hi]
+    return Envelope(
+        edges[occupied],
+        np.fmin.reduceat(values, starts),
+        np.fmax.reduceat(values, starts),
+        hi - lo,
+    )
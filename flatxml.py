@@ -0,0 +1,335 @@
+"""Fast path for flat EBO exports: mmap, split at record boundaries, scan in parallel.
+
+An export is flat when it is a UTF-8 document holding one <LogRecords>
+element with nothing but self-closing
+
+    <TrendLogValueRecord Timestamp="..." Value="..." ... />
+
+(or TrendLogEventRecord) elements inside, Timestamp first and Value second,
+which is how EBO writes them. The attributes after Value are compared with
+those of the first record as raw bytes; the few records that differ are
+parsed one by one into the trend's side table. The file is memory-mapped, cut into chunks at record starts and each
+chunk scanned as a numpy byte array, in a process pool for large files. A
+chunk is only accepted if every tag in it is such a record, so anything
+else (comments, other elements, other attribute orders, entities in the
+fields) makes scan_flat return None and the caller falls back to the XML
+parser.
+"""
+import mmap
+import multiprocessing
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from progress import ProgressCallback, report
+from timestamps import detect_format, parse_timestamp_fields
+from trend import SideTable
+
+TIMESTAMP = re.compile(rb'<TrendLog(?:Value|Event)Record\s+Timestamp="([^"&<]*)"')
+RECORD_START = b"<TrendLog"
+FIRST_RECORD = re.compile(rb'<TrendLog(?:Value|Event)Record Timestamp="[^"<>]*" Value="[^"<>]*"([^<>]*)/>')
+ROOT = re.compile(rb'<LogRecords\b[^<>]*>')
+PROLOG = re.compile(rb'\A(?:\xef\xbb\xbf)?\s*(?:<\?xml\b([^?]*)\?>)?\s*\Z')
+CLOSING = b"</LogRecords>"
+
+# Record elements an export may hold, and the attributes every record has
+RECORD_TAGS = ("TrendLogValueRecord", "TrendLogEventRecord")
+RECORD_FIELDS = ("Timestamp", "Value")
+
+# What every record must look like up to its value, byte for byte, except
+# for the kind of record ("Value" or "Event", both five letters)
+_PREFIX = np.frombuffer(b'<TrendLogValueRecord Timestamp="', dtype=np.uint8)
+_KIND = slice(9, 14)
+_KINDS = np.frombuffer(b"ValueEvent", dtype=np.uint8).reshape(2, 5)
+_MIDDLE = np.frombuffer(b'" Value="', dtype=np.uint8)
+# Longer values send the file to the XML parser rather than widen the value matrix
+_MAX_VALUE_WIDTH = 64
+
+# Below this a process pool costs more than it saves
+PARALLEL_MIN_BYTES = 32 << 20
+# Processes scan_flat uses when not told. A spawned pool imports the caller's
+# __main__ module again, so this stays 1 (no pool) for library callers; the
+# entry points (cli, batch, the GUI) raise it under their __main__ guard
+WORKERS = 1
+# Chunks per worker, so an uneven chunk does not hold the others up; the
+# index arrays of a chunk take a few times its size, hence the upper bound
+_CHUNKS_PER_WORKER = 4
+_MIN_CHUNK_BYTES = 4 << 20
+_MAX_CHUNK_BYTES = 64 << 20
+_HEAD_BYTES = 1 << 16
+_DONTNEED = getattr(mmap, "MADV_DONTNEED", None)
+
+
+def record_entry(element) -> dict:
+    """Element tag and attributes of a record besides Timestamp and Value."""
+    entry = {"tag": element.tag}
+    entry.update((key, value) for key, value in element.attrib.items() if key not in RECORD_FIELDS)
+    return entry
+
+
+def _utf8(prolog: bytes) -> bool:
+    declared = re.search(rb'encoding\s*=\s*["\']([^"\']+)', prolog)
+    return declared is None or declared.group(1).lower() in (b"utf-8", b"utf8", b"us-ascii", b"ascii")
+
+
+def _root(buffer) -> tuple[dict, int] | None:
+    """Attributes of the <LogRecords> start tag and where the body begins, if the prolog is plain."""
+    head = buffer[:_HEAD_BYTES]
+    match = ROOT.search(head)
+    if match is None or match.group(0).endswith(b"/>"):
+        return None
+    prolog = PROLOG.match(head[:match.start()])
+    if prolog is None or not _utf8(prolog.group(0)):
+        return None
+    attributes = ET.fromstring(match.group(0) + CLOSING).attrib
+    return attributes, match.end()
+
+
+def _gather(data: np.ndarray, starts: np.ndarray, width: int) -> np.ndarray:
+    """The `width` bytes from each start as an (n, width) matrix, zero-filled past the end."""
+    if len(data) < width:
+        data = np.concatenate([data, np.zeros(width - len(data), dtype=np.uint8)])
+    windows = np.lib.stride_tricks.sliding_window_view(data, width)
+    rows = windows[np.minimum(starts, len(windows) - 1)]
+    rows[starts > len(windows) - 1] = 0
+    return rows
+
+
+def _scan(buffer, start: int, end: int, fmt: str | None, last: bool, kind: bytes, tail: bytes):
+    """(times, values, rows, entries) of the records in buffer[start:end], or None if the chunk is not flat.
+
+    Works on positions rather than strings: every '<', '>' and '"' is
+    located with one comparison over the whole chunk, the record layout is
+    checked on those positions, and timestamps and values are gathered into
+    byte matrices and converted in bulk. Records whose kind or attribute
+    `tail` differ from the first record's are returned as chunk rows with
+    their parsed entries.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8, count=end - start, offset=start)
+    opens = np.flatnonzero(data == ord("<"))
+    closes = np.flatnonzero(data == ord(">"))
+    if last:
+        # The closing tag must be the last thing in the file
+        if not len(opens) or bytes(data[opens[-1]:]).rstrip() != CLOSING:
+            return None
+        opens, closes = opens[:-1], closes[:-1]
+
+    n = len(opens)
+    if n != len(closes):
+        return None
+    if not n:
+        return np.array([], dtype="datetime64[s]"), np.array([], dtype=np.float64), np.array([], dtype=np.int64), []
+
+    # Every tag is a self-closing record that starts with the expected prefix
+    if not ((opens < closes).all() and (closes[:-1] < opens[1:]).all() and (data[closes - 1] == ord("/")).all()):
+        return None
+    prefixes = _gather(data, opens, len(_PREFIX))
+    same = prefixes == _PREFIX
+    same[:, _KIND] = True
+    if not same.all():
+        return None
+    kinds = prefixes[:, _KIND]
+    events = (kinds == _KINDS[1]).all(axis=1)
+    if not (events | (kinds == _KINDS[0]).all(axis=1)).all():
+        return None
+
+    # The first four quotes of a record delimit Timestamp and Value
+    quotes = np.flatnonzero(data == ord('"'))
+    first = np.searchsorted(quotes, opens + len(_PREFIX) - 1)
+    if first[-1] + 3 >= len(quotes):
+        return None
+    q = quotes[first[:, None] + np.arange(4)]
+    if not ((q[:, 3] < closes).all() and (q[:, 2] == q[:, 1] + len(_MIDDLE) - 1).all()):
+        return None
+    if not (_gather(data, q[:, 1], len(_MIDDLE)) == _MIDDLE).all():
+        return None
+
+    time_starts, time_lengths = q[:, 0] + 1, q[:, 1] - q[:, 0] - 1
+    value_starts, value_lengths = q[:, 2] + 1, q[:, 3] - q[:, 2] - 1
+    width = int(value_lengths.max())
+    if width > _MAX_VALUE_WIDTH:
+        return None
+    # Entities would need decoding; EBO never writes them in these two fields
+    ampersands = np.flatnonzero(data == ord("&"))
+    for starts, lengths in ((time_starts, time_lengths), (value_starts, value_lengths)):
+        following = np.searchsorted(ampersands, starts)
+        inside = following < len(ampersands)
+        if (ampersands[following[inside]] < (starts + lengths)[inside]).any():
+            return None
+
+    # Whatever follows Value, up to the "/>", is compared with the first record's
+    tail = np.frombuffer(tail, dtype=np.uint8)
+    tail_starts = q[:, 3] + 1
+    differ = (closes - 1 - tail_starts != len(tail)) | (events != (kind == b"Event"))
+    if len(tail):
+        differ |= (_gather(data, tail_starts, len(tail)) != tail).any(axis=1)
+    rows = np.flatnonzero(differ)
+    try:
+        entries = [record_entry(ET.fromstring(bytes(data[opens[row]:closes[row] + 1]))) for row in rows.tolist()]
+    except ET.ParseError:
+        return None
+
+    times = parse_timestamp_fields(data, time_starts, time_lengths, fmt)
+    columns = np.arange(max(width, 1))
+    digits = np.where(columns < value_lengths[:, None], _gather(data, value_starts, len(columns)), 0).astype(np.uint8)
+    values = digits.view(f"S{len(columns)}").ravel().astype(np.float64)
+    return times, values, rows, entries
+
+
+def _scan_file(path, start: int, end: int, fmt: str | None, last: bool, kind: bytes, tail: bytes):
+    # Pool workers map the file themselves; only offsets cross the process boundary
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return _scan(buffer, start, end, fmt, last, kind, tail)
+
+
+def _boundaries(buffer, body: int, size: int, target: int) -> list[int]:
+    cuts = [body]
+    while cuts[-1] + target < size:
+        cut = buffer.find(RECORD_START, cuts[-1] + target)
+        if cut < 0:
+            break
+        cuts.append(cut)
+    cuts.append(size)
+    return cuts
+
+
+def _pool(workers: int):
+    # Forking a process that runs Qt or other threads is unsafe; spawn instead
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _head(buffer):
+    """(root attributes, body start, timestamp format, record, kind, tail) of a flat export, or None."""
+    root = _root(buffer)
+    if root is None:
+        return None
+    attributes, body = root
+    head = buffer[body:body + _HEAD_BYTES]
+    fmt = detect_format(TIMESTAMP.findall(head))
+    # The first record, which must be the first tag of the body, sets the default
+    first = FIRST_RECORD.search(head)
+    if first is None or first.start() != head.find(b"<"):
+        return None
+    record = record_entry(ET.fromstring(first.group(0)))
+    return attributes, body, fmt, record, first.group(0)[_KIND], first.group(1)
+
+
+def scan_flat(path, workers: int | None = None, progress: ProgressCallback | None = None):
+    """Scan a flat export; returns (root attributes, record, times, values, extras) or None if it is not flat.
+
+    `record` is the first record's tag and attributes besides Timestamp and
+    Value, and `extras` the side table of the records that differ from it.
+    Files above PARALLEL_MIN_BYTES are split over `workers` processes
+    (WORKERS by default; 1 scans in this process). Records keep file order.
+    """
+    workers = workers or WORKERS
+    # Pool workers are daemonic and cannot start pools of their own
+    if multiprocessing.current_process().daemon:
+        workers = 1
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            header = _head(buffer)
+            if header is None:
+                return None
+            attributes, body, fmt, record, kind, tail = header
+
+            parallel = workers > 1 and size >= PARALLEL_MIN_BYTES
+            chunks = workers * _CHUNKS_PER_WORKER if parallel else 1
+            target = min(max((size - body) // chunks, _MIN_CHUNK_BYTES), _MAX_CHUNK_BYTES)
+            cuts = _boundaries(buffer, body, size, target)
+            spans = list(zip(cuts[:-1], cuts[1:]))
+            lasts = [False] * (len(spans) - 1) + [True]
+
+            results = []
+
+            def collect(result, end):
+                if result is None:
+                    return False
+                results.append(result)
+                report(progress, "read", sum(len(times) for times, *_ in results), end, end / size)
+                return True
+
+            if not parallel:
+                for (start, end), last in zip(spans, lasts):
+                    if not collect(_scan(buffer, start, end, fmt, last, kind, tail), end):
+                        return None
+            else:
+                pool = _pool(workers)
+                try:
+                    futures = [pool.submit(_scan_file, os.fspath(path), start, end, fmt, last, kind, tail)
+                               for (start, end), last in zip(spans, lasts)]
+                    for future, (_, end) in zip(futures, spans):
+                        if not collect(future.result(), end):
+                            return None
+                finally:
+                    pool.shutdown(cancel_futures=True)
+
+    times = np.concatenate([times for times, *_ in results])
+    values = np.concatenate([values for _, values, *_ in results])
+    offsets = np.cumsum([0] + [len(times) for times, *_ in results[:-1]])
+    rows = np.concatenate([result[2] + offset for result, offset in zip(results, offsets)])
+    entries = [entry for result in results for entry in result[3]]
+    extras = SideTable.interned(rows, entries) if entries else None
+    return attributes, record, times, values, extras
+
+
+class NotFlat(Exception):
+    """An iter_flat chunk turned out not to be flat; the chunks before it were."""
+
+
+def iter_flat(path, chunk_bytes: int = _MIN_CHUNK_BYTES):
+    """Scan a flat export a chunk at a time; returns (root attributes, record, chunks) or None.
+
+    For callers that stream rather than load: `chunks` yields (times,
+    values, extras) for about `chunk_bytes` of records at a time, in file
+    order, so only one chunk is in memory. None means the file does not
+    start flat. A later chunk that is not flat raises NotFlat, and the
+    caller carries on with the XML parser from the records it already has.
+    """
+    f = open(path, "rb")
+    try:
+        size = os.fstat(f.fileno()).st_size
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        header = _head(buffer) if buffer is not None else None
+    except BaseException:
+        f.close()
+        raise
+    if header is None:
+        if buffer is not None:
+            buffer.close()
+        f.close()
+        return None
+    attributes, body, fmt, record, kind, tail = header
+    chunk_bytes = max(chunk_bytes, 1)
+
+    def chunks():
+        try:
+            start = body
+            while start < size:
+                # Each cut is found just before its chunk is scanned: looking
+                # them all up front would fault the whole file in
+                end = buffer.find(RECORD_START, start + chunk_bytes) if start + chunk_bytes < size else -1
+                end = size if end < 0 else end
+                result = _scan(buffer, start, end, fmt, end == size, kind, tail)
+                if result is None:
+                    raise NotFlat(f"{path}: records from byte {start} on are not flat")
+                times, values, rows, entries = result
+                if _DONTNEED is not None:
+                    # Scanned pages are dropped from the mapping (they are read
+                    # back from the file if ever touched), so resident memory
+                    # stays that of one chunk however long the file is
+                    buffer.madvise(_DONTNEED, 0, end - end % mmap.PAGESIZE)
+                yield times, values, SideTable.interned(rows, entries) if entries else None
+                start = end
+        finally:
+            buffer.close()
+            f.close()
+
+    return attributes, record, chunks()
@@ -0,0 +1,258 @@
+"""Structured timing and counter events for the stages of an operation.
+
+    import instrument
+    instrument.add_sink(instrument.JsonLinesSink("stages.jsonl"))
+    tools.delete_existing_trend("trend.xml", "2026-02-12T23:10:00", "2026-02-12T23:13:00", output_file="out.xml")
+
+tools sends a StageEvent to every registered sink for each stage it goes
+through (parse, dates, sort, merge, render, write, ...) and a "total" one
+when the outermost call returns. A sink is any callable taking the event;
+LoggingSink and JsonLinesSink cover the usual cases. With no sink
+registered a stage costs a couple of clock reads.
+
+`profile` captures a cProfile and tracemalloc report of a single run, along
+with its stage events. Work done in flatxml's pool processes shows up in
+the report only as the time spent waiting for them.
+"""
+import contextvars
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, NamedTuple
+
+
+class StageEvent(NamedTuple):
+    """Timing and counters of one stage.
+
+    `operation` is the outermost instrumented call (or CLI command) the stage
+    ran under. The counters are None where a stage has nothing to count.
+    `peak_memory` is in bytes: the peak traced by tracemalloc during the
+    stage when it is tracing (as in profile mode), else the process peak
+    RSS so far, or None where the platform does not tell.
+    """
+    operation: str | None
+    stage: str
+    elapsed: float
+    records_in: int | None = None
+    records_out: int | None = None
+    bytes: int | None = None
+    peak_memory: int | None = None
+
+
+Sink = Callable[[StageEvent], None]
+
+_SINKS: list[Sink] = []
+_LOCK = threading.Lock()
+_OPERATION = contextvars.ContextVar("operation", default=None)
+_CURRENT = contextvars.ContextVar("stage", default=None)
+
+
+def add_sink(sink: Sink):
+    with _LOCK:
+        _SINKS.append(sink)
+
+
+def remove_sink(sink: Sink):
+    with _LOCK:
+        if sink in _SINKS:
+            _SINKS.remove(sink)
+
+
+@contextmanager
+def sink(sink: Sink):
+    """Register `sink` for the duration of a with block."""
+    add_sink(sink)
+    try:
+        yield sink
+    finally:
+        remove_sink(sink)
+
+
+def enabled() -> bool:
+    return bool(_SINKS)
+
+
+def peak_rss() -> int | None:
+    """Peak RSS of this process so far, in bytes, or None where the platform does not tell."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def emit(stage: str, elapsed: float, records_in: int | None = None, records_out: int | None = None,
+         bytes: int | None = None, peak_memory: int | None = None):
+    """Send one event to every sink; for stages timed by their own code (see TrendWriter)."""
+    if not _SINKS:
+        return
+    if peak_memory is None:
+        peak_memory = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else peak_rss()
+    event = StageEvent(_OPERATION.get(), stage, elapsed, records_in, records_out, bytes, peak_memory)
+    for sink in list(_SINKS):
+        sink(event)
+
+
+class Stage:
+    """Counters of a running stage, filled in by the code inside `with stage(...)`."""
+
+    __slots__ = ("name", "records_in", "records_out", "bytes", "peak")
+
+    def __init__(self, name: str, records_in: int | None = None):
+        self.name = name
+        self.records_in = records_in
+        self.records_out = None
+        self.bytes = None
+        self.peak = 0
+
+
+@contextmanager
+def stage(name: str, records_in: int | None = None):
+    """Time the with block as stage `name`; the yielded Stage takes its counters.
+
+    Nothing is emitted if the block raises.
+    """
+    current = Stage(name, records_in)
+    tracing = tracemalloc.is_tracing()
+    parent = _CURRENT.get()
+    if tracing:
+        # The parent's peak so far is kept before the peak is reset for this stage
+        if parent is not None:
+            parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    token = _CURRENT.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        _CURRENT.reset(token)
+    elapsed = time.perf_counter() - started
+    peak = None
+    if tracing and tracemalloc.is_tracing():
+        peak = current.peak = max(current.peak, tracemalloc.get_traced_memory()[1])
+        if parent is not None:
+            parent.peak = max(parent.peak, peak)
+    emit(name, elapsed, current.records_in, current.records_out, current.bytes, peak)
+
+
+@contextmanager
+def operation(name: str):
+    """Name the stages inside after `name` and time them all as a "total" stage.
+
+    Only the outermost operation counts; nested ones (delete_existing_trend
+    calling load_trend, say) just run.
+    """
+    if _OPERATION.get() is not None:
+        yield None
+        return
+    token = _OPERATION.set(name)
+    try:
+        with stage("total") as total:
+            yield total
+    finally:
+        _OPERATION.reset(token)
+
+
+def instrumented(fn):
+    """Run `fn` as an operation named after it."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with operation(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def format_event(event: StageEvent) -> str:
+    text = f"{event.operation or '-'} {event.stage} {event.elapsed:.3f}s"
+    for field in ("records_in", "records_out", "bytes"):
+        value = getattr(event, field)
+        if value is not None:
+            text += f" {field}={value}"
+    if event.peak_memory is not None:
+        text += f" peak={event.peak_memory / 1e6:.1f}MB"
+    return text
+
+
+class LoggingSink:
+    """Log each event as one line; the event itself goes along as record.stage_event."""
+
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger("trend.stages")
+        self.level = level
+
+    def __call__(self, event: StageEvent):
+        self.logger.log(self.level, format_event(event), extra={"stage_event": event._asdict()})
+
+
+class JsonLinesSink:
+    """Append each event as a JSON object per line to a file path or text stream."""
+
+    def __init__(self, destination):
+        self._owns_file = not hasattr(destination, "write")
+        self._file = open(destination, "a", encoding="utf-8") if self._owns_file else destination
+        self._lock = threading.Lock()
+
+    def __call__(self, event: StageEvent):
+        line = json.dumps({"time": time.time(), **event._asdict()})
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+
+@contextmanager
+def profile(destination=None, top: int = 30):
+    """Profile the with block with cProfile and tracemalloc, then write a text report.
+
+    The report (to a path, a text stream, or stderr by default) lists the
+    stage events of the run, the `top` functions by cumulative time and the
+    `top` source lines by memory still allocated at the end. cProfile only
+    follows the calling thread.
+    """
+    import cProfile
+    import io
+    import pstats
+
+    events = []
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    try:
+        with sink(events.append):
+            profiler.enable()
+            try:
+                yield events
+            finally:
+                profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    stats = io.StringIO()
+    pstats.Stats(profiler, stream=stats).sort_stats("cumulative").print_stats(top)
+    lines = ["# Stages", *[format_event(event) for event in events], ""]
+    lines += [f"# Memory: peak traced {peak / 1e6:.1f} MB; top {top} lines still allocated"]
+    lines += [str(statistic) for statistic in snapshot.statistics("lineno")[:top]]
+    lines += ["", "# cProfile, by cumulative time", stats.getvalue()]
+    report = "\n".join(lines)
+
+    if destination is None:
+        sys.stderr.write(report)
+    elif hasattr(destination, "write"):
+        destination.write(report)
+    else:
+        with open(destination, "w", encoding="utf-8") as f:
+            f.write(report)
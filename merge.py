@@ -0,0 +1,146 @@
+"""Merge several time-ordered trends into one, a chunk at a time.
+
+Long histories are often split over several EBO exports that overlap at
+their ends. merge_chunks takes one stream of Trend chunks per input and
+yields the merged trend as a stream of chunks, so however many inputs and
+records there are, only about one chunk per input is held at a time.
+
+It is a k-way merge over chunks rather than records: a heap keeps the
+inputs ordered by the last timestamp they have buffered, and the smallest
+of those is a bound below which no input can produce anything more.
+Everything buffered before the bound is merged with one stable sort and
+yielded; then the input that set the bound reads its next chunk. Records
+sharing a timestamp always end up in the same output chunk, where
+`duplicates` decides which one survives.
+"""
+import heapq
+import time
+
+import numpy as np
+
+from choices import DUPLICATE_POLICIES
+from trend import Trend
+
+
+class MergeStats:
+    """Counters of a merge, filled in as merge_chunks goes."""
+
+    __slots__ = ("records_in", "records_out", "reading", "merging")
+
+    def __init__(self):
+        self.records_in = 0
+        self.records_out = 0
+        # Seconds spent in the input streams and in merge_chunks itself
+        self.reading = 0.0
+        self.merging = 0.0
+
+    @property
+    def duplicates(self) -> int:
+        return self.records_in - self.records_out
+
+
+def deduplicate(trend: Trend, duplicates: str = "first") -> Trend:
+    """One record per timestamp of a time-ordered trend, picked by the `duplicates` policy.
+
+    Records sharing a timestamp are taken to be in input order, as a stable
+    sort leaves them: "first" keeps the earliest, "last" the latest and
+    "max" the highest value (NaN only when all of them are NaN; the
+    earliest on a tie).
+    """
+    if duplicates not in DUPLICATE_POLICIES:
+        raise ValueError(f"Invalid duplicates policy {duplicates!r}; choose one of: {DUPLICATE_POLICIES}")
+    if len(trend) < 2:
+        return trend
+    new = np.concatenate([[True], trend.times[1:] != trend.times[:-1]])
+    if new.all():
+        return trend
+    starts = np.flatnonzero(new)
+    if duplicates == "first":
+        keep = starts
+    elif duplicates == "last":
+        keep = np.append(starts[1:], len(trend)) - 1
+    else:
+        # Each run in descending value order, NaN last; the runs keep their
+        # positions, so the head of every run is at its start
+        group = np.cumsum(new) - 1
+        values = np.where(np.isnan(trend.values), -np.inf, trend.values)
+        keep = np.lexsort((-values, group))[starts]
+    return trend[keep]
+
+
+def merge_chunks(streams, duplicates: str = "first", metadata: dict | None = None, stats: MergeStats | None = None):
+    """Merge time-ordered streams of Trend chunks into one stream of chunks.
+
+    The output is in time order with one record per timestamp (see
+    deduplicate). Its chunks take `metadata`, the first input's by default,
+    and keep every record's side-table entry. Raises ValueError when an
+    input goes back in time.
+    """
+    if duplicates not in DUPLICATE_POLICIES:
+        raise ValueError(f"Invalid duplicates policy {duplicates!r}; choose one of: {DUPLICATE_POLICIES}")
+    stats = stats if stats is not None else MergeStats()
+    streams = [iter(stream) for stream in streams]
+    buffers: list[Trend | None] = [None] * len(streams)
+    lasts = [None] * len(streams)
+    heap = []
+
+    def pull(index: int) -> Trend | None:
+        """The next non-empty chunk of an input, checked to be in time order."""
+        started = time.perf_counter()
+        try:
+            for chunk in streams[index]:
+                if not len(chunk):
+                    continue
+                stats.records_in += len(chunk)
+                behind = lasts[index] is not None and chunk.times[0] < lasts[index]
+                if behind or (chunk.times[1:] < chunk.times[:-1]).any():
+                    raise ValueError(f"Input {index + 1} of the merge is not in time order")
+                lasts[index] = chunk.times[-1]
+                return chunk
+            return None
+        finally:
+            stats.reading += time.perf_counter() - started
+
+    for index in range(len(streams)):
+        chunk = pull(index)
+        if chunk is not None:
+            buffers[index] = chunk
+            heapq.heappush(heap, (chunk.times[-1], index))
+    if metadata is None:
+        first = next((chunk for chunk in buffers if chunk is not None), None)
+        metadata = first.metadata if first is not None else {}
+
+    while True:
+        started = time.perf_counter()
+        # No input still being read can go below the bound; with all of them
+        # done, everything left is final
+        bound = heap[0][0] if heap else None
+        pieces = []
+        for index, buffered in enumerate(buffers):
+            if buffered is None or not len(buffered):
+                continue
+            cut = len(buffered) if bound is None else int(np.searchsorted(buffered.times, bound, side="left"))
+            if cut:
+                pieces.append(buffered[:cut])
+                buffers[index] = buffered[cut:]
+        merged = None
+        if pieces:
+            merged = Trend.concatenate(pieces, metadata)
+            if len(pieces) > 1:
+                merged = merged[np.argsort(merged.times, kind="stable")]
+            merged = deduplicate(merged, duplicates)
+            stats.records_out += len(merged)
+        stats.merging += time.perf_counter() - started
+        if merged is not None:
+            yield merged
+        if not heap:
+            return
+
+        # The input that set the bound reads on; its records at the bound
+        # wait for the next round, since a later chunk may share the timestamp
+        _, index = heapq.heappop(heap)
+        chunk = pull(index)
+        if chunk is not None:
+            rest = buffers[index]
+            buffers[index] = Trend.concatenate([rest, chunk], rest.metadata) if len(rest) else chunk
+            heapq.heappush(heap, (chunk.times[-1], index))
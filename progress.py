@@ -0,0 +1,41 @@
+import os
+from typing import Callable, NamedTuple
+
+
+class Progress(NamedTuple):
+    """One progress report, sent after each chunk of a long operation.
+
+    `stage` is "read" or "write", `records` the records parsed or written so
+    far in that stage and `bytes_read` the bytes consumed from the input, when
+    the reader can tell. `fraction` goes from 0 to 1, or is None when the size
+    of the stage is not known up front.
+    """
+    stage: str
+    records: int
+    bytes_read: int = 0
+    fraction: float | None = None
+
+
+ProgressCallback = Callable[[Progress], None]
+
+
+class Cancelled(Exception):
+    """Raised from a progress callback to stop the operation that called it.
+
+    Writers abort on it like on any other error, so no partial output is left.
+    """
+
+
+def report(progress: ProgressCallback | None, stage: str, records: int, bytes_read: int = 0, fraction: float | None = None):
+    if progress is not None:
+        progress(Progress(stage, records, bytes_read, fraction))
+
+
+def source_size(source) -> int | None:
+    """Size in bytes of a file path or a seekable binary stream, if it has one."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    try:
+        return os.fstat(source.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return None
@@ -0,0 +1,285 @@
+"""Find the stretches of a trend a sensor got wrong.
+
+    scanner = QualityScanner()
+    for chunk in chunks:
+        scanner.feed(chunk)
+    findings = scanner.finish()
+    tools.delete_intervals(trend, intervals(findings, kinds=("spike", "duplicate")))
+
+Five kinds of finding are reported, each as an interval of time:
+
+    gap           no records for longer than gap_factor times the dominant
+                  sample period; the interval is the empty stretch between
+                  the records around it, ready to be filled by modify
+    duplicate     records sharing a timestamp
+    out_of_order  records earlier than one before them in the file
+    spike         records far from the median of their neighbours: more
+                  than `threshold` times the median absolute deviation
+                  (MAD, scaled to a standard deviation) of a centred window
+                  of `window` records (a Hampel filter), the MAD being at
+                  least the median one of its block of 65536 windows
+    flatline      at least `flatline` consecutive records with exactly the
+                  same value
+
+Chunks are fed in file order and only what spans a chunk boundary is kept
+between them (the last timestamp, the open runs, the spike window's
+context and the windows of the spike block not yet complete), so a file
+larger than memory is checked in one streaming pass. Spike blocks are
+counted from the first window of the trend, so the findings are the same
+however the records are chunked. Every detector is a few whole-array
+operations per chunk.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from choices import FINDING_KINDS as KINDS
+from trend import TIME_DTYPE, Trend
+
+# MAD times this estimates the standard deviation of normally distributed values
+_MAD_SCALE = 1.4826
+# Spike windows are sorted this many at a time, so the copies stay small
+_WINDOW_BLOCK = 1 << 18
+# A whole trend is fed in slices of this many records, for the same reason
+_SLICE = 1 << 20
+# Spike windows whose median MAD is the floor of each one's own MAD
+_FLOOR_BLOCK = 1 << 16
+
+
+class Finding(NamedTuple):
+    """One problem: `start` and `end` bound it (inclusive) and `records` counts
+    the records involved, or for a gap the records missing from it."""
+    kind: str
+    start: np.datetime64
+    end: np.datetime64
+    records: int
+    detail: str = ""
+
+    def interval(self) -> tuple[str, str]:
+        """(start, end) as ISO strings, as delete_intervals and modify_intervals take them."""
+        return str(self.start), str(self.end)
+
+
+def intervals(findings, kinds=None) -> list[tuple[str, str]]:
+    """The intervals of the findings of `kinds` (all by default), sorted, with overlapping ones merged.
+
+    Merged intervals never overlap, so they suit modify_intervals as well as delete_intervals.
+    """
+    spans = sorted((f.start, f.end) for f in findings if kinds is None or f.kind in kinds)
+    merged = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(str(start), str(end)) for start, end in merged]
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of the runs of True in a boolean array."""
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.view(np.int8), [0]])))
+    return edges[0::2], edges[1::2]
+
+
+def _time(seconds: int) -> np.datetime64:
+    return np.datetime64(int(seconds), "s")
+
+
+class _Runs:
+    """Runs of consecutive flagged records, kept open across chunks until they end.
+
+    `close(start, end, records, info)` is called for every finished run.
+    """
+
+    def __init__(self, close):
+        self.close = close
+        self.open = None
+
+    def feed(self, mask: np.ndarray, starts: np.ndarray, ends: np.ndarray, lead: int = 0, info=None):
+        """Take a chunk's flags. Each flagged record stands for starts[i]..ends[i];
+        `lead` records before each run belong to it (the first of a run of equal
+        timestamps or values) and `info` is kept from every run's first record."""
+        lo, hi = _runs(mask)
+        if self.open is not None and (not len(lo) or lo[0] > 0):
+            self.close(*self.open)
+            self.open = None
+        if not len(lo):
+            return
+        offsets = np.concatenate([[0], np.cumsum(hi - lo)[:-1]])
+        runs = [list(run) for run in zip(
+            np.minimum.reduceat(starts[mask], offsets).tolist(),
+            np.maximum.reduceat(ends[mask], offsets).tolist(),
+            (hi - lo + lead).tolist(),
+            info[lo].tolist() if info is not None else [None] * len(lo),
+        )]
+        if self.open is not None:
+            # The chunk starts inside the open run; its lead records were counted already
+            start, end, records, first_info = self.open
+            runs[0] = [min(start, runs[0][0]), max(end, runs[0][1]), records + runs[0][2] - lead, first_info]
+            self.open = None
+        if hi[-1] == len(mask):
+            self.open = runs.pop()
+        for run in runs:
+            self.close(*run)
+
+    def finish(self):
+        if self.open is not None:
+            self.close(*self.open)
+            self.open = None
+
+
+class QualityScanner:
+    """Check a trend chunk by chunk in file order; see the module docstring for what is found.
+
+    `period` is the expected seconds between records; by default it is the
+    most common interval in the first chunk that has one. Records at the
+    edges of the trend, half a window at each end, are not tested for
+    spikes; NaN values (EBO's undefined) are left out of the spike and
+    flatline tests.
+    """
+
+    def __init__(self, period: float | None = None, gap_factor: float = 1.5, window: int = 11,
+                 threshold: float = 6.0, flatline: int = 60):
+        if window < 3 or window % 2 == 0:
+            raise ValueError("window must be an odd number of at least 3 records")
+        if gap_factor <= 1:
+            raise ValueError("gap_factor must be above 1")
+        if flatline < 2:
+            raise ValueError("flatline must be at least 2 records")
+        if period is not None and period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self.gap_factor = gap_factor
+        self.window = window
+        self.threshold = threshold
+        self.flatline = flatline
+        self.records = 0
+        self.findings: list[Finding] = []
+
+        self._last_time = None
+        self._last_value = None
+        self._latest = None
+        self._context_times = np.array([], dtype=np.int64)
+        self._context_values = np.array([], dtype=np.float64)
+        # Centre time, centre deviation and MAD of the windows of the open spike block
+        self._block = ([], [], [])
+        self._duplicates = _Runs(self._close_duplicate)
+        self._disorder = _Runs(self._close_disorder)
+        self._flat = _Runs(self._close_flatline)
+        self._spikes = _Runs(self._close_spike)
+
+    def feed(self, trend: Trend):
+        """Check the next chunk of records, in file order."""
+        if not len(trend):
+            return self
+        times = trend.times.astype(TIME_DTYPE).view(np.int64)
+        values = trend.values
+        first = self._last_time is None
+        # Time and value of the record before each one; the very first record has none
+        previous_times = np.concatenate([[times[0] if first else self._last_time], times[:-1]])
+        previous_values = np.concatenate([[np.nan if first else self._last_value], values[:-1]])
+        latest = np.maximum.accumulate(np.concatenate([[times[0] if first else self._latest], times]))[:-1]
+
+        duplicate = times == previous_times
+        duplicate[0] &= not first
+        self._duplicates.feed(duplicate, times, times, lead=1)
+        self._disorder.feed(times < latest, times, latest)
+        self._flat.feed(values == previous_values, np.minimum(previous_times, times), np.maximum(previous_times, times),
+                        lead=1, info=values)
+        # Gaps are measured from the latest record so far, so a file going back
+        # in time and then on does not show a gap where it resumes
+        self._gaps(times, latest)
+        self._spike_feed(times, values)
+
+        self.records += len(times)
+        self._last_time, self._last_value = int(times[-1]), float(values[-1])
+        self._latest = max(int(latest[-1]), int(times[-1]))
+        return self
+
+    def finish(self) -> list[Finding]:
+        """Close the runs still open and return every finding, by start time."""
+        self._spike_flush(final=True)
+        for runs in (self._duplicates, self._disorder, self._flat, self._spikes):
+            runs.finish()
+        self.findings.sort(key=lambda finding: (finding.start, KINDS.index(finding.kind)))
+        return self.findings
+
+    def _gaps(self, times: np.ndarray, latest: np.ndarray):
+        steps = times - latest
+        if self.period is None:
+            positive = steps[steps > 0]
+            if not len(positive):
+                return
+            counts = np.unique(positive, return_counts=True)
+            self.period = float(counts[0][np.argmax(counts[1])])
+        limit = self.gap_factor * self.period
+        for before, after, step in zip(latest[steps > limit].tolist(), times[steps > limit].tolist(),
+                                       steps[steps > limit].tolist()):
+            missing = max(int(round(step / self.period)) - 1, 1)
+            self.findings.append(Finding(
+                "gap", _time(before + 1), _time(after - 1), missing,
+                f"{step} s without records, about {missing} missing at {self.period:g} s"
+            ))
+
+    def _spike_feed(self, times: np.ndarray, values: np.ndarray):
+        # Windows are centred, so each chunk is checked together with the end
+        # of the previous one; the last half window waits for the next chunk
+        numeric = ~np.isnan(values)
+        times = np.concatenate([self._context_times, times[numeric]])
+        values = np.concatenate([self._context_values, values[numeric]])
+        half = self.window // 2
+        if len(values) >= self.window:
+            windows = np.lib.stride_tricks.sliding_window_view(values, self.window)
+            deviations = np.empty(len(windows))
+            mads = np.empty(len(windows))
+            for offset in range(0, len(windows), _WINDOW_BLOCK):
+                block = windows[offset:offset + _WINDOW_BLOCK]
+                median = np.sort(block, axis=1)[:, half]
+                deviation = np.abs(block - median[:, None])
+                deviations[offset:offset + len(block)] = deviation[:, half]
+                mads[offset:offset + len(block)] = np.sort(deviation, axis=1)[:, half]
+            for kept, column in zip(self._block, (times[half:len(times) - half], deviations, mads)):
+                kept.append(column)
+            self._spike_flush()
+            times, values = times[len(times) - 2 * half:], values[len(values) - 2 * half:]
+        self._context_times, self._context_values = times, values
+
+    def _spike_flush(self, final: bool = False):
+        # The MAD of a few records is often far below the noise around them; the
+        # median MAD of the whole block keeps it from flagging plain noise. Only
+        # complete blocks are tested, the last one too when the trend is over
+        centres, deviations, mads = (np.concatenate(kept) if kept else np.array([]) for kept in self._block)
+        complete = len(centres) if final else len(centres) - len(centres) % _FLOOR_BLOCK
+        for offset in range(0, complete, _FLOOR_BLOCK):
+            mad = mads[offset:offset + _FLOOR_BLOCK]
+            scale = np.maximum(mad, np.median(mad))
+            spikes = deviations[offset:offset + _FLOOR_BLOCK] > self.threshold * _MAD_SCALE * scale
+            block = centres[offset:offset + _FLOOR_BLOCK].astype(np.int64)
+            self._spikes.feed(spikes, block, block)
+        self._block = tuple([column[complete:]] for column in (centres, deviations, mads))
+
+    def _close_duplicate(self, start, end, records, info):
+        self.findings.append(Finding("duplicate", _time(start), _time(end), records, f"{records} records at the same time"))
+
+    def _close_disorder(self, start, end, records, info):
+        self.findings.append(Finding(
+            "out_of_order", _time(start), _time(end), records, f"{records} records earlier than one before them"
+        ))
+
+    def _close_flatline(self, start, end, records, value):
+        if records >= self.flatline:
+            self.findings.append(Finding("flatline", _time(start), _time(end), records, f"{records} records of {value:g}"))
+
+    def _close_spike(self, start, end, records, info):
+        self.findings.append(Finding("spike", _time(start), _time(end), records, f"{records} records off their neighbours' median"))
+
+
+def check(chunks, **options) -> list[Finding]:
+    """Scan an iterable of Trend chunks, or a single trend, in one pass (options: see QualityScanner)."""
+    if isinstance(chunks, Trend):
+        trend = chunks
+        chunks = (trend[offset:offset + _SLICE] for offset in range(0, len(trend), _SLICE))
+    scanner = QualityScanner(**options)
+    for chunk in chunks:
+        scanner.feed(chunk)
+    return scanner.finish()
@@ -0,0 +1,283 @@
+"""Edit a trend in memory, step by step, with undo and redo, and write it once.
+
+    session = EditSession.open("input/ahu1.xml")
+    session.delete([("2026-02-12T23:10:00", "2026-02-12T23:13:00")])
+    session.modify([("2026-02-13T08:00:00", "2026-02-13T09:00:00")], constant_value=21.5)
+    session.undo()
+    session.save_journal("output/ahu1.journal.json")
+    session.export("output/results/ahu1.xml")
+
+The trend is held as a tuple of pieces, slices of the loaded trend and the
+records each edit produced, in time order. An edit only copies the records
+between its first and last interval (its window) and splices the result in
+between the untouched pieces, which are shared, not copied; so an edit costs
+the size of its window rather than of the trend, and undo and redo just
+swap one tuple of pieces for another. The pieces are joined once, by export.
+
+Operations are dicts in the format of batch manifests ({"op": "delete",
+"intervals": [...]}, {"op": "modify", "range_start": ..., ...}) and every
+one applied is kept in the journal. A saved journal is replayed on a fresh
+export of the same trend with replay(), or from the command line with
+`cli.py replay`; the journal holds times, not record positions, so records
+added since the first export are left alone.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+import batch
+import tools
+from decimate import Envelope, minmax_envelope
+from progress import report
+from timestamps import parse_timestamp
+from trend import TIME_DTYPE, Trend
+
+# Keyword arguments of each operation a session can apply, as in batch manifests
+OPERATIONS = {name: batch.OPERATIONS[name] for name in ("delete", "modify")}
+
+
+def _validate(operation: dict):
+    name = operation.get("op")
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown operation {name!r}; choose one of: {list(OPERATIONS)}")
+    unknown = set(operation) - {"op"} - set(OPERATIONS[name])
+    if unknown:
+        raise ValueError(f"Unknown arguments for {name}: {sorted(unknown)}")
+
+
+def _span(operation: dict) -> tuple[np.datetime64, np.datetime64]:
+    """First start and last end of an operation's intervals."""
+    intervals = operation.get("intervals")
+    if intervals is None:
+        intervals = [(operation.get("range_start"), operation.get("range_end"))]
+    if not intervals:
+        raise ValueError("At least one interval must be provided")
+    bounds = [(i["range_start"], i["range_end"]) if isinstance(i, dict) else tuple(i) for i in intervals]
+    if any(start is None or end is None for start, end in bounds):
+        raise ValueError("Either range_start and range_end or intervals must be provided")
+    starts = [np.datetime64(parse_timestamp(start), "s") for start, _ in bounds]
+    ends = [np.datetime64(parse_timestamp(end), "s") for _, end in bounds]
+    return min(starts), max(ends)
+
+
+def _journaled(intervals) -> list:
+    # (start, end) pairs become [start, end] lists of strings, as JSON keeps them
+    return [interval if isinstance(interval, dict) else [str(bound) for bound in interval] for interval in intervals]
+
+
+def _apply(trend: Trend, operation: dict) -> Trend:
+    arguments = {key: value for key, value in operation.items() if key != "op"}
+    if operation["op"] == "delete":
+        return tools.delete_intervals(trend, **arguments) if "intervals" in arguments else tools.delete_trend(trend, **arguments)
+    return tools.modify_intervals(trend, **arguments) if "intervals" in arguments else tools.modify_trend(trend, **arguments)
+
+
+class EditSession:
+    """A trend under edit: its current pieces, the journal of applied operations and those undone.
+
+    `source` is the file the trend came from, kept in the journal.
+    """
+
+    def __init__(self, trend: Trend, source=None):
+        self.metadata = trend.metadata
+        self.source = str(Path(source).resolve()) if source is not None else None
+        self.pieces: tuple[Trend, ...] = (trend,) if len(trend) else ()
+        # (operation, pieces before, pieces after) of every applied and every undone edit
+        self._done = []
+        self._undone = []
+        self._joined = None
+        self._envelopes = {}
+
+    @classmethod
+    def open(cls, path, progress=None):
+        """Load a trend file (through tools.load_trend and its cache) into a new session."""
+        return cls(tools.load_trend(path, progress), path)
+
+    def __len__(self):
+        return sum(len(piece) for piece in self.pieces)
+
+    def __repr__(self):
+        return f"EditSession(name={self.metadata.get('name')!r}, records={len(self)}, operations={len(self._done)})"
+
+    @property
+    def journal(self) -> list[dict]:
+        """The operations applied so far, in order; undone ones are left out."""
+        return [operation for operation, _, _ in self._done]
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._done)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._undone)
+
+    @property
+    def trend(self) -> Trend:
+        """The current trend as one Trend; joined on first use after each change."""
+        if self._joined is None or self._joined[0] is not self.pieces:
+            pieces = self.pieces
+            if len(pieces) == 1:
+                joined = pieces[0]
+            else:
+                joined = Trend.concatenate(pieces, self.metadata) if pieces else Trend([], [], self.metadata)
+            self._joined = (pieces, joined)
+        return self._joined[1]
+
+    def apply(self, operation: dict) -> "EditSession":
+        """Apply a delete or modify operation (see OPERATIONS) to the records in its window.
+
+        The window reaches one record past the outermost intervals on each
+        side, so a delete can only empty it by emptying the whole trend,
+        which raises ValueError as tools.delete_intervals does. Clears the
+        redo list.
+        """
+        operation = dict(operation)
+        _validate(operation)
+        start, end = _span(operation)
+        lo = max(self._index(start, "left") - 1, 0)
+        hi = min(self._index(end, "right") + 1, len(self))
+        head, window, tail = self._cut(lo, hi)
+        if len(window) == 1:
+            window = window[0]
+        else:
+            window = Trend.concatenate(window, self.metadata) if window else Trend([], [], self.metadata)
+        edited = _apply(window, operation)
+
+        before = self.pieces
+        self.pieces = head + ((edited,) if len(edited) else ()) + tail
+        self._done.append((operation, before, self.pieces))
+        self._undone.clear()
+        return self
+
+    def delete(self, intervals) -> "EditSession":
+        """Apply a delete of `intervals`, (start, end) pairs or dicts as tools.delete_intervals takes them."""
+        return self.apply({"op": "delete", "intervals": _journaled(intervals)})
+
+    def modify(self, intervals, step: str = "minute", calc: str | None = None, constant_value: float | None = None,
+               **signal) -> "EditSession":
+        """Apply a modify of `intervals`, with the arguments of tools.modify_intervals."""
+        operation = {"op": "modify", "intervals": _journaled(intervals), "step": step}
+        if calc is not None:
+            operation["calc"] = calc
+        if constant_value is not None:
+            operation["constant_value"] = constant_value
+        operation.update(signal)
+        return self.apply(operation)
+
+    def undo(self) -> dict | None:
+        """Take back the last operation applied; returns it, or None with nothing to undo."""
+        if not self._done:
+            return None
+        operation, before, after = self._done.pop()
+        self.pieces = before
+        self._undone.append((operation, before, after))
+        return operation
+
+    def redo(self) -> dict | None:
+        """Apply again the last operation undone; returns it, or None with nothing to redo."""
+        if not self._undone:
+            return None
+        operation, before, after = self._undone.pop()
+        self.pieces = after
+        self._done.append((operation, before, after))
+        return operation
+
+    def replay(self, operations, progress=None) -> "EditSession":
+        """Apply a journal (see load_journal) one operation after the other, each undoable on its own."""
+        operations = list(operations)
+        for count, operation in enumerate(operations, start=1):
+            self.apply(operation)
+            report(progress, "replay", count, fraction=count / len(operations))
+        return self
+
+    def save_journal(self, path, output=None):
+        """Write the journal as JSON: the source file, `output` if given and the operations in order.
+
+        With an output the file has the fields of a batch manifest job.
+        """
+        journal = {"input": self.source, "operations": self.journal}
+        if output is not None:
+            journal["output"] = str(Path(output).resolve())
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(journal, f, indent=2)
+        return path
+
+    def export(self, output_file, progress=None, locale: str | None = None):
+        """Write the current trend, joined once, to `output_file` (see tools.write_trend)."""
+        tools.write_trend(self.trend, output_file, progress, locale=locale)
+        return output_file
+
+    def envelope(self, buckets: int, start=None, end=None) -> Envelope:
+        """decimate.minmax_envelope of the current trend, from the envelopes of its pieces.
+
+        Envelopes of pieces are kept for the last (buckets, start, end), so
+        after an edit only the pieces the edit produced are reduced again.
+        """
+        pieces = self.pieces
+        if not pieces:
+            empty = np.array([], dtype=np.float64)
+            return Envelope(np.array([], dtype=np.int64), empty, empty, 0)
+        start = start if start is not None else pieces[0].times[0]
+        end = end if end is not None else pieces[-1].times[-1]
+        key = (buckets, int(np.datetime64(start, "s").astype(np.int64)), int(np.datetime64(end, "s").astype(np.int64)))
+        cached = self._envelopes if self._envelopes.get("key") == key else {"key": key}
+        # Pieces are kept along with their envelopes, so an id is never reused while cached
+        envelopes = {id(piece): cached.get(id(piece)) or (piece, minmax_envelope(piece, buckets, start, end))
+                     for piece in pieces}
+        self._envelopes = {"key": key, **envelopes}
+
+        parts = [envelope for _, envelope in envelopes.values() if len(envelope.times)]
+        if not parts:
+            empty = np.array([], dtype=np.float64)
+            return Envelope(np.array([], dtype=np.int64), empty, empty, 0)
+        times = np.concatenate([part.times for part in parts])
+        low = np.concatenate([part.low for part in parts])
+        high = np.concatenate([part.high for part in parts])
+        # Neighbouring pieces may share a bucket; each bucket is one run of equal times
+        starts = np.flatnonzero(np.concatenate([[True], times[1:] != times[:-1]]))
+        return Envelope(times[starts], np.fmin.reduceat(low, starts), np.fmax.reduceat(high, starts),
+                        sum(part.records for part in parts))
+
+    def _index(self, time, side: str) -> int:
+        """Position in the current trend where `time` would go, as np.searchsorted(side) on the joined times."""
+        time = np.datetime64(time, "s").astype(TIME_DTYPE)
+        offset = 0
+        for piece in self.pieces:
+            if side == "left" and piece.times[-1] >= time or side == "right" and piece.times[-1] > time:
+                return offset + int(np.searchsorted(piece.times, time, side=side))
+            offset += len(piece)
+        return offset
+
+    def _cut(self, lo: int, hi: int) -> tuple[tuple, list, tuple]:
+        """The pieces before position `lo`, those between `lo` and `hi` (sliced to them) and those after `hi`."""
+        head, window, tail = [], [], []
+        offset = 0
+        for piece in self.pieces:
+            first, last = offset, offset + len(piece)
+            offset = last
+            if last <= lo:
+                head.append(piece)
+            elif first >= hi:
+                tail.append(piece)
+            else:
+                if first < lo:
+                    head.append(piece[:lo - first])
+                window.append(piece[max(lo - first, 0):min(hi, last) - first])
+                if last > hi:
+                    tail.append(piece[hi - first:])
+        return tuple(head), window, tuple(tail)
+
+
+def load_journal(path) -> dict:
+    """Read a journal written by EditSession.save_journal; its operations are checked here."""
+    with open(path, encoding="utf-8") as f:
+        journal = json.load(f)
+    operations = journal.get("operations")
+    if not isinstance(operations, list):
+        raise ValueError(f"{path} is not an edit journal: no list of operations")
+    for operation in operations:
+        _validate(operation)
+    return journal
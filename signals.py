@@ -0,0 +1,67 @@
+import numpy as np
+
+# RAMP, a linear ramp between two endpoint values, is not a function of the index alone
+from choices import RAMP, SIGNALS
+
+# Every method maps a whole index array at once; values match the scalar
+# math-module versions these replaced to the 5-decimal rounding
+CALC_METHODS = {
+    "linear": lambda x: x,
+    "linear_double": lambda x: x * 2,
+    "sin": np.sin,
+    "cos": np.cos,
+    "square": lambda x: x ** 2,
+    "sqrt": lambda x: np.where(x >= 0, np.sqrt(np.abs(x)), 0.0),
+    "log": lambda x: np.log(x + 1)
+}
+
+# Methods whose `period` is a full turn of their argument rather than a repeat of the index
+PERIODIC = {"sin", "cos"}
+
+
+def signal_values(
+    calc: str,
+    count: int,
+    amplitude: float = 1.0,
+    offset: float = 0.0,
+    period: float | None = None,
+    noise: float = 0.0,
+    seed: int | None = None,
+    ramp_start: float = 0.0,
+    ramp_end: float = 1.0
+) -> np.ndarray:
+    """Values of a generated signal for `count` consecutive samples, rounded to 5 decimals.
+
+    Without extra parameters this is CALC_METHODS[calc] over 0..count-1. The
+    method's output is scaled by `amplitude` and shifted by `offset`. `period`
+    (in samples) makes the signal repeat: sin/cos complete one cycle per
+    period, other methods restart their index. "ramp" goes linearly from
+    `ramp_start` to `ramp_end` over the range (or over each period).
+    Gaussian `noise` with that standard deviation is added last, reproducible
+    with `seed`.
+    """
+    if calc not in SIGNALS:
+        raise ValueError(f"Invalid calc method. Choose one of: {SIGNALS}")
+    if period is not None and period <= 0:
+        raise ValueError("period must be a positive number of samples")
+
+    index = np.arange(count, dtype=np.float64)
+    if calc == RAMP:
+        span = period or count
+        position = (index % span) / max(span - 1, 1)
+        values = ramp_start + (ramp_end - ramp_start) * position
+    else:
+        if period is None:
+            x = index
+        elif calc in PERIODIC:
+            x = index * (2 * np.pi / period)
+        else:
+            x = index % period
+        values = CALC_METHODS[calc](x)
+        # Skipped for the defaults so plain methods keep their exact values
+        if amplitude != 1.0 or offset != 0.0:
+            values = offset + amplitude * values
+
+    if noise:
+        values = values + np.random.default_rng(seed).normal(0.0, noise, count)
+    return np.round(values, 5)
@@ -0,0 +1,222 @@
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from progress import ProgressCallback, report, source_size
+from timestamps import detect_format, parse_timestamps
+from trend import CHUNK_SIZE
+
+COLUMNS = ["timestamp", "value"]
+COLUMNS_ERROR = "Excel must have exactly two columns named: timestamp, value"
+
+SUFFIXES = {
+    ".xlsx": "xlsx",
+    ".xlsm": "xlsx",
+    ".xls": "xls",
+    ".csv": "csv",
+    ".txt": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+}
+
+
+def table_format(source) -> str:
+    """Tell xlsx, xls, csv and parquet apart, by suffix for paths or by magic bytes for streams."""
+    if isinstance(source, (str, os.PathLike)):
+        suffix = Path(source).suffix.lower()
+        if suffix not in SUFFIXES:
+            raise ValueError(f"Unsupported spreadsheet type {suffix!r}; use one of: {sorted(SUFFIXES)}")
+        return SUFFIXES[suffix]
+
+    head = source.read(8)
+    source.seek(0)
+    if head.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    if head.startswith(b"PAR1"):
+        return "parquet"
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        return "xls"
+    return "csv"
+
+
+def _xlsx_frames(source, chunk_size: int):
+    # Read-only openpyxl streams rows instead of loading the whole workbook
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        # Taken from the sheet's stored dimension, which some writers leave out
+        total = (sheet.max_row or 0) - 1
+        rows = sheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        # Formatted but empty cells show up as trailing Nones
+        while header and header[-1] is None:
+            header.pop()
+        width = len(header)
+
+        chunk, blank_rows, done = [], 0, 0
+        for row in rows:
+            if all(cell is None for cell in row):
+                # Trailing blank rows are ignored, blank rows between data are empty cells
+                blank_rows += 1
+                continue
+            if any(cell is not None for cell in row[width:]):
+                raise ValueError(COLUMNS_ERROR)
+            chunk.extend([(None,) * width] * blank_rows)
+            blank_rows = 0
+            chunk.append(tuple(row[:width]) + (None,) * (width - len(row)))
+            if len(chunk) >= chunk_size:
+                done += len(chunk)
+                yield pd.DataFrame(chunk, columns=header), 0, min(done / total, 1.0) if total > 0 else None
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header), 0, 1.0
+    finally:
+        workbook.close()
+
+
+def _csv_frames(source, chunk_size: int):
+    import pandas as pd
+
+    # Opened here so the reader's position tells how many bytes were consumed
+    owns_source = isinstance(source, (str, os.PathLike))
+    handle = open(source, "rb") if owns_source else source
+    size = source_size(handle)
+    try:
+        for df in pd.read_csv(handle, chunksize=chunk_size):
+            try:
+                position = handle.tell()
+            except (AttributeError, OSError, ValueError):
+                position = 0
+            yield df, position, min(position / size, 1.0) if size else None
+    finally:
+        if owns_source:
+            handle.close()
+
+
+def _frames(source, chunk_size: int):
+    """Yield (frame, bytes read, fraction done) for each chunk of the sheet."""
+    import pandas as pd
+
+    kind = table_format(source)
+    if kind == "xlsx":
+        yield from _xlsx_frames(source, chunk_size)
+    elif kind == "csv":
+        yield from _csv_frames(source, chunk_size)
+    elif kind == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading Parquet files requires pyarrow")
+        parquet = pq.ParquetFile(source)
+        total, done = parquet.metadata.num_rows, 0
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            done += batch.num_rows
+            yield batch.to_pandas(), 0, done / total if total else None
+    else:
+        # Legacy .xls has no streaming reader; slice it after loading
+        df = pd.read_excel(source)
+        for offset in range(0, max(len(df), 1), chunk_size):
+            yield df.iloc[offset:offset + chunk_size], 0, min(offset + chunk_size, len(df)) / max(len(df), 1)
+
+
+def _validate_frame(df, first_row: int = 2, previous=None, fmt: str | None = None):
+    """Validate one chunk of a (timestamp, value) sheet; returns (times, values).
+
+    `first_row` is the sheet row of the chunk's first record (the header is
+    row 1) and `previous` the last timestamp of the chunk before, so chunks can
+    be checked one after another as they are read.
+    """
+    import pandas as pd
+
+    # ----------------------------
+    # Columns (order + names)
+    # ----------------------------
+    if list(df.columns) != COLUMNS:
+        raise ValueError(COLUMNS_ERROR)
+
+    # ----------------------------
+    # Empty cells
+    # ----------------------------
+    if df.isnull().to_numpy().any():
+        raise ValueError("Excel contains empty cells")
+
+    # ----------------------------
+    # Timestamp validation (Excel-safe)
+    # ----------------------------
+    column = df["timestamp"]
+    if pd.api.types.is_datetime64_any_dtype(column):
+        # Whole column already typed as dates: one bulk conversion
+        if getattr(column.dt, "tz", None) is not None:
+            column = column.dt.tz_localize(None)
+        parsed_timestamps = column.to_numpy().astype("datetime64[s]")
+    else:
+        raw = column.tolist()
+        parsed_timestamps = np.full(len(raw), np.datetime64("NaT"), dtype="datetime64[s]")
+
+        # Cells Excel already typed as dates are taken as they are; text cells are
+        # parsed in bulk with the format detected from the column
+        is_date = np.fromiter((isinstance(v, datetime) for v in raw), dtype=bool, count=len(raw))
+        date_rows = np.flatnonzero(is_date)
+        text_rows = np.flatnonzero(~is_date)
+        if len(date_rows):
+            parsed_timestamps[date_rows] = np.array([raw[i].replace(tzinfo=None) for i in date_rows.tolist()], dtype="datetime64[s]")
+        if len(text_rows):
+            parsed_timestamps[text_rows] = parse_timestamps([str(raw[i]) for i in text_rows.tolist()], fmt, errors="coerce")
+
+        invalid = np.flatnonzero(np.isnat(parsed_timestamps))
+        if len(invalid):
+            raise ValueError(
+                f"Invalid timestamp at row {invalid[0] + first_row}: {raw[invalid[0]]}"
+            )
+
+    # ----------------------------
+    # Sorted check (one pass, including the boundary with the previous chunk)
+    # ----------------------------
+    if (parsed_timestamps[1:] < parsed_timestamps[:-1]).any() or (
+        previous is not None and len(parsed_timestamps) and parsed_timestamps[0] < previous
+    ):
+        raise ValueError("Timestamps must be in ascending order")
+
+    # ----------------------------
+    # Numeric values
+    # ----------------------------
+    if not pd.api.types.is_numeric_dtype(df["value"]):
+        raise ValueError("Column 'value' must be numeric")
+
+    return parsed_timestamps, df["value"].to_numpy(dtype=np.float64)
+
+
+def validate_excel_trend(df):
+    """Validate a whole (timestamp, value) sheet; returns its timestamps as a list of datetimes, as it always has."""
+    parsed_timestamps, _ = _validate_frame(df)
+    return parsed_timestamps.tolist()
+
+
+def iter_table(source, chunk_size: int = CHUNK_SIZE, progress: ProgressCallback | None = None):
+    """Read and validate a (timestamp, value) sheet chunk by chunk.
+
+    Yields (times, values) arrays as soon as each chunk has been validated, so
+    records can be written out while the rest of the file is still being read.
+    Accepts .xlsx/.xlsm (streamed with read-only openpyxl), .csv, .parquet
+    (needs pyarrow) and legacy .xls, as paths or binary streams. `progress` is
+    told the records validated (and, for CSV, bytes read) after every chunk.
+    """
+    first_row = 2
+    previous = None
+    fmt = None
+    for df, bytes_read, fraction in _frames(source, chunk_size):
+        if fmt is None and list(df.columns) == COLUMNS:
+            # Detected once, on the first chunk with text timestamps
+            fmt = detect_format([v for v in df["timestamp"].tolist() if isinstance(v, str)])
+        times, values = _validate_frame(df, first_row, previous, fmt)
+        first_row += len(df)
+        report(progress, "read", first_row - 2, bytes_read, fraction)
+        if len(times):
+            previous = times[-1]
+            yield times, values
+
@@ -0,0 +1,20 @@
+import batch
+
+
+def test_missing_range_is_reported_as_value_error(tmp_path):
+    job = {"output": str(tmp_path / "out.xml"), "input": str(tmp_path / "in.xml"),
+           "operations": [{"op": "modify", "range_start": "2026-02-12T00:10:00", "constant_value": 5}]}
+    result = batch.run_job(job)
+    assert result["status"] == "error"
+    assert result["error"] == "ValueError: Missing arguments for modify: ['range_end']"
+
+
+def test_generate_then_modify_without_step(tmp_path):
+    job = {"output": str(tmp_path / "out.xml"), "operations": [
+        {"op": "generate", "start_date": "2026-02-12T00:00:00", "end_date": "2026-02-12T01:00:00",
+         "step": "minute", "calc": "linear"},
+        {"op": "modify", "range_start": "2026-02-12T00:10:00", "range_end": "2026-02-12T00:12:00", "constant_value": 5},
+    ]}
+    result = batch.run_job(job)
+    assert result["status"] == "ok", result["error"]
+    assert result["records_out"] == 61
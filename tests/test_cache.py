@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+import tools
+from cache import TrendCache, sidecar_path
+from trend import Trend
+
+
+@pytest.fixture
+def export(tmp_path):
+    times = np.datetime64("2026-02-12T00:00:00") + (np.arange(100) * 60).astype("timedelta64[s]")
+    path = tmp_path / "trend.xml"
+    tools.write_trend(Trend(times, np.arange(100, dtype=np.float64), {"name": "test"}), str(path))
+    return path
+
+
+def counting(parses: list):
+    def parse(path):
+        parses.append(path)
+        return tools.load_trend(path, cache=None)
+    return parse
+
+
+def test_unchanged_file_is_parsed_once(export):
+    cache, parses = TrendCache(), []
+    first = cache.load(str(export), counting(parses))
+    second = cache.load(str(export), counting(parses))
+    assert len(parses) == 1 and (cache.hits, cache.misses) == (1, 1)
+    assert second.values.tolist() == first.values.tolist()
+    # Callers share the arrays, not the Trend
+    second.metadata = {}
+    assert cache.load(str(export), counting(parses)).metadata["name"] == "test"
+
+
+def test_new_mtime_or_size_is_parsed_again(export):
+    cache, parses = TrendCache(), []
+    cache.load(str(export), counting(parses))
+    stat = export.stat()
+    os.utime(export, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    cache.load(str(export), counting(parses))
+    with open(export, "a", encoding="utf-8") as f:
+        f.write("\n")
+    cache.load(str(export), counting(parses))
+    assert len(parses) == 3 and cache.hits == 0
+
+
+def test_cache_is_bounded_by_bytes(export, tmp_path):
+    other = tmp_path / "other.xml"
+    other.write_bytes(export.read_bytes())
+    one = tools.load_trend(str(export), cache=None)
+    nbytes = one.times.nbytes + one.values.nbytes + one.extras.rows.nbytes
+    cache, parses = TrendCache(max_bytes=nbytes), []
+    cache.load(str(export), counting(parses))
+    cache.load(str(other), counting(parses))
+    assert len(cache) == 1 and cache.size == nbytes
+    cache.load(str(export), counting(parses))
+    assert len(parses) == 3
+
+
+def test_sidecar_is_reused_across_caches_until_the_file_changes(export):
+    parses = []
+    TrendCache(sidecar=True).load(str(export), counting(parses))
+    assert os.path.exists(sidecar_path(export))
+    reopened = TrendCache(sidecar=True).load(str(export), counting(parses))
+    assert len(parses) == 1 and len(reopened) == 100
+
+    with open(export, "a", encoding="utf-8") as f:
+        f.write("\n")
+    TrendCache(sidecar=True).load(str(export), counting(parses))
+    assert len(parses) == 2
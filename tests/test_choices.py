@@ -0,0 +1,40 @@
+import pytest
+
+import choices
+import cli
+import merge
+import quality
+import resample
+import signals
+import timestamps
+
+
+def test_modules_share_the_choices():
+    assert tuple(signals.CALC_METHODS) == choices.CALCS
+    assert tuple(signals.SIGNALS) == choices.SIGNALS
+    assert resample.AGGREGATIONS == choices.AGGREGATIONS
+    assert resample.FILLS == choices.FILLS
+    assert merge.DUPLICATE_POLICIES == choices.DUPLICATE_POLICIES
+    assert quality.KINDS == choices.FINDING_KINDS
+    assert tuple(timestamps.LOCALE_FORMATS) == choices.LOCALES
+
+
+def test_command_line_offers_every_choice():
+    commands = {name: parser for name, parser in cli.build_parser()._subparsers._group_actions[0].choices.items()}
+
+    def offered(command, option):
+        return [action.choices for action in commands[command]._actions if option in action.option_strings][0]
+
+    assert tuple(offered("generate", "--calc")) == choices.SIGNALS
+    assert tuple(offered("resample", "--how")) == choices.AGGREGATIONS
+    assert tuple(offered("resample", "--fill")) == choices.FILLS
+    assert tuple(offered("merge", "--duplicates")) == choices.DUPLICATE_POLICIES
+    assert tuple(offered("check", "--kinds")) == choices.FINDING_KINDS
+    assert tuple(offered("delete", "--locale")) == (*choices.LOCALES, "source")
+
+
+def test_gui_labels_cover_every_choice():
+    app = pytest.importorskip("app")
+    assert app.SIGNALS == [*app.CALC_METHODS, choices.RAMP]
+    assert set(app.AGGREGATIONS.values()) == set(choices.AGGREGATIONS)
+    assert set(app.FILLS.values()) - {None} == set(choices.FILLS)
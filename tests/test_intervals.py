@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import tools
+from trend import Trend
+
+
+@pytest.fixture
+def hour():
+    times = np.datetime64("2026-02-12T00:00:00") + (np.arange(60) * 60).astype("timedelta64[s]")
+    return Trend(times, np.arange(60, dtype=np.float64), {"name": "test"})
+
+
+def at(minute: int) -> str:
+    return f"2026-02-12T00:{minute:02d}:00"
+
+
+def test_delete_intervals_matches_one_delete_at_a_time(hour):
+    # Unordered, with two overlapping intervals
+    intervals = [(at(40), at(45)), (at(5), at(9)), (at(8), at(12)), {"range_start": at(30), "range_end": at(30)}]
+    expected = hour
+    for start, end in [(at(40), at(45)), (at(5), at(12)), (at(30), at(30))]:
+        expected = tools.delete_trend(expected, start, end)
+
+    kept = tools.delete_intervals(hour, intervals)
+    assert kept.times.tolist() == expected.times.tolist()
+    assert kept.values.tolist() == expected.values.tolist()
+    assert len(kept) == 60 - 6 - 8 - 1
+
+
+def test_delete_intervals_refuses_to_empty_the_trend(hour):
+    with pytest.raises(ValueError, match="empty"):
+        tools.delete_intervals(hour, [(at(0), at(30)), (at(31), at(59))])
+
+
+def test_modify_intervals_matches_one_modify_at_a_time(hour):
+    intervals = [
+        {"range_start": at(50), "range_end": at(54), "calc": "linear"},
+        (at(10), at(12)),
+        {"range_start": at(20), "range_end": at(21), "constant_value": -1.0, "step": "second"},
+    ]
+    expected = tools.modify_trend(hour, at(10), at(12), constant_value=7.0)
+    expected = tools.modify_trend(expected, at(20), at(21), "second", constant_value=-1.0)
+    expected = tools.modify_trend(expected, at(50), at(54), calc="linear")
+
+    modified = tools.modify_intervals(hour, intervals, constant_value=7.0)
+    assert modified.times.tolist() == expected.times.tolist()
+    assert modified.values.tolist() == expected.values.tolist()
+    # One minute in seconds replaces two records with 61
+    assert len(modified) == 60 - 2 + 61
+    assert modified.values[50 - 2 + 61:55 - 2 + 61].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_modify_intervals_must_not_overlap(hour):
+    with pytest.raises(ValueError, match="overlap"):
+        tools.modify_intervals(hour, [(at(10), at(20)), (at(20), at(30))], constant_value=1.0)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import tools
+from merge import MergeStats, deduplicate, merge_chunks
+from trend import Trend
+
+
+def minutes(offsets, values) -> Trend:
+    times = np.datetime64("2026-02-12T00:00:00") + (np.array(offsets) * 60).astype("timedelta64[s]")
+    return Trend(times, np.array(values, dtype=np.float64), {"name": "test"})
+
+
+def chunked(trend: Trend, size: int):
+    return [trend[offset:offset + size] for offset in range(0, len(trend), size)]
+
+
+# Both exports hold minutes 3 and 4, the second one with a NaN at 3
+OLDER = minutes(range(5), [0.0, 1.0, 2.0, 3.0, 4.0])
+NEWER = minutes(range(3, 8), [np.nan, 40.0, 5.0, 6.0, 7.0])
+
+
+@pytest.mark.parametrize("duplicates, expected", [
+    ("first", [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]),
+    ("last", [0.0, 1.0, 2.0, np.nan, 40.0, 5.0, 6.0, 7.0]),
+    ("max", [0.0, 1.0, 2.0, 3.0, 40.0, 5.0, 6.0, 7.0]),
+])
+@pytest.mark.parametrize("size", [1, 2, 5])
+def test_duplicate_policies_whatever_the_chunking(duplicates, expected, size):
+    stats = MergeStats()
+    merged = Trend.concatenate(list(merge_chunks([chunked(OLDER, size), chunked(NEWER, size)], duplicates, stats=stats)))
+    assert merged.times.tolist() == minutes(range(8), expected).times.tolist()
+    np.testing.assert_array_equal(merged.values, expected)
+    assert (stats.records_in, stats.records_out, stats.duplicates) == (10, 8, 2)
+
+
+def test_max_keeps_nan_only_when_every_value_is_nan():
+    trend = minutes([0, 0, 1, 1], [np.nan, np.nan, np.nan, 2.0])
+    np.testing.assert_array_equal(deduplicate(trend, "max").values, [np.nan, 2.0])
+
+
+def test_input_going_back_in_time_is_refused():
+    with pytest.raises(ValueError, match="Input 2"):
+        list(merge_chunks([[OLDER], [NEWER[2:], NEWER[:2]]]))
+
+
+def test_unknown_policy_is_refused():
+    with pytest.raises(ValueError, match="duplicates policy"):
+        deduplicate(OLDER, "mean")
+
+
+def test_merge_existing_trends_streams_the_same_policy(tmp_path):
+    paths = [str(tmp_path / "older.xml"), str(tmp_path / "newer.xml")]
+    tools.write_trend(OLDER, paths[0])
+    tools.write_trend(NEWER, paths[1])
+    output = str(tmp_path / "merged.xml")
+    tools.merge_existing_trends(paths, output, duplicates="last")
+    merged = tools.load_trend(output, cache=None)
+    np.testing.assert_array_equal(merged.values, [0.0, 1.0, 2.0, np.nan, 40.0, 5.0, 6.0, 7.0])
+    assert merged.stats().count == 8
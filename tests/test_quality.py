@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import quality
+import tools
+from trend import Trend
+
+
+@pytest.fixture(scope="module")
+def noisy():
+    """300k minute records with 200 spikes and the noise dropping tenfold halfway."""
+    rng = np.random.default_rng(5)
+    n = 300_000
+    times = np.datetime64("2020-01-01T00:00:00") + (np.arange(n) * 60).astype("timedelta64[s]")
+    values = rng.normal(0, 1, n)
+    values[n // 2:] *= 0.1
+    values[rng.integers(0, n, 200)] += 30
+    return Trend(times, values)
+
+
+@pytest.mark.parametrize("chunk", [1000, 7777, 65536, 100_000])
+def test_findings_do_not_depend_on_chunking(noisy, chunk):
+    whole = quality.check(noisy)
+    chunked = quality.check(noisy[offset:offset + chunk] for offset in range(0, len(noisy), chunk))
+    assert chunked == whole
+    assert sum(finding.kind == "spike" for finding in whole) >= 200
+
+
+def test_file_check_matches_loaded_check(noisy, tmp_path):
+    path = tmp_path / "noisy.xml"
+    tools.write_trend(noisy, str(path))
+    assert tools.check_existing_trend(str(path)) == tools.check_trend(tools.load_trend(str(path), cache=None))
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from resample import resample, step_delta
+from trend import Trend
+
+
+def trend(stamps, values) -> Trend:
+    return Trend(np.array(stamps, dtype="datetime64[s]"), np.array(values, dtype=np.float64))
+
+
+# Records at :07:59, :08:00 and :14:59 fall in the :00 bin of 15 minutes, :15:00 opens the next
+SAMPLE = trend(
+    ["2026-02-12T10:07:59", "2026-02-12T10:08:00", "2026-02-12T10:14:59", "2026-02-12T10:15:00",
+     "2026-02-12T10:29:00", "2026-02-12T11:00:30"],
+    [1.0, np.nan, 5.0, 2.0, 4.0, 9.0],
+)
+
+
+def test_bins_start_on_the_clock():
+    resampled = resample(SAMPLE, "15min")
+    assert resampled.times.astype(str).tolist() == ["2026-02-12T10:00:00", "2026-02-12T10:15:00", "2026-02-12T11:00:00"]
+
+
+@pytest.mark.parametrize("how, expected", [
+    ("mean", [3.0, 3.0, 9.0]),
+    ("min", [1.0, 2.0, 9.0]),
+    ("max", [5.0, 4.0, 9.0]),
+    ("first", [1.0, 2.0, 9.0]),
+    ("last", [5.0, 4.0, 9.0]),
+])
+def test_reductions_leave_nan_out(how, expected):
+    assert resample(SAMPLE, "15min", how).values.tolist() == expected
+
+
+@pytest.mark.parametrize("fill, expected", [
+    ("hold", [3.0, 3.0, 3.0, 3.0, 9.0]),
+    ("linear", [3.0, 3.0, 5.0, 7.0, 9.0]),
+])
+def test_fills_cover_the_empty_bins(fill, expected):
+    resampled = resample(SAMPLE, "15min", fill=fill)
+    assert resampled.times.astype(str).tolist() == [
+        "2026-02-12T10:00:00", "2026-02-12T10:15:00", "2026-02-12T10:30:00", "2026-02-12T10:45:00", "2026-02-12T11:00:00"
+    ]
+    assert resampled.values.tolist() == expected
+
+
+def test_step_delta_forms():
+    assert [int(step_delta(step) / np.timedelta64(1, "s")) for step in ("minute", "15s", "5min", "2h", "1d", 90)] == [
+        60, 15, 300, 7200, 86400, 90
+    ]
+    with pytest.raises(ValueError):
+        step_delta("5 fortnights")
@@ -0,0 +1,50 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import tools
+
+# The sample export of the README ("Exemplo de Estrutura XML")
+SAMPLE = """<?xml version="1.0" encoding="utf-8"?>
+<LogRecords Log="storage" LogDescription="" LogPath="/Server 1/example/storage" Unit="NoUnit" Signal="/Server 1/example/Value" Locale="ja-JP" Max="NaN" Min="NaN" Average="NaN" Count="1" StartTime="2026/02/12 19:49:21" EndTime="2026/02/12 19:49:21" Description="">
+  <TrendLogEventRecord Timestamp="2026/02/12 19:49:21" Value="1001" Events="" Comment="" User="" />
+</LogRecords>
+"""
+
+KEPT = ("Log", "LogDescription", "LogPath", "Unit", "Signal", "Locale", "StartTime", "EndTime", "Description")
+
+
+def _records(root) -> list[dict]:
+    # Values are written as Python floats (1001.0); the number itself is kept
+    return [{**record.attrib, "Value": float(record.get("Value"))} for record in root]
+
+
+def test_xml_trendbin_xml_keeps_the_header(tmp_path):
+    source, binary = tmp_path / "sample.xml", tmp_path / "sample.trendbin"
+    direct, via_binary = tmp_path / "direct.xml", tmp_path / "via_binary.xml"
+    source.write_text(SAMPLE, encoding="utf-8")
+
+    tools.write_trend(tools.load_trend(str(source), cache=None), str(direct), locale="source")
+    tools.write_trend(tools.load_trend(str(source), cache=None), str(binary))
+    tools.write_trend(tools.load_trend(str(binary), cache=None), str(via_binary), locale="source")
+
+    assert via_binary.read_bytes() == direct.read_bytes()
+    original = ET.parse(source).getroot()
+    written = ET.parse(via_binary).getroot()
+    assert {key: written.get(key) for key in KEPT} == {key: original.get(key) for key in KEPT}
+    assert _records(written) == _records(original)
+
+
+def test_generated_header_stays_empty(tmp_path):
+    output = tmp_path / "generated.xml"
+    tools.write_trend(tools.generate_trend("2026-02-12T00:00:00", "2026-02-12T00:10:00", "minute", "linear"), str(output))
+    root = ET.parse(output).getroot()
+    assert (root.get("LogPath"), root.get("Signal"), root.get("Description")) == ("", "", "")
+
+
+def test_unknown_source_locale_is_refused(tmp_path):
+    source, output = tmp_path / "sample.xml", tmp_path / "out.xml"
+    source.write_text(SAMPLE.replace('Locale="ja-JP"', 'Locale="de-DE"'), encoding="utf-8")
+    with pytest.raises(ValueError, match="de-DE"):
+        tools.write_trend(tools.load_trend(str(source), cache=None), str(output), locale="source")
+    assert not output.exists()
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+
+import tools
+from decimate import minmax_envelope
+from session import EditSession, load_journal
+from trend import Trend
+
+
+def minutes(count: int, start="2026-02-12T00:00:00") -> Trend:
+    times = np.datetime64(start) + (np.arange(count) * 60).astype("timedelta64[s]")
+    return Trend(times, np.arange(count, dtype=np.float64), {"name": "test"})
+
+
+def test_single_range_modify_defaults_to_minute_steps(tmp_path):
+    path = tmp_path / "journal.json"
+    path.write_text(json.dumps({"operations": [
+        {"op": "modify", "range_start": "2026-02-12T00:10:00", "range_end": "2026-02-12T00:12:00", "constant_value": 5}
+    ]}))
+    edited = EditSession(minutes(60)).replay(load_journal(path)["operations"]).trend
+    assert len(edited) == 60
+    assert edited.values[10:13].tolist() == [5.0, 5.0, 5.0]
+
+
+def test_missing_range_is_a_value_error():
+    with pytest.raises(ValueError):
+        EditSession(minutes(60)).apply({"op": "modify", "range_start": "2026-02-12T00:10:00", "constant_value": 5})
+
+
+def edited(session: EditSession) -> tuple[list, list]:
+    trend = session.trend
+    return trend.times.tolist(), trend.values.tolist()
+
+
+def test_undo_and_redo_step_through_the_edits():
+    original = minutes(600)
+    session = EditSession(original)
+    states = [edited(session)]
+    session.delete([("2026-02-12T01:00:00", "2026-02-12T01:30:00"), ("2026-02-12T05:00:00", "2026-02-12T05:10:00")])
+    states.append(edited(session))
+    session.modify([("2026-02-12T02:00:00", "2026-02-12T02:05:00")], step="second", calc="sin")
+    states.append(edited(session))
+
+    assert states[-1] == edited(EditSession(tools.modify_intervals(
+        tools.delete_intervals(original, [("2026-02-12T01:00:00", "2026-02-12T01:30:00"),
+                                          ("2026-02-12T05:00:00", "2026-02-12T05:10:00")]),
+        [("2026-02-12T02:00:00", "2026-02-12T02:05:00")], step="second", calc="sin")))
+    assert session.undo()["op"] == "modify" and edited(session) == states[1]
+    assert session.undo()["op"] == "delete" and edited(session) == states[0]
+    assert session.undo() is None and not session.can_undo
+    assert session.redo()["op"] == "delete" and edited(session) == states[1]
+    assert session.journal == [{"op": "delete", "intervals": [["2026-02-12T01:00:00", "2026-02-12T01:30:00"],
+                                                               ["2026-02-12T05:00:00", "2026-02-12T05:10:00"]]}]
+
+    # A new edit drops what was undone
+    session.modify([("2026-02-12T03:00:00", "2026-02-12T03:00:00")], constant_value=-1)
+    assert not session.can_redo and session.redo() is None
+    assert [operation["op"] for operation in session.journal] == ["delete", "modify"]
+
+
+def test_saved_journal_replays_on_a_fresh_export(tmp_path):
+    session = EditSession(minutes(600))
+    session.delete([("2026-02-12T01:00:00", "2026-02-12T01:30:00")])
+    session.modify([("2026-02-12T02:00:00", "2026-02-12T02:05:00")], calc="linear", amplitude=2.0)
+    session.save_journal(tmp_path / "journal.json")
+
+    # The fresh export has an hour more; records past the edits are kept
+    journal = load_journal(tmp_path / "journal.json")
+    replayed = EditSession(minutes(660)).replay(journal["operations"])
+    assert edited(replayed)[1][:len(session)] == edited(session)[1]
+    assert len(replayed) == len(session) + 60
+    assert replayed.journal == session.journal
+
+
+def test_journal_with_unknown_operation_is_refused(tmp_path):
+    path = tmp_path / "journal.json"
+    path.write_text(json.dumps({"operations": [{"op": "resample", "interval": "15min"}]}))
+    with pytest.raises(ValueError, match="resample"):
+        load_journal(path)
+
+
+def test_envelope_matches_the_joined_trend():
+    session = EditSession(minutes(6000))
+    session.envelope(100)
+    session.delete([("2026-02-12T10:00:00", "2026-02-12T12:00:00")])
+    session.modify([("2026-02-13T01:00:00", "2026-02-13T02:00:00")], step="second", constant_value=-5)
+    start, end = session.trend.times[0], session.trend.times[-1]
+    pieces = session.envelope(100, start, end)
+    joined = minmax_envelope(session.trend, 100, start, end)
+    assert pieces.times.tolist() == joined.times.tolist() and pieces.records == joined.records
+    assert pieces.low.tolist() == joined.low.tolist() and pieces.high.tolist() == joined.high.tolist()
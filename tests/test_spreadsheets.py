@@ -0,0 +1,17 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import tools
+
+
+def test_validate_excel_trend_returns_datetimes():
+    df = pd.DataFrame({"timestamp": ["2026-02-12 19:49:21", "2026-02-12 19:50:21"], "value": [1.0, 2.0]})
+    assert tools.validate_excel_trend(df) == [datetime(2026, 2, 12, 19, 49, 21), datetime(2026, 2, 12, 19, 50, 21)]
+
+
+def test_validate_excel_trend_rejects_unsorted_rows():
+    df = pd.DataFrame({"timestamp": ["2026-02-12 19:50:21", "2026-02-12 19:49:21"], "value": [1.0, 2.0]})
+    with pytest.raises(ValueError, match="ascending"):
+        tools.validate_excel_trend(df)
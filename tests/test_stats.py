@@ -0,0 +1,25 @@
+import numpy as np
+
+from trend import TrendStats
+
+
+def test_average_sums_in_record_order():
+    values = np.round(np.sin(np.arange(10_081)), 5)
+    times = np.arange(len(values))
+    # What the template's sum(values) / len(values) gave
+    expected = sum(values.tolist()) / len(values)
+
+    assert TrendStats().update(times, values).average == expected
+    chunked = TrendStats()
+    for offset in range(0, len(values), 1000):
+        chunked.update(times[offset:offset + 1000], values[offset:offset + 1000])
+    assert chunked.average == expected
+    single = TrendStats()
+    for time, value in zip(times, values.tolist()):
+        single.add(time, value)
+    assert single.average == expected
+
+
+def test_nan_is_counted_but_not_averaged():
+    stats = TrendStats().update(np.arange(3), [1.0, np.nan, 2.0])
+    assert (stats.count, stats.max, stats.min, stats.average) == (3, 2.0, 1.0, 1.5)
@@ -0,0 +1,295 @@
+from datetime import datetime
+import numpy as np
+
+# Middleware-compatible date format
+DATE_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+
+# Timestamp layout of the exports of each <LogRecords Locale="...">, for
+# writing files back in their source's own format. en-US (DATE_FORMAT) is
+# what this tool has always written and what EBO imports from any locale
+LOCALE_FORMATS = {
+    "en-US": DATE_FORMAT,
+    "ja-JP": "%Y/%m/%d %H:%M:%S",  # README sample export
+}
+DEFAULT_LOCALE = "en-US"
+
+# Layouts tried, in order, when a file's timestamp format is detected. Ambiguous
+# day/month orders resolve month-first, the same as dateutil does by default
+KNOWN_FORMATS = [
+    "%Y/%m/%d %H:%M:%S",  # EBO export (README sample, ja-JP)
+    DATE_FORMAT,
+    "%Y-%m-%dT%H:%M:%S",  # Qt.ISODate, used by the GUI
+    "%Y-%m-%d %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S",
+]
+
+# Width of every directive the bulk parser understands (strftime zero-pads them)
+_FIELD_WIDTHS = {"Y": 4, "m": 2, "d": 2, "H": 2, "I": 2, "M": 2, "S": 2, "p": 2}
+
+# Samples checked against a candidate format before it is accepted
+_DETECT_SAMPLES = 16
+
+
+def _text(value) -> str:
+    # Raw bytes straight from a file scanner are accepted as well as strings
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def detect_format(raw) -> str | None:
+    """Return the first KNOWN_FORMATS entry that parses a spread of samples, if any."""
+    if not len(raw):
+        return None
+    stride = max(1, len(raw) // _DETECT_SAMPLES)
+    samples = [_text(raw[i]).strip() for i in range(0, len(raw), stride)][:_DETECT_SAMPLES]
+    for fmt in KNOWN_FORMATS:
+        try:
+            for sample in samples:
+                datetime.strptime(sample, fmt)
+        except ValueError:
+            continue
+        return fmt
+    return None
+
+
+def _parse_with_dateutil(text: str) -> datetime:
+    # dateutil is only imported once a value does not match any known layout
+    from dateutil import parser
+
+    # Timestamps are wall-clock times, as in the exports themselves
+    return parser.parse(text).replace(tzinfo=None)
+
+
+def parse_timestamp(text: str) -> datetime:
+    """Parse a single user-supplied timestamp (GUI ISO strings, CLI arguments)."""
+    text = str(text).strip()
+    for fmt in KNOWN_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return _parse_with_dateutil(text)
+
+
+def _fixed_layout(fmt: str):
+    """Split a format into (directive, offset, width) fields and (offset, byte) literals.
+
+    Returns None when the format has a directive the bulk parser does not know.
+    """
+    fields, literals = [], []
+    offset = i = 0
+    while i < len(fmt):
+        if fmt[i] == "%":
+            directive = fmt[i + 1:i + 2]
+            if directive not in _FIELD_WIDTHS:
+                return None
+            fields.append((directive, offset, _FIELD_WIDTHS[directive]))
+            offset += _FIELD_WIDTHS[directive]
+            i += 2
+        else:
+            if ord(fmt[i]) > 127:
+                return None
+            literals.append((offset, ord(fmt[i])))
+            offset += 1
+            i += 1
+    return fields, literals, offset
+
+
+def _parse_fixed(raw, layout):
+    """Vectorized parse of strings that follow a fixed-width layout exactly.
+
+    Returns (seconds since epoch, valid mask); rows that do not match the
+    layout are flagged invalid rather than raising.
+    """
+    width = layout[2]
+    n = len(raw)
+    try:
+        # One spare byte per row tells strings longer than the layout apart
+        buf = np.array(raw, dtype=f"S{width + 1}").view(np.uint8).reshape(n, width + 1)
+    except (UnicodeEncodeError, ValueError):
+        return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool)
+    return _parse_matrix(buf, layout)
+
+
+def _parse_matrix(buf, layout):
+    """_parse_fixed over rows already laid out as an (n, width + 1) byte matrix, zero-padded."""
+    fields, literals, width = layout
+    n = len(buf)
+
+    valid = (buf[:, width] == 0) & (buf[:, width - 1] != 0)
+    for offset, byte in literals:
+        valid &= buf[:, offset] == byte
+
+    parts = {}
+    for directive, offset, size in fields:
+        if directive == "p":
+            first = buf[:, offset] | 0x20  # case-insensitive, like strptime
+            valid &= ((first == ord("a")) | (first == ord("p"))) & ((buf[:, offset + 1] | 0x20) == ord("m"))
+            parts["pm"] = first == ord("p")
+            continue
+        digits = buf[:, offset:offset + size].astype(np.int64) - ord("0")
+        valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+        number = np.zeros(n, dtype=np.int64)
+        for k in range(size):
+            number = number * 10 + digits[:, k]
+        parts[directive] = number
+
+    year = parts.get("Y", np.full(n, 1900, dtype=np.int64))
+    month = parts.get("m", np.ones(n, dtype=np.int64))
+    day = parts.get("d", np.ones(n, dtype=np.int64))
+    minute = parts.get("M", np.zeros(n, dtype=np.int64))
+    second = parts.get("S", np.zeros(n, dtype=np.int64))
+    if "I" in parts:
+        valid &= (parts["I"] >= 1) & (parts["I"] <= 12)
+        hour = parts["I"] % 12 + np.where(parts.get("pm", False), 12, 0)
+    else:
+        hour = parts.get("H", np.zeros(n, dtype=np.int64))
+        if "pm" in parts:
+            return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool)
+
+    valid &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+    valid &= (hour <= 23) & (minute <= 59) & (second <= 59)
+
+    # Neutralise invalid rows before doing calendar arithmetic on them
+    year = np.where(valid, year, 1970)
+    month = np.where(valid, month, 1)
+    month_start = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+    first_day = month_start.astype("datetime64[D]")
+    days_in_month = ((month_start + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+    valid &= day <= days_in_month
+
+    days = first_day.astype(np.int64) + day - 1
+    seconds = days * 86400 + hour * 3600 + minute * 60 + second
+    return np.where(valid, seconds, 0), valid
+
+
+def _put_digits(out: np.ndarray, offset: int, width: int, number: np.ndarray):
+    for k in range(width):
+        out[:, offset + k] = number // 10 ** (width - 1 - k) % 10 + ord("0")
+
+
+def format_timestamps(times, fmt: str = DATE_FORMAT) -> list[str]:
+    """strftime(fmt) of every timestamp of a datetime64 array, in bulk.
+
+    Records are grouped into runs sharing the same hour, as in a time-ordered
+    trend; the date and hour part of the text is built once per run and
+    repeated, and only minutes and seconds are filled in per record. Gives
+    exactly what datetime.strftime does (AM/PM in English, zero-padded
+    fields) for the directives the bulk parser knows; other formats, NaT
+    and years outside 1000-9999 go through strftime.
+    """
+    times = np.asarray(times, dtype="datetime64[s]")
+    n = len(times)
+    layout = _fixed_layout(fmt)
+    if not n:
+        return []
+    years = times.astype("datetime64[Y]")
+    if layout is None or np.isnat(times).any() or years.min() < np.datetime64("1000", "Y") or years.max() > np.datetime64("9999", "Y"):
+        return [ts.strftime(fmt) if ts is not None else "" for ts in times.tolist()]
+    fields, literals, width = layout
+
+    seconds = times.view(np.int64)
+    hours = seconds // 3600
+    starts = np.flatnonzero(np.concatenate([[True], hours[1:] != hours[:-1]]))
+    run_hours = hours[starts]
+    run_days = (run_hours // 24).astype("datetime64[D]")
+    run_months = run_days.astype("datetime64[M]")
+    hour = run_hours % 24
+    run_fields = {
+        "Y": run_months.astype("datetime64[Y]").astype(np.int64) + 1970,
+        "m": run_months.astype(np.int64) % 12 + 1,
+        "d": (run_days - run_months.astype("datetime64[D]")).astype(np.int64) + 1,
+        "H": hour,
+        "I": (hour + 11) % 12 + 1,
+    }
+
+    head = np.zeros((len(starts), width), dtype=np.uint8)
+    for offset, byte in literals:
+        head[:, offset] = byte
+    for directive, offset, size in fields:
+        if directive == "p":
+            head[:, offset] = np.where(hour < 12, ord("A"), ord("P"))
+            head[:, offset + 1] = ord("M")
+        elif directive in run_fields:
+            _put_digits(head, offset, size, run_fields[directive])
+
+    out = np.repeat(head, np.diff(np.append(starts, n)), axis=0)
+    within = seconds % 3600
+    for directive, offset, size in fields:
+        if directive == "M":
+            _put_digits(out, offset, size, within // 60)
+        elif directive == "S":
+            _put_digits(out, offset, size, within % 60)
+    return out.view(f"S{width}").ravel().astype(f"U{width}").tolist()
+
+
+def parse_timestamp_fields(data: np.ndarray, starts: np.ndarray, lengths: np.ndarray, fmt: str | None) -> np.ndarray:
+    """Parse timestamps stored as byte ranges data[starts[i]:starts[i] + lengths[i]] of one buffer.
+
+    Used by scanners working on a whole file at once: rows are gathered into
+    a byte matrix and parsed in bulk without creating a string per record.
+    Rows that do not follow `fmt` exactly go through parse_timestamps.
+    """
+    n = len(starts)
+    layout = _fixed_layout(fmt) if fmt else None
+    result = np.full(n, np.datetime64("NaT"), dtype="datetime64[s]")
+    ok = np.zeros(n, dtype=bool)
+    if layout is not None and n:
+        width = layout[2]
+        # One window per row, including the byte after the layout (the closing quote
+        # in a file), masked to the row's own length
+        padded = np.concatenate([data, np.zeros(width + 1, dtype=np.uint8)])
+        buf = np.lib.stride_tricks.sliding_window_view(padded, width + 1)[starts]
+        buf[np.arange(width + 1) >= lengths[:, None]] = 0
+        seconds, ok = _parse_matrix(buf, layout)
+        result[ok] = seconds[ok].astype("datetime64[s]")
+
+    rest = np.flatnonzero(~ok)
+    if len(rest):
+        result[rest] = parse_timestamps(
+            [bytes(data[start:start + length]) for start, length in zip(starts[rest].tolist(), lengths[rest].tolist())],
+            fmt
+        )
+    return result
+
+
+def parse_timestamps(raw, fmt: str | None = None, errors: str = "raise") -> np.ndarray:
+    """Parse a sequence of timestamp strings (or UTF-8 bytes) into a datetime64[s] array.
+
+    The format is detected once (or taken from `fmt`), then every row that
+    follows it exactly is parsed in bulk. Rows that don't, such as values
+    without zero padding, are retried with strptime and finally with
+    dateutil. With errors="coerce" unparseable rows become NaT instead of
+    raising ValueError.
+    """
+    raw = raw if isinstance(raw, (list, np.ndarray)) else list(raw)
+    n = len(raw)
+    result = np.full(n, np.datetime64("NaT"), dtype="datetime64[s]")
+    if not n:
+        return result
+
+    if fmt is None:
+        fmt = detect_format(raw)
+
+    ok = np.zeros(n, dtype=bool)
+    if fmt is not None:
+        layout = _fixed_layout(fmt)
+        if layout is not None:
+            seconds, ok = _parse_fixed(raw, layout)
+            result[ok] = seconds[ok].astype("datetime64[s]")
+
+    for i in np.flatnonzero(~ok).tolist():
+        text = _text(raw[i]).strip()
+        try:
+            if fmt is not None:
+                try:
+                    result[i] = datetime.strptime(text, fmt)
+                    continue
+                except ValueError:
+                    pass
+            result[i] = _parse_with_dateutil(text)
+        except (ValueError, OverflowError):
+            if errors != "coerce":
+                raise ValueError(f"Invalid timestamp: {_text(raw[i])}")
+    return result
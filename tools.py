@@ -1,289 +1,600 @@
-from datetime import datetime, timedelta
-from dateutil import parser
-import pandas as pd
-import math
-from jinja2 import Environment, FileSystemLoader
+import itertools
+import os
+import time
+from datetime import datetime
+import numpy as np
 import xml.etree.ElementTree as ET
-from copy import deepcopy
-from pathlib import Path
-
-# Middleware-compatible date format
-DATE_FORMAT = "%m/%d/%Y %I:%M:%S %p"
-
-CALC_METHODS = {
-    "linear": lambda x: x,
-    "linear_double": lambda x: x * 2,
-    "sin": lambda x: math.sin(x),
-    "cos": lambda x: math.cos(x),
-    "square": lambda x: x ** 2,
-    "sqrt": lambda x: math.sqrt(x) if x >= 0 else 0,
-    "log": lambda x: math.log(x + 1)
-}
-
-env = Environment(loader=FileSystemLoader(searchpath="."), autoescape=False)
-template = env.get_template("template.jinja2")
-
-def _render_xml(context: dict, file_path: str):
-    xml_content = template.render(**context)
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(xml_content)
-
-def _load_existing_trend(xml_path: str):
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-
-    log_data = []
-    for record in root.findall("TrendLogValueRecord"):
-        # We parse the incoming string immediately to a datetime object for internal logic
-        log_data.append({
-            "time": parser.parse(record.attrib["Timestamp"]),
-            "value": float(record.attrib["Value"])
-        })
 
-    metadata = {
-        "name": root.attrib.get("Log"),
-        "description": root.attrib.get("LogDescription"),
-        "unit": root.attrib.get("Unit"),
+from flatxml import RECORD_TAGS, NotFlat, iter_flat, record_entry, scan_flat
+from cache import TREND_CACHE, TrendCache
+from instrument import emit, instrumented, stage
+from merge import DUPLICATE_POLICIES, MergeStats, merge_chunks
+from quality import Finding, QualityScanner, check
+from progress import ProgressCallback, report, source_size
+from resample import resample, step_delta
+from timestamps import DATE_FORMAT, detect_format, parse_timestamp, parse_timestamps
+from trend import CHUNK_SIZE, SideTable, Trend
+from trendfile import is_trendfile, is_trendfile_path, read_trendfile, write_trendfile
+from signals import SIGNALS, signal_values
+from spreadsheets import iter_table, validate_excel_trend
+from writer import TrendWriter, write_trend_xml
+
+# Records buffered by merge_existing_trends, shared out among its inputs
+MERGE_RECORDS = CHUNK_SIZE
+_MIN_MERGE_CHUNK = 1024
+# Rough size of an exported record, to turn a chunk of records into bytes of file
+_RECORD_BYTES = 128
+
+def _position(source) -> int:
+    try:
+        return source.tell()
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+def _metadata(attributes) -> dict:
+    return {
+        "name": attributes.get("Log"),
+        "description": attributes.get("LogDescription"),
+        "unit": attributes.get("Unit"),
         # We store these as strings for now, but they will be normalized in the output context
-        "start_date": root.attrib.get("StartTime"),
-        "end_date": root.attrib.get("EndTime")
+        "start_date": attributes.get("StartTime"),
+        "end_date": attributes.get("EndTime"),
+        # Every <LogRecords> attribute, untouched, for callers that need more than the above
+        "attributes": dict(attributes)
     }
 
-    return metadata, log_data
+def _iter_existing_trend(xml_path, chunk_size: int = CHUNK_SIZE, progress: ProgressCallback | None = None):
+    """Stream an EBO export instead of building the whole element tree.
+
+    Returns the metadata taken from the <LogRecords> root plus a generator of
+    Trend chunks. Each record element is dropped as soon as it has been read,
+    so only one chunk of Python objects is alive at a time. The first record
+    becomes metadata["record"]; records of another kind (TrendLogValueRecord
+    and TrendLogEventRecord may be mixed) or with other Events/Comment/User
+    go into the chunk's side table. `progress` is told the records and bytes
+    read after every chunk.
+    """
+    owns_source = isinstance(xml_path, (str, os.PathLike))
+    source = open(xml_path, "rb") if owns_source else xml_path
+    size = source_size(source)
+    try:
+        context = ET.iterparse(source, events=("start", "end"))
+        _, root = next(context)
+    except BaseException:
+        if owns_source:
+            source.close()
+        raise
+
+    metadata = _metadata(root.attrib)
+    # Time spent converting timestamps, told apart from the XML parsing around it
+    dates = [0.0]
+
+    def parsed(times, values, rows, entries, fmt, records):
+        started = time.perf_counter()
+        parsed_times = parse_timestamps(times, fmt)
+        dates[0] += time.perf_counter() - started
+        chunk = Trend(
+            parsed_times,
+            np.array(values, dtype=np.float64),
+            metadata,
+            SideTable.interned(rows, entries) if entries else None
+        )
+        position = _position(source)
+        report(progress, "read", records, position, position / size if size else None)
+        return chunk
+
+    def chunks():
+        # The timestamp format is detected on the first chunk and reused for the
+        # rest of the file, so each chunk is parsed in bulk
+        fmt = None
+        records = 0
+        default = None
+        times, values, rows, entries = [], [], [], []
+        try:
+            for event, element in context:
+                if event == "end" and element.tag in RECORD_TAGS:
+                    attributes = element.attrib
+                    # Records without the usual attribute tail take the slow path
+                    if default is None:
+                        default = metadata["record"] = record_entry(element)
+                    elif len(attributes) != len(default) + 1 or element.tag != default["tag"] or any(
+                        attributes.get(key) != value for key, value in default.items() if key != "tag"
+                    ):
+                        rows.append(len(times))
+                        entries.append(record_entry(element))
+                    times.append(attributes["Timestamp"])
+                    values.append(attributes.get("Value", "NaN"))
+                    # Processed records are no longer needed; keep the root empty
+                    root.clear()
+                    if len(times) >= chunk_size:
+                        fmt = fmt or detect_format(times)
+                        records += len(times)
+                        yield parsed(times, values, rows, entries, fmt, records)
+                        times, values, rows, entries = [], [], [], []
+            if times:
+                fmt = fmt or detect_format(times)
+                records += len(times)
+                yield parsed(times, values, rows, entries, fmt, records)
+            emit("dates", dates[0], records_in=records, records_out=records)
+        finally:
+            if owns_source:
+                source.close()
+
+    return metadata, chunks()
+
+def _parse_trend(xml_path, progress: ProgressCallback | None = None, workers: int | None = None) -> Trend:
+    # Flat exports (the usual EBO layout) are scanned straight from an mmap,
+    # in this process unless `workers` or flatxml.WORKERS (raised by the
+    # __main__-guarded entry points: cli, batch, the GUI) asks for more;
+    # anything else goes through the XML parser
+    # The flat scanner converts timestamps as it goes, so only the XML parser
+    # reports a separate "dates" stage
+    with stage("parse") as parse:
+        scanned = scan_flat(xml_path, workers, progress) if isinstance(xml_path, (str, os.PathLike)) else None
+        if scanned is not None:
+            attributes, record, times, values, extras = scanned
+            trend = Trend(times, values, {**_metadata(attributes), "record": record}, extras)
+        else:
+            metadata, chunks = _iter_existing_trend(xml_path, progress=progress)
+            # The chunks are read first: the first record sets metadata["record"]
+            chunks = list(chunks)
+            trend = Trend.concatenate(chunks, metadata)
+        parse.records_out = len(trend)
+        parse.bytes = source_size(xml_path)
+    # EBO exports are already in time order; anything else is sorted once here
+    if len(trend) > 1 and (trend.times[1:] < trend.times[:-1]).any():
+        with stage("sort", len(trend)) as sort:
+            trend = trend.sorted()
+            sort.records_out = len(trend)
+    return trend
+
+def iter_trend(path, chunk_size: int = CHUNK_SIZE):
+    """Read a trend file a chunk at a time: returns its metadata and a generator of Trend chunks.
+
+    For consumers that stream, such as merge_existing_trends: only about
+    `chunk_size` records are in memory at a time. Flat exports are scanned
+    chunk by chunk; from the first chunk that is not flat on, the file goes
+    through the XML parser instead. Binary trend files are sliced from their
+    mmap. Records come in file order, sorted or not.
+    """
+    if is_trendfile(path):
+        trend = read_trendfile(path)
+        return trend.metadata, (trend[offset:offset + chunk_size] for offset in range(0, len(trend), chunk_size))
+    flat = iter_flat(path, chunk_size * _RECORD_BYTES) if isinstance(path, (str, os.PathLike)) else None
+    if flat is None:
+        return _iter_existing_trend(path, chunk_size)
+    attributes, record, scanned = flat
+    metadata = {**_metadata(attributes), "record": record}
+
+    def chunks():
+        done = 0
+        try:
+            for times, values, extras in scanned:
+                done += len(times)
+                yield Trend(times, values, metadata, extras)
+            return
+        except NotFlat:
+            pass
+        # The parser starts over; the records already yielded are skipped
+        for chunk in _iter_existing_trend(path, chunk_size)[1]:
+            if done >= len(chunk):
+                done -= len(chunk)
+                continue
+            yield chunk[done:]
+            done = 0
+
+    return metadata, chunks()
+
+@instrumented
+def load_trend(xml_path, progress: ProgressCallback | None = None, cache: TrendCache | None = TREND_CACHE,
+               workers: int | None = None) -> Trend:
+    """Parse an EBO export, or reuse the parse of the same unchanged file.
+
+    Files are looked up in `cache` (the process-wide one by default, None to
+    always parse); streams are always parsed. Binary trend files (trendfile)
+    are recognized by their magic bytes and opened through mmap instead.
+    Large flat exports are scanned by `workers` processes, flatxml.WORKERS
+    (one, in this process) by default; see flatxml.scan_flat.
+    """
+    if is_trendfile(xml_path):
+        with stage("read") as read:
+            trend = read_trendfile(xml_path, progress)
+            read.records_out = len(trend)
+        return trend
+    if cache is None or not isinstance(xml_path, (str, os.PathLike)):
+        return _parse_trend(xml_path, progress, workers)
+
+    parsed = False
+
+    def parse(path):
+        nonlocal parsed
+        parsed = True
+        return _parse_trend(path, progress, workers)
+
+    started = time.perf_counter()
+    trend = cache.load(xml_path, parse)
+    if not parsed:
+        emit("cache", time.perf_counter() - started, records_out=len(trend))
+        report(progress, "read", len(trend), fraction=1.0)
+    return trend
+
+@instrumented
+def write_trend(trend: Trend, output_file, progress: ProgressCallback | None = None, compression: str | None = None,
+                locale: str | None = None):
+    """Write a binary trend file when the path ends in .trendbin, EBO XML otherwise.
+
+    XML timestamps are written for `locale`: en-US by default, "source" for
+    the input file's own Locale (see writer.output_locale).
+    """
+    if is_trendfile_path(output_file):
+        with stage("write", len(trend)) as write:
+            write_trendfile(trend, output_file, compression, progress=progress)
+            write.bytes = source_size(output_file)
+    else:
+        write_trend_xml(trend, output_file, progress=progress, locale=locale)
+
+def _bounds(interval) -> tuple:
+    """(start, end) of an interval given as a (start, end) pair or a dict with range_start/range_end."""
+    if isinstance(interval, dict):
+        start, end = interval["range_start"], interval["range_end"]
+    else:
+        start, end = interval
+    start = np.datetime64(parse_timestamp(start), "s")
+    end = np.datetime64(parse_timestamp(end), "s")
+    if end < start:
+        raise ValueError(f"Interval ends before it starts: {start} > {end}")
+    return start, end
+
+def _interval_index(intervals) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bounds of every interval as sorted arrays, plus the order that sorts them."""
+    bounds = [_bounds(interval) for interval in intervals]
+    if not bounds:
+        raise ValueError("At least one interval must be provided")
+    starts = np.array([start for start, _ in bounds], dtype="datetime64[s]")
+    ends = np.array([end for _, end in bounds], dtype="datetime64[s]")
+    order = np.argsort(starts, kind="stable")
+    return starts[order], ends[order], order
+
+def _segment(start, end, step: str, calc: str | None, constant_value: float | None, **signal) -> Trend:
+    """The records a modify puts in place of [start, end]."""
+    if not calc and constant_value is None:
+        raise ValueError("Either calc or constant_value must be provided")
+    delta = step_delta(step)
 
-def modify_existing_trend(
-    input_file: str,
+    # Generate NEW range of data
+    new_times = np.arange(start, end + np.timedelta64(1, "s"), delta)
+    if constant_value is not None:
+        new_values = np.full(len(new_times), constant_value, dtype=np.float64)
+    else:
+        new_values = signal_values(calc, len(new_times), **signal)
+    return Trend(new_times, new_values)
+
+@instrumented
+def modify_intervals(trend: Trend, intervals, step: str = "minute", calc: str | None = None,
+                     constant_value: float | None = None, **signal) -> Trend:
+    """Replace the records of many intervals at once, in a single copy of the trend.
+
+    Each interval is a (start, end) pair, using the step/calc/constant_value
+    and signal arguments given here, or a dict with range_start/range_end
+    and any of those keys to override them for that interval alone (an
+    interval giving calc or constant_value replaces both). Intervals may come
+    in any order but must not overlap.
+    """
+    defaults = {"step": step, "calc": calc, "constant_value": constant_value, **signal}
+    intervals = list(intervals)
+    starts, ends, order = _interval_index(intervals)
+    if (starts[1:] <= ends[:-1]).any():
+        raise ValueError("Modify intervals must not overlap")
+
+    segments = []
+    for index, start, end in zip(order.tolist(), starts, ends):
+        options = dict(defaults)
+        interval = intervals[index]
+        if isinstance(interval, dict):
+            if "calc" in interval or "constant_value" in interval:
+                options["calc"] = options["constant_value"] = None
+            options.update((key, value) for key, value in interval.items() if key not in ("range_start", "range_end"))
+        with stage("segments") as generate:
+            segments.append(_segment(start, end, **options))
+            generate.records_out = len(segments[-1])
+
+    # Every existing record inside an interval is replaced by its new segment
+    with stage("merge", len(trend)) as merge:
+        modified = trend.edit_ranges(starts, ends, segments)
+        merge.records_out = len(modified)
+    return modified
+
+def modify_trend(
+    trend: Trend,
     range_start: str,
     range_end: str,
-    step: str,
+    step: str = "minute",
+    calc: str | None = None,
+    constant_value: float | None = None,
+    **signal
+) -> Trend:
+    """In-memory part of modify_existing_trend: returns the modified trend.
+
+    Extra keyword arguments (amplitude, offset, period, noise, seed,
+    ramp_start, ramp_end) shape the calc signal; see signals.signal_values.
+    """
+    return modify_intervals(trend, [(range_start, range_end)], step, calc, constant_value, **signal)
+
+@instrumented
+def delete_intervals(trend: Trend, intervals) -> Trend:
+    """Drop the records of many intervals at once, in a single copy of the trend.
+
+    Intervals are (start, end) pairs or dicts with range_start/range_end, in
+    any order; overlapping ones are merged.
+    """
+    starts, ends, _ = _interval_index(intervals)
+    # Merge overlaps: an interval starting after every earlier end opens a new
+    # group, which reaches as far as the furthest end seen by its last member
+    reach = np.maximum.accumulate(ends)
+    opens = np.concatenate([[True], starts[1:] > reach[:-1]])
+    closes = np.concatenate([opens[1:], [True]])
+
+    with stage("merge", len(trend)) as merge:
+        kept = trend.edit_ranges(starts[opens], reach[closes])
+        merge.records_out = len(kept)
+
+    if not len(kept):
+        raise ValueError("Resulting trend is empty after deletion")
+    return kept
+
+def delete_trend(trend: Trend, range_start: str, range_end: str) -> Trend:
+    """In-memory part of delete_existing_trend: returns the trend without the interval."""
+    return delete_intervals(trend, [(range_start, range_end)])
+
+@instrumented
+def resample_trend(trend: Trend, interval, how: str = "mean", fill: str | None = None) -> Trend:
+    """In-memory part of resample_existing_trend; see resample.resample."""
+    with stage("resample", len(trend)) as resampling:
+        resampled = resample(trend, interval, how, fill)
+        resampling.records_out = len(resampled)
+    if not len(resampled):
+        raise ValueError("Resulting trend is empty after resampling")
+    return resampled
+
+@instrumented
+def merge_trends(trends, duplicates: str = "first") -> Trend:
+    """Merge time-ordered trends into one, one record per timestamp (see merge.deduplicate).
+
+    The result takes the first trend's metadata. For files, merge_existing_trends
+    streams instead of loading them all.
+    """
+    trends = list(trends)
+    if not trends:
+        raise ValueError("Nothing to merge: no trends")
+    return Trend.concatenate(merge_chunks([[trend] for trend in trends], duplicates), trends[0].metadata)
+
+@instrumented
+def check_trend(trend: Trend, **options) -> list[Finding]:
+    """Gaps, duplicates, spikes and flatlines of a trend (options: see quality.QualityScanner).
+
+    Each finding's interval() goes straight into delete_intervals or
+    modify_intervals. A trend loaded through load_trend is already sorted,
+    so only check_existing_trend, which reads the file as it is, finds
+    records out of order.
+    """
+    with stage("check", len(trend)) as checking:
+        findings = check(trend, **options)
+        checking.records_out = len(findings)
+    return findings
+
+@instrumented
+def generate_trend(start_date: str, end_date: str, step: str, calc: str, **signal) -> Trend:
+    """In-memory part of generate_xml: returns the synthetic trend.
+
+    `step` is second/minute/hour/day or any interval resample.step_delta
+    takes ("15s", "5min", ...). Extra keyword arguments (amplitude, offset,
+    period, noise, seed, ramp_start, ramp_end) shape the signal; see
+    signals.signal_values.
+    """
+    if calc not in SIGNALS:
+        raise ValueError(f"Invalid calc method. Choose one of: {SIGNALS}")
+
+    start = np.datetime64(parse_timestamp(start_date), "s")
+    end = np.datetime64(parse_timestamp(end_date), "s")
+    delta = step_delta(step)
+
+    with stage("generate") as generate:
+        times = np.arange(start, end + np.timedelta64(1, "s"), delta)
+        trend = Trend(times, signal_values(calc, len(times), **signal), {
+            "name": f"Generated Trend ({calc})",
+            "description": f"Generated using '{calc}' calculation",
+            "unit": "unit"
+        })
+        generate.records_out = len(trend)
+    return trend
+
+def _intervals(range_start, range_end, intervals) -> list:
+    if intervals is None:
+        if range_start is None or range_end is None:
+            raise ValueError("Either range_start and range_end or intervals must be provided")
+        return [(range_start, range_end)]
+    if range_start is not None or range_end is not None:
+        raise ValueError("Give either range_start and range_end or intervals, not both")
+    return list(intervals)
+
+@instrumented
+def modify_existing_trend(
+    input_file: str,
+    range_start: str | None = None,
+    range_end: str | None = None,
+    step: str = "minute",
     calc: str | None = None,
     constant_value: float | None = None,
-    output_file: str = f"./output/results/modified_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml"
+    output_file: str = f"./output/results/modified_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml",
+    progress: ProgressCallback | None = None,
+    intervals: list | None = None,
+    locale: str | None = None,
+    **signal
 ):
-    if not calc and constant_value is None:
+    """Modify one interval, or every one of `intervals` (see modify_intervals), in one read and one write."""
+    intervals = _intervals(range_start, range_end, intervals)
+    if not calc and constant_value is None and not all(
+        isinstance(interval, dict) and ("calc" in interval or "constant_value" in interval) for interval in intervals
+    ):
         raise ValueError("Either calc or constant_value must be provided")
 
-    metadata, log_data = _load_existing_trend(f"{input_file}")
-    start = parser.parse(range_start)
-    end = parser.parse(range_end)
+    trend = load_trend(input_file, progress)
+    modified = modify_intervals(trend, intervals, step, calc, constant_value, **signal)
 
-    delta_map = {
-        "second": timedelta(seconds=1), # Adicionado
-        "minute": timedelta(minutes=1),
-        "hour": timedelta(hours=1),
-        "day": timedelta(days=1)
-    }
-    
-    if step not in delta_map:
-        raise ValueError("step must be: minute, hour, or day")
-    delta = delta_map[step]
+    write_trend(modified, output_file, progress, locale=locale)
+    return output_file
 
-    # Generate NEW range of data
-    calc_fn = CALC_METHODS.get(calc) if calc else None
-    new_entries = {}
-    current_time = start
-    idx = 0
-    
-    while current_time <= end:
-        val = constant_value if constant_value is not None else round(calc_fn(idx), 5)
-        # Store using the datetime object as the key to avoid string mismatch issues
-        new_entries[current_time] = {"time": current_time, "value": val}
-        current_time += delta
-        idx += 1
-
-    # Merge: existing log_data keys are already datetime objects from _load_existing_trend
-    combined_data_dict = {entry["time"]: entry for entry in log_data}
-    combined_data_dict.update(new_entries)
-
-    # Sort and Format for Output
-    sorted_log_data = sorted(combined_data_dict.values(), key=lambda x: x["time"])
-    
-    formatted_log = []
-    values = []
-    for entry in sorted_log_data:
-        values.append(entry["value"])
-        formatted_log.append({
-            "time": entry["time"].strftime(DATE_FORMAT),
-            "value": entry["value"]
-        })
+@instrumented
+def delete_existing_trend(
+    input_file: str,
+    range_start: str | None = None,
+    range_end: str | None = None,
+    output_file: str = f"./output/results/deleted_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml",
+    progress: ProgressCallback | None = None,
+    intervals: list | None = None,
+    locale: str | None = None
+):
+    """Delete one interval, or every one of `intervals` (see delete_intervals), in one read and one write."""
+    intervals = _intervals(range_start, range_end, intervals)
 
-    context = {
-        "name": metadata["name"],
-        "description": metadata["description"],
-        "unit": metadata["unit"],
-        "start_date": sorted_log_data[0]["time"].strftime(DATE_FORMAT),
-        "end_date": sorted_log_data[-1]["time"].strftime(DATE_FORMAT),
-        "log_data": formatted_log,
-        "metadata": {
-            "max": max(values),
-            "min": min(values),
-            "average": sum(values) / len(values)
-        }
-    }
+    trend = load_trend(input_file, progress)
+    kept = delete_intervals(trend, intervals)
 
-    _render_xml(context, output_file)
+    write_trend(kept, output_file, progress, locale=locale)
     return output_file
 
-def delete_existing_trend(
+@instrumented
+def resample_existing_trend(
     input_file: str,
-    range_start: str,
-    range_end: str,
-    output_file: str = f"./output/results/deleted_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml"
+    interval,
+    how: str = "mean",
+    fill: str | None = None,
+    output_file: str = f"./output/results/resampled_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml",
+    progress: ProgressCallback | None = None,
+    locale: str | None = None
 ):
-    metadata, log_data = _load_existing_trend(f"{input_file}")
-    start = parser.parse(range_start)
-    end = parser.parse(range_end)
-
-    formatted_log = []
-    values = []
-
-    for entry in log_data:
-        ts = entry["time"] # Already a datetime object
-        if not (start <= ts <= end):
-            values.append(entry["value"])
-            formatted_log.append({
-                "time": ts.strftime(DATE_FORMAT),
-                "value": entry["value"]
-            })
-
-    if not formatted_log:
-        raise ValueError("Resulting trend is empty after deletion")
+    """Resample a trend file to one record per `interval` (e.g. "minute", "15min"), in one read and one write."""
+    trend = load_trend(input_file, progress)
+    write_trend(resample_trend(trend, interval, how, fill), output_file, progress, locale=locale)
+    return output_file
 
-    context = {
-        "name": metadata["name"],
-        "description": metadata["description"],
-        "unit": metadata["unit"],
-        "start_date": formatted_log[0]["time"],
-        "end_date": formatted_log[-1]["time"],
-        "log_data": formatted_log,
-        "metadata": {
-            "max": max(values),
-            "min": min(values),
-            "average": sum(values) / len(values)
-        }
-    }
-    _render_xml(context, output_file)
+@instrumented
+def merge_existing_trends(
+    input_files: list,
+    output_file: str = f"./output/results/merged_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml",
+    duplicates: str = "first",
+    progress: ProgressCallback | None = None,
+    locale: str | None = None
+):
+    """Merge time-ordered trend files into one without loading any of them whole.
+
+    The inputs are streamed through merge.merge_chunks, each a chunk of
+    MERGE_RECORDS / len(input_files) records at a time, and the result is
+    written as it comes with the header statistics accumulated on the way,
+    so memory stays flat however many inputs and records there are.
+    Records sharing a timestamp are resolved by `duplicates`: "first" keeps
+    the one from the earliest input in the list, "last" the latest and
+    "max" the highest value. The output takes the first input's name,
+    description and unit. A .trendbin output is written from whole columns,
+    so the merged trend is held in memory for it.
+    """
+    if not input_files:
+        raise ValueError("Nothing to merge: no input files")
+    if duplicates not in DUPLICATE_POLICIES:
+        raise ValueError(f"Invalid duplicates policy {duplicates!r}; choose one of: {DUPLICATE_POLICIES}")
+    chunk_size = max(MERGE_RECORDS // len(input_files), _MIN_MERGE_CHUNK)
+    sources = [iter_trend(path, chunk_size) for path in input_files]
+    stats = MergeStats()
+    merged = merge_chunks([chunks for _, chunks in sources], duplicates, sources[0][0], stats)
+
+    if is_trendfile_path(output_file):
+        trend = Trend.concatenate(merged, sources[0][0])
+        report(progress, "merge", len(trend), fraction=1.0)
+        write_trend(trend, output_file, progress)
+    else:
+        # The first chunk is merged before the writer starts: a parsed export
+        # only knows its default record once its first record has been read
+        first = next(merged, None)
+        with TrendWriter(output_file, sources[0][0], locale=locale) as writer:
+            for chunk in itertools.chain([first] if first is not None else [], merged):
+                writer.write(chunk.times, chunk.values, chunk.extras)
+                report(progress, "merge", stats.records_out)
+    emit("read", stats.reading, records_out=stats.records_in,
+         bytes=sum(source_size(path) or 0 for path in input_files))
+    emit("merge", stats.merging, records_in=stats.records_in, records_out=stats.records_out)
     return output_file
 
+@instrumented
+def check_existing_trend(input_file, progress: ProgressCallback | None = None, **options) -> list[Finding]:
+    """Check a trend file in one streaming pass, in file order (options: see quality.QualityScanner).
+
+    Only a chunk of the file is in memory at a time, so files larger than
+    memory can be checked. `progress` is told the records checked so far.
+    """
+    _, chunks = iter_trend(input_file)
+    scanner = QualityScanner(**options)
+    with stage("check") as checking:
+        for chunk in chunks:
+            scanner.feed(chunk)
+            report(progress, "check", scanner.records)
+        findings = scanner.finish()
+        checking.records_in, checking.records_out = scanner.records, len(findings)
+        checking.bytes = source_size(input_file)
+    return findings
+
+@instrumented
 def generate_xml(
     start_date: str,
     end_date: str,
     step: str,
     calc: str,
-    file_path: str = f"./output/results/{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml"
+    file_path: str = f"./output/results/{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml",
+    progress: ProgressCallback | None = None,
+    **signal
 ):
-    if calc not in CALC_METHODS:
-        raise ValueError(f"Invalid calc method. Choose one of: {list(CALC_METHODS.keys())}")
-
-    start = parser.parse(start_date)
-    end = parser.parse(end_date)
-
-    freq_map = {
-        "second": "S", # Adicionado (S é o código do pandas para segundos)
-        "minute": "T",
-        "hour": "H",
-        "day": "D"
-    }
-    if step not in freq_map:
-        raise ValueError("step must be: minute, hour, or day")
-
-    timestamps = pd.date_range(start=start, end=end, freq=freq_map[step])
-    log_data = []
-    values = []
-    calc_fn = CALC_METHODS[calc]
-
-    for i, ts in enumerate(timestamps):
-        value = round(calc_fn(i), 5)
-        values.append(value)
-        log_data.append({
-            "time": ts.strftime(DATE_FORMAT),
-            "value": value
-        })
+    trend = generate_trend(start_date, end_date, step, calc, **signal)
 
-    context = {
-        "name": f"Generated Trend ({calc})",
-        "description": f"Generated using '{calc}' calculation",
-        "unit": "unit",
-        "start_date": start.strftime(DATE_FORMAT),
-        "end_date": end.strftime(DATE_FORMAT),
-        "log_data": log_data,
-        "metadata": {
-            "max": max(values),
-            "min": min(values),
-            "average": sum(values) / len(values)
-        }
-    }
-    _render_xml(context, file_path)
+    write_trend(trend, file_path, progress)
     return file_path
 
-# Note: validate_excel_trend and convert_to_xml updated to use DATE_FORMAT similarly
-def convert_to_xml(excel_path: str, output_file: str, **kwargs):
-    df = pd.read_excel(excel_path)
-    parsed_timestamps = validate_excel_trend(df)
-
-    log_data = []
-    values = []
-    for dt, val in zip(parsed_timestamps, df["value"]):
-        log_data.append({"time": dt.strftime(DATE_FORMAT), "value": float(val)})
-        values.append(float(val))
-
-    context = {
+def _import_metadata(kwargs: dict) -> dict:
+    return {
         "name": kwargs.get("name", "ExcelImportedTrend"),
         "description": kwargs.get("description", "Trend imported from Excel"),
-        "unit": kwargs.get("unit", ""),
-        "start_date": log_data[0]["time"],
-        "end_date": log_data[-1]["time"],
-        "log_data": log_data,
-        "metadata": {"max": max(values), "min": min(values), "average": sum(values)/len(values)}
+        "unit": kwargs.get("unit", "")
     }
-    _render_xml(context, output_file)
-    return output_file
-
 
-def validate_excel_trend(df):
-    # ----------------------------
-    # Columns (order + names)
-    # ----------------------------
-    if list(df.columns) != ["timestamp", "value"]:
-        raise ValueError(
-            "Excel must have exactly two columns named: timestamp, value"
-        )
-
-    # ----------------------------
-    # Empty cells
-    # ----------------------------
-    if df.isnull().any().any():
-        raise ValueError("Excel contains empty cells")
-
-    parsed_timestamps = []
+@instrumented
+def excel_to_trend(excel_path, progress: ProgressCallback | None = None, **kwargs) -> Trend:
+    """In-memory part of convert_to_xml: returns the validated trend."""
+    with stage("read") as read:
+        chunks = [Trend(times, values) for times, values in iter_table(excel_path, progress=progress)]
+        trend = Trend.concatenate(chunks, _import_metadata(kwargs))
+        read.records_out = len(trend)
+        read.bytes = source_size(excel_path)
+    return trend
 
-    # ----------------------------
-    # Timestamp validation (Excel-safe)
-    # ----------------------------
-    for i, raw in enumerate(df["timestamp"], start=2):
-        try:
-            if isinstance(raw, (pd.Timestamp, datetime)):
-                dt = raw.to_pydatetime() if isinstance(raw, pd.Timestamp) else raw
-            else:
-                dt = parser.parse(str(raw))
-
-            parsed_timestamps.append(dt)
-
-        except Exception:
-            raise ValueError(
-                f"Invalid timestamp at row {i}: {raw}"
-            )
-
-    # ----------------------------
-    # Sorted check
-    # ----------------------------
-    if parsed_timestamps != sorted(parsed_timestamps):
-        raise ValueError("Timestamps must be in ascending order")
-
-    # ----------------------------
-    # Numeric values
-    # ----------------------------
-    if not pd.api.types.is_numeric_dtype(df["value"]):
-        raise ValueError("Column 'value' must be numeric")
-
-    return parsed_timestamps
\ No newline at end of file
+# Note: validate_excel_trend and convert_to_xml updated to use DATE_FORMAT similarly
+@instrumented
+def convert_to_xml(excel_path, output_file, progress: ProgressCallback | None = None, **kwargs):
+    # Records are written as soon as each chunk of the sheet is validated; the
+    # header statistics are filled in once the whole sheet has been read.
+    # Reading and writing go together, so only the read progress is reported
+    if is_trendfile_path(output_file):
+        # The binary format writes whole columns, so the sheet is read first
+        write_trend(excel_to_trend(excel_path, progress, **kwargs), output_file)
+        return output_file
+    # Reading the sheet is timed between the writes; the writer times its own part
+    records, reading = 0, 0.0
+    with TrendWriter(output_file, _import_metadata(kwargs)) as writer:
+        chunks = iter_table(excel_path, progress=progress)
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            reading += time.perf_counter() - started
+            if chunk is None:
+                break
+            records += len(chunk[0])
+            writer.write(*chunk)
+    emit("read", reading, records_out=records, bytes=source_size(excel_path))
+    return output_file
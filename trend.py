@@ -0,0 +1,254 @@
+import math
+
+import numpy as np
+
+# Trends are second-resolution, like the middleware DATE_FORMAT they are written in
+TIME_DTYPE = "datetime64[s]"
+
+# Records are parsed and written this many at a time
+CHUNK_SIZE = 65536
+
+# Element and attributes of a record, besides Timestamp and Value, when a trend
+# says nothing else (metadata["record"]): what this tool has always written
+DEFAULT_RECORD = {"tag": "TrendLogValueRecord", "Events": "", "Comment": "added with application", "User": ""}
+
+
+def record_defaults(metadata: dict) -> dict:
+    """The element and attributes shared by every record of a trend without a side-table entry."""
+    return metadata.get("record") or DEFAULT_RECORD
+
+
+class SideTable:
+    """Sparse per-record data: one entry per row that differs from the trend's default record.
+
+    `rows` holds the ascending row numbers and `entries` the matching dicts
+    of the element tag and every attribute other than Timestamp and Value.
+    A trend where every record looks alike has an empty table, so the
+    columns stay as compact as before.
+    """
+
+    def __init__(self, rows=(), entries=()):
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.entries = list(entries)
+
+    @classmethod
+    def interned(cls, rows, entries):
+        """A table whose equal entries share one dict, as parsers build them row by row."""
+        shared = {}
+        return cls(rows, [shared.setdefault(tuple(entry.items()), entry) for entry in entries])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def select(self, key, length: int):
+        """The entries kept by trend[key], renumbered for the resulting trend."""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(length)
+            if step == 1:
+                lo, hi = np.searchsorted(self.rows, [start, stop]).tolist()
+                return SideTable(self.rows[lo:hi] - start, self.entries[lo:hi])
+        index = np.arange(length)[key]
+        position = np.full(length, -1, dtype=np.int64)
+        position[index] = np.arange(len(index))
+        moved = position[self.rows]
+        kept = np.flatnonzero(moved >= 0)
+        order = kept[np.argsort(moved[kept], kind="stable")]
+        return SideTable(moved[order], [self.entries[i] for i in order.tolist()])
+
+    def to_dict(self) -> dict:
+        """JSON-ready form: each distinct entry once, and the index of every row's entry."""
+        distinct, index = {}, []
+        for entry in self.entries:
+            index.append(distinct.setdefault(tuple(entry.items()), len(distinct)))
+        return {"rows": self.rows.tolist(), "entries": [dict(items) for items in distinct], "index": index}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        entries = data.get("entries", [])
+        return cls(data.get("rows", []), [entries[i] for i in data.get("index", [])])
+
+
+class Trend:
+    """Columnar trend: one timestamp array, one value array and the <LogRecords> metadata.
+
+    Timestamps are kept as datetime64[s] and values as float64, so a record
+    costs 16 bytes instead of a dict plus a datetime and a float object. Masks
+    and slices (`trend[mask]`, `trend[10:20]`) return new trends sharing the
+    same metadata. Records that differ from the default record (another
+    element tag, a Comment, ...) are kept in the `extras` side table.
+    """
+
+    def __init__(self, times, values, metadata: dict | None = None, extras: SideTable | None = None):
+        self.times = np.asarray(times, dtype=TIME_DTYPE)
+        self.values = np.asarray(values, dtype=np.float64)
+        if self.times.shape != self.values.shape or self.times.ndim != 1:
+            raise ValueError("times and values must be one-dimensional arrays of the same length")
+        self.metadata = dict(metadata or {})
+        self.extras = extras if extras is not None else SideTable()
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, key):
+        extras = self.extras.select(key, len(self)) if len(self.extras) else None
+        return Trend(self.times[key], self.values[key], self.metadata, extras)
+
+    def __repr__(self):
+        return f"Trend(name={self.metadata.get('name')!r}, records={len(self)})"
+
+    @classmethod
+    def concatenate(cls, trends, metadata: dict | None = None):
+        trends = list(trends)
+        if metadata is None:
+            metadata = trends[0].metadata if trends else {}
+        return cls(
+            np.concatenate([t.times for t in trends]) if trends else [],
+            np.concatenate([t.values for t in trends]) if trends else [],
+            metadata,
+            cls._concatenate_extras(trends, record_defaults(metadata))
+        )
+
+    @staticmethod
+    def _concatenate_extras(trends, default: dict) -> SideTable | None:
+        rows, entries, offset = [], [], 0
+        for t in trends:
+            own = record_defaults(t.metadata)
+            if own != default and len(t):
+                # Records written differently from the result's default (e.g. a
+                # generated segment spliced into an export) get entries of their own
+                missing = np.ones(len(t), dtype=bool)
+                missing[t.extras.rows] = False
+                piece = np.concatenate([t.extras.rows, np.flatnonzero(missing)])
+                order = np.argsort(piece, kind="stable")
+                rows.append(piece[order] + offset)
+                piece_entries = t.extras.entries + [own] * int(missing.sum())
+                entries.extend(piece_entries[i] for i in order.tolist())
+            elif len(t.extras):
+                rows.append(t.extras.rows + offset)
+                entries.extend(t.extras.entries)
+            offset += len(t)
+        if not entries:
+            return None
+        return SideTable(np.concatenate(rows), entries)
+
+    def between(self, start, end) -> np.ndarray:
+        """Boolean mask of the records with start <= time <= end."""
+        start = np.datetime64(start, "s")
+        end = np.datetime64(end, "s")
+        return (self.times >= start) & (self.times <= end)
+
+    def span(self, start, end) -> tuple[int, int]:
+        """Index range [lo, hi) of the records with start <= time <= end.
+
+        Found by bisection, so the trend must be in time order (as EBO exports
+        and everything loaded through tools are).
+        """
+        lo = int(np.searchsorted(self.times, np.datetime64(start, "s"), side="left"))
+        hi = int(np.searchsorted(self.times, np.datetime64(end, "s"), side="right"))
+        return lo, max(lo, hi)
+
+    def delete_range(self, start, end):
+        """Drop every record with start <= time <= end."""
+        lo, hi = self.span(start, end)
+        if lo == hi:
+            return self
+        return Trend.concatenate([self[:lo], self[hi:]], self.metadata)
+
+    def replace_range(self, start, end, segment):
+        """Splice `segment` in place of every record with start <= time <= end.
+
+        Costs the size of the segment plus one copy of the trend, however
+        large the trend is.
+        """
+        lo, hi = self.span(start, end)
+        return Trend.concatenate([self[:lo], segment, self[hi:]], self.metadata)
+
+    def edit_ranges(self, starts, ends, segments=None):
+        """Apply many edits in one copy: each [starts[i], ends[i]] is replaced by
+        segments[i], or dropped when there are no segments or it is None.
+
+        The intervals must be sorted and disjoint. All of them are located with
+        one vectorized bisection, so the cost is one copy of the trend plus
+        the segments, whatever the number of intervals.
+        """
+        lo = np.searchsorted(self.times, np.asarray(starts, dtype=TIME_DTYPE), side="left")
+        hi = np.maximum(lo, np.searchsorted(self.times, np.asarray(ends, dtype=TIME_DTYPE), side="right"))
+        pieces, cursor = [], 0
+        for index, (first, last) in enumerate(zip(lo.tolist(), hi.tolist())):
+            pieces.append(self[cursor:first])
+            if segments is not None and segments[index] is not None:
+                pieces.append(segments[index])
+            cursor = last
+        pieces.append(self[cursor:])
+        return Trend.concatenate(pieces, self.metadata)
+
+    def sorted(self):
+        # Stable, so records sharing a timestamp keep their relative order
+        order = np.argsort(self.times, kind="stable")
+        return self[order]
+
+    def stats(self):
+        return TrendStats().update(self.times, self.values)
+
+
+class TrendStats:
+    """Running Max/Min/Average/Count and first/last timestamp of a trend.
+
+    Fed chunk by chunk (`update`) or record by record (`add`) while records are
+    produced, so the <LogRecords> header never needs its own pass over the data
+    or a list of values kept alive for it. NaN values are counted but left out
+    of Max/Min/Average; with no numeric value at all those come out as NaN,
+    which is how EBO exports them. The total behind Average is summed one
+    value after the other, in record order, as sum() over the values list
+    used to, so Average comes out the same to the last digit.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.numeric = 0
+        self.total = 0.0
+        self.max = math.nan
+        self.min = math.nan
+        self.first = None
+        self.last = None
+
+    def update(self, times, values):
+        if not len(values):
+            return self
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        if self.first is None:
+            self.first = times[0]
+        self.last = times[-1]
+
+        nan = np.isnan(values)
+        if nan.any():
+            values = values[~nan]
+            if not len(values):
+                return self
+        # cumsum adds sequentially where sum() would add pairwise
+        total = float(np.concatenate(([self.total], values)).cumsum()[-1])
+        self._merge(len(values), total, float(values.max()), float(values.min()))
+        return self
+
+    def add(self, time, value: float):
+        self.count += 1
+        if self.first is None:
+            self.first = time
+        self.last = time
+        if value == value:
+            self._merge(1, self.total + value, value, value)
+        return self
+
+    def _merge(self, numeric: int, total: float, max_value: float, min_value: float):
+        if self.numeric:
+            self.max = max(self.max, max_value)
+            self.min = min(self.min, min_value)
+        else:
+            self.max, self.min = max_value, min_value
+        self.numeric += numeric
+        self.total = total
+
+    @property
+    def average(self) -> float:
+        return self.total / self.numeric if self.numeric else math.nan
@@ -0,0 +1,183 @@
+"""Compact binary trend files (*.trendbin).
+
+Layout, all little-endian:
+
+    8 bytes   magic b"EBOTREND"
+    4 bytes   length of the JSON header
+    n bytes   JSON header, space-padded so the columns start 8-byte aligned
+    columns   timestamps as int64 seconds (datetime64[s]), then values as float64
+
+The header carries the trend metadata, including every <LogRecords>
+attribute (Log, LogPath, Unit, Signal, Locale, ...) and the default record
+kind, the side table of records that differ from it (Events, Comment,
+User, ...), the record count and where each column starts. Uncompressed columns are read straight out of an
+mmap of the file with no copy. With compression="zlib" each column is
+byte-shuffled (timestamps delta-encoded first) and deflated, which shrinks
+regular trends several times over at the cost of decompressing on load.
+Values are stored bit for bit, so XML -> trendbin -> XML is lossless.
+"""
+import json
+import mmap
+import os
+import zlib
+
+import numpy as np
+
+from progress import ProgressCallback, report
+from trend import SideTable, Trend
+
+MAGIC = b"EBOTREND"
+SUFFIX = ".trendbin"
+VERSION = 1
+COMPRESSIONS = (None, "zlib")
+
+_TIME = np.dtype("<M8[s]")
+_VALUE = np.dtype("<f8")
+_ALIGNMENT = 8
+
+
+def is_trendfile_path(path) -> bool:
+    return isinstance(path, (str, os.PathLike)) and os.fspath(path).lower().endswith(SUFFIX)
+
+
+def is_trendfile(source) -> bool:
+    """Tell a binary trend from anything else by its magic bytes (paths or peekable streams)."""
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            with open(source, "rb") as f:
+                return f.read(len(MAGIC)) == MAGIC
+        except OSError:
+            return False
+    peek = getattr(source, "peek", None)
+    return peek is not None and peek(len(MAGIC))[:len(MAGIC)] == MAGIC
+
+
+def _shuffle(data: np.ndarray) -> bytes:
+    # Byte planes: the high bytes of neighbouring records are nearly constant
+    return np.ascontiguousarray(data.view(np.uint8).reshape(-1, data.itemsize).T).tobytes()
+
+
+def _unshuffle(data: bytes, dtype: np.dtype, count: int) -> np.ndarray:
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, count)
+    return np.ascontiguousarray(planes.T).view(dtype).reshape(count)
+
+
+def _encode(trend: Trend, compression: str | None) -> list[bytes]:
+    times = np.ascontiguousarray(trend.times, dtype=_TIME)
+    values = np.ascontiguousarray(trend.values, dtype=_VALUE)
+    if compression is None:
+        return [times, values]
+    seconds = times.view("<i8")
+    deltas = np.diff(seconds, prepend=np.int64(0)) if len(seconds) else seconds
+    return [zlib.compress(_shuffle(deltas.astype("<i8"))), zlib.compress(_shuffle(values))]
+
+
+def write_trendfile(
+    trend: Trend,
+    destination,
+    compression: str | None = None,
+    extra: dict | None = None,
+    progress: ProgressCallback | None = None
+):
+    """Write `trend` to a path or binary stream; `extra` is kept in the header as is."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}; choose one of: {COMPRESSIONS}")
+
+    columns = _encode(trend, compression)
+    header = {
+        "version": VERSION,
+        "count": len(trend),
+        "compression": compression,
+        "metadata": trend.metadata,
+        "side_table": trend.extras.to_dict(),
+        "columns": [],
+        "extra": extra or {},
+    }
+    # Column offsets depend on the header length, which depends on the offsets
+    # written into it; reserve their width with a first pass of zeros
+    sizes = [column.nbytes if isinstance(column, np.ndarray) else len(column) for column in columns]
+    for name, size in zip(("time", "value"), sizes):
+        header["columns"].append({"name": name, "offset": 0, "nbytes": size})
+    start = len(MAGIC) + 4 + len(json.dumps(header).encode("utf-8")) + 64
+    start += -start % _ALIGNMENT
+    offset = start
+    for column, size in zip(header["columns"], sizes):
+        column["offset"] = offset
+        offset += size + (-size % _ALIGNMENT)
+
+    encoded = json.dumps(header).encode("utf-8")
+    encoded += b" " * (start - len(MAGIC) - 4 - len(encoded))
+
+    owns_file = isinstance(destination, (str, os.PathLike))
+    f = open(destination, "wb") if owns_file else destination
+    try:
+        f.write(MAGIC)
+        f.write(len(encoded).to_bytes(4, "little"))
+        f.write(encoded)
+        for column, size in zip(columns, sizes):
+            f.write(column.view(np.uint8) if isinstance(column, np.ndarray) else column)
+            f.write(b"\0" * (-size % _ALIGNMENT))
+    except BaseException:
+        if owns_file:
+            f.close()
+            os.remove(destination)
+        raise
+    if owns_file:
+        f.close()
+    report(progress, "write", len(trend), fraction=1.0)
+
+
+def _header(buffer) -> dict:
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a binary trend file")
+    length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 4], "little")
+    header = json.loads(bytes(buffer[len(MAGIC) + 4:len(MAGIC) + 4 + length]))
+    if header.get("version") != VERSION:
+        raise ValueError(f"Unsupported binary trend version {header.get('version')!r}")
+    return header
+
+
+def read_header(path) -> dict:
+    """Just the JSON header of a binary trend file."""
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC) + 4)
+        length = int.from_bytes(head[len(MAGIC):], "little")
+        return _header(head + f.read(length))
+
+
+def read_trendfile(source, progress: ProgressCallback | None = None) -> Trend:
+    """Open a binary trend file (a path or a binary stream).
+
+    From a path, uncompressed columns are views into a read-only mmap of the
+    file, so nothing is read until it is used. Streams are read into memory.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                raise ValueError("Not a binary trend file")
+            # The mapping stays open for as long as the arrays refer to it
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        buffer = source.read()
+
+    header = _header(buffer)
+    count = header["count"]
+    time_column, value_column = header["columns"]
+
+    def column(spec):
+        return buffer[spec["offset"]:spec["offset"] + spec["nbytes"]]
+
+    if header["compression"] is None:
+        times = np.frombuffer(buffer, dtype=_TIME, count=count, offset=time_column["offset"])
+        values = np.frombuffer(buffer, dtype=_VALUE, count=count, offset=value_column["offset"])
+    elif header["compression"] == "zlib":
+        deltas = _unshuffle(zlib.decompress(column(time_column)), np.dtype("<i8"), count)
+        times = np.cumsum(deltas).view(_TIME)
+        values = _unshuffle(zlib.decompress(column(value_column)), _VALUE, count)
+    else:
+        raise ValueError(f"Unknown compression {header['compression']!r}")
+
+    report(progress, "read", count, time_column["nbytes"] + value_column["nbytes"], 1.0)
+    # Files written before side tables existed simply have none
+    extras = SideTable.from_dict(header["side_table"]) if header.get("side_table") else None
+    return Trend(times, values, header["metadata"], extras)
@@ -0,0 +1,266 @@
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from instrument import emit
+from progress import ProgressCallback, report
+from timestamps import DEFAULT_LOCALE, LOCALE_FORMATS, format_timestamps
+from trend import CHUNK_SIZE, Trend, TrendStats, record_defaults
+
+# The layout below reproduces what template.jinja2 used to render, byte for byte
+HEADER = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<LogRecords \n'
+    '    Log="{name}" \n'
+    '    LogDescription="{description}" \n'
+    '    LogPath="{log_path}" \n'
+    '    Unit="{unit}" Signal="{signal}" \n'
+    '    Locale="{locale}" \n'
+    '    Max="{max}" \n'
+    '    Min="{min}" \n'
+    '    Average="{average}" \n'
+    '    Count="{count}" \n'
+    '    StartTime="{start_date}" \n'
+    '    EndTime="{end_date}" \n'
+    '    Description="{log_comment}"{padding}\n'
+    '  >\n'
+    '  '
+)
+RECORD = '\n    <{tag} Timestamp="{{}}" Value="{{}}"{attributes} />\n  '
+FOOTER = '\n</LogRecords>'
+
+# Output buffer handed to open(); records are also joined a chunk at a time
+BUFFER_SIZE = 1 << 20
+
+# Room kept for each statistic when the header is written after the body
+# (longest float repr is 24 characters, the widest int64 count 19)
+_RESERVED_WIDTH = 32
+
+
+def _attr(value) -> str:
+    # Same as xml.sax.saxutils.escape, without the urllib import it drags in
+    return str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def record_template(entry: dict) -> str:
+    """RECORD for one kind of record (see trend.DEFAULT_RECORD), left with Timestamp and Value to fill."""
+    attributes = "".join(
+        f' {key}="{_attr(value)}"' for key, value in entry.items() if key != "tag"
+    ).replace("{", "{{").replace("}", "}}")
+    return RECORD.format(tag=entry["tag"], attributes=attributes)
+
+
+def format_value(value: float) -> str:
+    # EBO writes undefined values as NaN, Python's repr would say nan. Values are
+    # float64, so whole numbers come out as "10.0" even where the template,
+    # given Python ints by the linear/linear_double/square generators, wrote "10"
+    return "NaN" if value != value else repr(value)
+
+
+def output_locale(locale: str | None, metadata: dict) -> str:
+    """The Locale a file is written in: en-US by default, "source" for the
+    source file's own, or any LOCALE_FORMATS key.
+
+    "source" raises ValueError for a Locale LOCALE_FORMATS does not know,
+    rather than writing the file in another one; a trend without a Locale
+    (generated, or converted from a spreadsheet) is written in en-US.
+    """
+    if locale is None:
+        return DEFAULT_LOCALE
+    if locale == "source":
+        source = (metadata.get("attributes") or {}).get("Locale")
+        if not source:
+            return DEFAULT_LOCALE
+        if source not in LOCALE_FORMATS:
+            raise ValueError(f"Cannot keep the source Locale {source!r}; choose one of: {list(LOCALE_FORMATS)}")
+        return source
+    if locale not in LOCALE_FORMATS:
+        raise ValueError(f"Unknown locale {locale!r}; choose one of: {[*LOCALE_FORMATS, 'source']}")
+    return locale
+
+
+class TrendWriter:
+    """Incremental EBO "Import Log Data" XML writer.
+
+    Feed record chunks with `write` and finish with `close` (or use it as a
+    context manager). When `stats` for the whole trend are given the header is
+    written up front; otherwise room for it is reserved, the statistics are
+    accumulated while the body streams out, and the header is filled in at
+    the end. `destination` is a file path or an open text stream such as
+    stdout; a stream that cannot seek gets the body spooled to a temporary
+    file until the header is known. On error a partial output file is removed.
+    Timestamps are written in the layout of `locale` (see output_locale).
+    Time spent formatting records and writing them out is reported as the
+    "render" and "write" stages (see instrument) on close.
+    """
+
+    def __init__(self, destination, metadata: dict, stats: TrendStats | None = None, locale: str | None = None):
+        self.destination = destination
+        self.metadata = metadata
+        self.locale = output_locale(locale, metadata)
+        self._date_format = LOCALE_FORMATS[self.locale]
+        self.header_last = stats is None
+        self.stats = TrendStats() if self.header_last else stats
+        self._owns_file = isinstance(destination, (str, os.PathLike))
+        self._target = open(destination, "w", encoding="utf-8", buffering=BUFFER_SIZE) if self._owns_file else destination
+        self._spooled = self.header_last and not self._target.seekable()
+        self._record = record_template(record_defaults(metadata))
+        self._templates = {}
+        self._records = self._characters = 0
+        self._rendering = self._writing = 0.0
+
+        if self._spooled:
+            self._file = tempfile.TemporaryFile("w+", encoding="utf-8")
+        else:
+            self._file = self._target
+            if self.header_last:
+                self._reserved = self._header(self.stats, reserve=True)
+                self._file.write(self._reserved)
+            else:
+                self._file.write(self._header(self.stats))
+        self._closed = False
+
+    def _header(self, stats: TrendStats, reserve: bool = False, padding: int = 0) -> str:
+        attributes = self.metadata.get("attributes") or {}
+        fields = {
+            "name": _attr(self.metadata.get("name")),
+            "description": _attr(self.metadata.get("description")),
+            "unit": _attr(self.metadata.get("unit")),
+            # Taken over from the source file's <LogRecords>, empty for anything generated
+            "log_path": _attr(attributes.get("LogPath", "")),
+            "signal": _attr(attributes.get("Signal", "")),
+            "log_comment": _attr(attributes.get("Description", "")),
+            "locale": self.locale,
+            "max": format_value(stats.max),
+            "min": format_value(stats.min),
+            "average": format_value(stats.average),
+            "count": stats.count,
+            "start_date": self._format_time(stats.first),
+            "end_date": self._format_time(stats.last),
+            "padding": " " * padding
+        }
+        if reserve:
+            for key in ("max", "min", "average", "count", "start_date", "end_date"):
+                fields[key] = " " * _RESERVED_WIDTH
+        return HEADER.format(**fields)
+
+    def _format_time(self, ts) -> str:
+        return format_timestamps([ts], self._date_format)[0] if ts is not None else ""
+
+    def write(self, times, values, extras=None):
+        """Write a chunk of records; rows in `extras` (a trend.SideTable) get their own tag and attributes."""
+        started = time.perf_counter()
+        if self.header_last:
+            self.stats.update(times, values)
+        has_nan = np.isnan(values).any()
+        times = format_timestamps(times, self._date_format)
+        values = values.tolist()
+        if has_nan:
+            values = [format_value(value) for value in values]
+        if extras is None or not len(extras):
+            record = self._record.format
+            self._output(started, "".join([record(ts, value) for ts, value in zip(times, values)]), len(times))
+            return
+        records = [self._record] * len(times)
+        for row, entry in zip(extras.rows.tolist(), extras.entries):
+            # Each distinct kind of record is turned into a template once
+            key = tuple(entry.items())
+            template = self._templates.get(key)
+            if template is None:
+                template = self._templates[key] = record_template(entry)
+            records[row] = template
+        self._output(started, "".join([
+            record.format(ts, value) for record, ts, value in zip(records, times, values)
+        ]), len(times))
+
+    def _output(self, started: float, text: str, records: int):
+        rendered = time.perf_counter()
+        self._file.write(text)
+        self._rendering += rendered - started
+        self._writing += time.perf_counter() - rendered
+        self._characters += len(text)
+        self._records += records
+
+    def close(self):
+        if self._closed:
+            return
+        try:
+            if not self.stats.count:
+                raise ValueError("Cannot write an empty trend")
+            started = time.perf_counter()
+            self._file.write(FOOTER)
+            if self._spooled:
+                self._target.write(self._header(self.stats))
+                self._file.seek(0)
+                shutil.copyfileobj(self._file, self._target, BUFFER_SIZE)
+                self._file.close()
+            elif self.header_last:
+                # Pad inside the tag, where whitespace is insignificant, so the
+                # header overwrites exactly the room reserved for it
+                padding = len(self._reserved) - len(self._header(self.stats))
+                self._file.seek(0)
+                self._file.write(self._header(self.stats, padding=padding))
+                self._file.seek(0, os.SEEK_END)
+            self._finish()
+        except BaseException:
+            self.abort()
+            raise
+        # Flushing and closing the file is where most of the disk time goes
+        self._writing += time.perf_counter() - started
+        emit("render", self._rendering, records_in=self._records, records_out=self._records, bytes=self._characters)
+        emit("write", self._writing, records_in=self._records, bytes=self._characters)
+
+    def _finish(self):
+        self._closed = True
+        if self._owns_file:
+            self._target.close()
+        else:
+            self._target.flush()
+
+    def abort(self):
+        if self._closed:
+            return
+        if self._spooled:
+            self._file.close()
+        self._finish()
+        if self._owns_file and os.path.exists(self.destination):
+            os.remove(self.destination)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_trend_xml(
+    trend: Trend,
+    file_path,
+    chunk_size: int = CHUNK_SIZE,
+    header_last: bool = False,
+    progress: ProgressCallback | None = None,
+    locale: str | None = None
+):
+    """Write a trend as an EBO "Import Log Data" XML file (a path or a text stream).
+
+    Records are formatted and written one chunk at a time, so the document is
+    never held in memory as a whole. With `header_last` the statistics are
+    gathered while writing instead of in a pass beforehand. `progress` is told
+    the records written after every chunk. `locale` picks the timestamp
+    layout (see output_locale).
+    """
+    if not len(trend):
+        raise ValueError("Cannot write an empty trend")
+
+    with TrendWriter(file_path, trend.metadata, None if header_last else trend.stats(), locale) as writer:
+        for offset in range(0, len(trend), chunk_size):
+            chunk = trend[offset:offset + chunk_size]
+            writer.write(chunk.times, chunk.values, chunk.extras)
+            written = min(offset + chunk_size, len(trend))
+            report(progress, "write", written, fraction=written / len(trend))